@@ -23,9 +23,10 @@ import { useLocation } from "../hooks/useLocation";
 import { BottomNavigation } from "../components/layout/BottomNavigation";
 import {
   loadChatSessions,
+  loadSessionMessages,
   saveChatSessions,
   createChatSession,
-  updateSessionMessages,
+  appendSessionMessages,
   deleteChatSession as deleteChatSessionFromStorage,
   updateSessionActivity,
   formatRelativeTime,
@@ -53,6 +54,11 @@ export function AskQueries() {
   const [chatSessionsLoaded, setChatSessionsLoaded] = useState(false);
   const [currentSessionId, setCurrentSessionId] = useState(null);
   const [sessionCounter, setSessionCounter] = useState(1);
+  // Per session: sequence number and ids of the messages already stored on the server
+  const persistedRef = useRef({});
+  // Cursor for the page of messages before the oldest one shown (null when all are shown)
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   // ================== CHAT HISTORY MANAGEMENT ==================
   // These functions use the storage service abstraction for easy database migration
@@ -67,21 +73,13 @@ export function AskQueries() {
         setChatSessions(result.sessions);
         setSessionCounter(result.sessionCounter);
         if (result.sessions.length > 0 && result.currentSessionId) {
-          const currentSession = result.sessions.find(
-            (s) => s.id === result.currentSessionId
-          );
-          if (currentSession) {
-            setCurrentSessionId(result.currentSessionId);
-            setMessages(currentSession.messages || []);
-            if (currentSession.messages.length > 0) {
-              setInputDisabled(false);
-            }
-          } else {
-            setCurrentSessionId(result.sessions[0].id);
-            setMessages(result.sessions[0].messages || []);
-            if (result.sessions[0].messages.length > 0) {
-              setInputDisabled(false);
-            }
+          // Sessions arrive as summaries; the current one comes with its newest page of messages
+          const page = result.currentMessages || { messages: [], nextCursor: null };
+          setCurrentSessionId(result.currentSessionId);
+          applyMessagePage(result.currentSessionId, page);
+          setMessages(page.messages);
+          if (page.messages.length > 0) {
+            setInputDisabled(false);
           }
         }
       } else {
@@ -192,34 +190,123 @@ export function AskQueries() {
   };
 
   /**
-   * Update session messages in storage
+   * Stored-message state for a session, seeded from its summary the first time
+   * @param {string} sessionId - Session ID
+   * @returns {Object} - { lastSeq, ids }
+   */
+  const persistedStateFor = (sessionId) => {
+    if (!persistedRef.current[sessionId]) {
+      const session = chatSessions.find((s) => s.id === sessionId);
+      persistedRef.current[sessionId] = {
+        lastSeq: session?.lastSeq || 0,
+        ids: new Set(),
+      };
+    }
+    return persistedRef.current[sessionId];
+  };
+
+  /**
+   * Take in a page of stored messages: they are already persisted, and its
+   * cursor points at the page before it
+   * @param {string} sessionId - Session ID
+   * @param {Object} page - { messages, nextCursor, lastSeq }
+   */
+  const applyMessagePage = (sessionId, page) => {
+    markMessagesPersisted(
+      sessionId,
+      page.messages.map((m) => m.id),
+      page.lastSeq
+    );
+    setOlderCursor(page.nextCursor ?? null);
+  };
+
+  /**
+   * Load the page of messages before the oldest one shown
+   */
+  const loadOlderMessages = async () => {
+    if (!currentSessionId || olderCursor === null || isLoadingOlder) return;
+
+    setIsLoadingOlder(true);
+    try {
+      const page = await loadSessionMessages(
+        currentSessionId,
+        user?.id,
+        olderCursor
+      );
+      if (page.success) {
+        applyMessagePage(currentSessionId, page);
+        setMessages((prev) => [...page.messages, ...prev]);
+      }
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  /**
+   * Record messages the server stored itself (e.g. while answering /chat/message)
+   * @param {string} sessionId - Session ID
+   * @param {Array} ids - Stored message ids
+   * @param {number} lastSeq - Session sequence number after they were stored
+   */
+  const markMessagesPersisted = (sessionId, ids, lastSeq) => {
+    const persisted = persistedStateFor(sessionId);
+    ids.forEach((id) => id && persisted.ids.add(id));
+    if (typeof lastSeq === "number") {
+      persisted.lastSeq = Math.max(persisted.lastSeq, lastSeq);
+    }
+  };
+
+  /**
+   * Update session messages in storage, sending only messages the server doesn't have yet
    * @param {string} sessionId - Session ID to update
    * @param {Array} messages - Updated messages array
    */
   const updateSessionMessagesLocal = async (sessionId, messages) => {
     if (!sessionId || !messages.length) return;
 
+    const persisted = persistedStateFor(sessionId);
+    let pending = messages.filter((m) => !persisted.ids.has(m.id));
+    if (!pending.length) return;
+
     try {
-      const success = await updateSessionMessages(
+      let result = await appendSessionMessages(
         sessionId,
-        messages,
+        pending,
+        persisted.lastSeq,
         user?.id
       );
 
-      if (success) {
+      if (result.conflict) {
+        // Another write (usually the server recording a reply) got there first; skip what it stored
+        markMessagesPersisted(sessionId, result.ids || [], result.lastSeq);
+        pending = pending.filter((m) => !persisted.ids.has(m.id));
+        result = pending.length
+          ? await appendSessionMessages(sessionId, pending, persisted.lastSeq, user?.id)
+          : { success: true, lastSeq: persisted.lastSeq };
+      }
+
+      if (result.success) {
+        markMessagesPersisted(sessionId, pending.map((m) => m.id), result.lastSeq);
+        const lastMessage = messages[messages.length - 1];
         setChatSessions((prev) =>
           prev.map((session) =>
             session.id === sessionId
               ? {
                   ...session,
-                  messages,
+                  lastSeq: persisted.lastSeq,
                   lastActivity: new Date().toISOString(),
-                  messageCount: messages.length,
+                  messageCount: result.messageCount ?? session.messageCount,
+                  lastMessage: {
+                    message: lastMessage.message,
+                    isUser: lastMessage.isUser,
+                    timestamp: lastMessage.timestamp,
+                  },
                 }
               : session
           )
         );
       }
+      // Otherwise the messages stay pending and go out with the next change
     } catch (error) {
       console.error("Error updating session messages:", error);
     }
@@ -309,6 +396,7 @@ export function AskQueries() {
       const newSession = await createNewChatSession(`Chat ${sessionCounter}`);
 
       setMessages([]);
+      setOlderCursor(null);
       setIsHistoryOpen(false);
 
       // Start the new session immediately with welcome message
@@ -373,6 +461,7 @@ export function AskQueries() {
           // No sessions left, reset to start chat state
           setCurrentSessionId(null);
           setMessages([]);
+          setOlderCursor(null);
           setInputDisabled(true);
           setError(null);
         }
@@ -400,11 +489,17 @@ export function AskQueries() {
         setIsInitialWelcomePlaying(false);
         setError(null); // Clear any previous errors
 
+        // Only the newest page is fetched; older ones load on request
+        const page = await loadSessionMessages(sessionId, user?.id);
+        if (!page.success) {
+          throw new Error(page.error || "Failed to load messages");
+        }
         setCurrentSessionId(sessionId);
-        setMessages(session.messages || []);
+        applyMessagePage(sessionId, page);
+        setMessages(page.messages);
 
         // Enable inputs if the session has messages, disable if it's a new session
-        setInputDisabled(session.messages.length === 0);
+        setInputDisabled(page.messages.length === 0);
         setIsHistoryOpen(false);
 
         // Update last activity for this session
@@ -674,14 +769,16 @@ export function AskQueries() {
     setIsLoading(true);
 
     try {
-      // Prepare chat history for context (excluding system messages like welcome, emergency, reminder notifications)
-      const chatHistory = messages
-        .filter((msg) => !msg.isEmergency && !msg.isReminder && !msg.isError) // Only include regular chat messages
-        .map((msg) => ({
-          role: msg.isUser ? "user" : "assistant",
-          content: msg.message,
-          timestamp: msg.timestamp,
-        }));
+      // With a saved session the server assembles history itself; otherwise send it along
+      const chatHistory = currentSessionId
+        ? undefined
+        : messages
+            .filter((msg) => !msg.isEmergency && !msg.isReminder && !msg.isError) // Only include regular chat messages
+            .map((msg) => ({
+              role: msg.isUser ? "user" : "assistant",
+              content: msg.message,
+              timestamp: msg.timestamp,
+            }));
 
       const response = await fetch(`${route_endpoint}/chat/message`, {
         method: "POST",
@@ -689,8 +786,9 @@ export function AskQueries() {
         body: JSON.stringify({
           input: messageToSend,
           userId: user.id,
-          chatHistory: chatHistory, // Send chat history for context
-          sessionId: currentSessionId, // Include session ID for context
+          chatHistory: chatHistory, // Only for unsaved sessions
+          sessionId: currentSessionId, // Server loads history for this session
+          messageId: userMessage.id, // Lets the server store this message under the same id
         }),
       });
 
@@ -702,6 +800,15 @@ export function AskQueries() {
 
       const data = await response.json();
 
+      // The server stored this turn itself; don't send it again
+      if (currentSessionId && data.messageId) {
+        markMessagesPersisted(
+          currentSessionId,
+          [userMessage.id, data.messageId],
+          data.lastSeq
+        );
+      }
+
       // Check for emergency detection from server
       const emergencyHandled = data.emergency_detected
         ? await handleEmergencyResponse(
@@ -757,7 +864,7 @@ export function AskQueries() {
       }
 
       const aiMessage = {
-        id: `ai_${Date.now()}`,
+        id: data.messageId || `ai_${Date.now()}`,
         message: aiResponseMessage,
         isUser: false,
         timestamp: new Date(),
@@ -910,7 +1017,8 @@ export function AskQueries() {
     if (endOfMessagesRef.current) {
       endOfMessagesRef.current.scrollIntoView({ behavior: "smooth" });
     }
-  }, [messages]);
+    // Only a new latest message scrolls; loading older ones keeps the position
+  }, [messages[messages.length - 1]?.id]);
 
   return (
     <div>
@@ -1020,6 +1128,17 @@ export function AskQueries() {
                   </motion.div>
                 </motion.div>
               )}
+            {olderCursor !== null && (
+              <div className="flex justify-center">
+                <button
+                  onClick={loadOlderMessages}
+                  disabled={isLoadingOlder}
+                  className="text-xs sm:text-sm text-primary-200 dark:text-primary-100 px-4 py-2 rounded-xl border border-primary-100/30 hover:bg-primary-100/20 transition-colors disabled:opacity-50"
+                >
+                  {isLoadingOlder ? "Loading..." : "Load earlier messages"}
+                </button>
+              </div>
+            )}
             {messages.map((msg, index) => (
               <MessageBubble
                 key={msg.id}
@@ -1235,31 +1354,23 @@ export function AskQueries() {
                             <p className="text-xs text-gray-500 dark:text-gray-400">
                               {formatRelativeTime(session.lastActivity)}
                             </p>
-                            {session.messages.length > 0 && (
+                            {session.lastMessage?.message && (
                               <p className="text-xs text-gray-600 dark:text-gray-300 mt-1 truncate">
                                 <span
                                   className="block"
                                   style={{ maxWidth: "100%" }}
                                   dangerouslySetInnerHTML={{
                                     __html:
-                                      (
-                                        session.messages[
-                                          session.messages.length - 1
-                                        ]?.message || ""
-                                      ).length > 50
-                                        ? session.messages[
-                                            session.messages.length - 1
-                                          ]?.message.slice(0, 50) + "..."
-                                        : session.messages[
-                                            session.messages.length - 1
-                                          ]?.message || "",
+                                      session.lastMessage.message.length > 50
+                                        ? session.lastMessage.message.slice(0, 50) + "..."
+                                        : session.lastMessage.message,
                                   }}
                                 />
                               </p>
                             )}
                             <div className="flex items-center gap-2 mt-2">
                               <span className="text-xs bg-gray-200 dark:bg-gray-700 text-gray-600 dark:text-gray-300 px-2 py-1 rounded">
-                                {session.messages.length} messages
+                                {session.messageCount || 0} messages
                               </span>
                               {session.id === currentSessionId && (
                                 <span className="text-xs bg-primary-200 text-white px-2 py-1 rounded">
@@ -33,9 +33,9 @@ export function Reminders() {
   const [isVoiceLoading, setIsVoiceLoading] = useState(false);
   const [syncStatus, setSyncStatus] = useState("idle"); // 'idle', 'syncing', 'success', 'error'
 
-  // Filter out duplicate reminders by created_at
+  // Filter out duplicate reminders by created_at (occurrences of a repeating reminder share it)
   const uniqueReminders = React.useMemo(
-    () => Array.from(new Map(reminders.map((r) => [r.created_at, r])).values()),
+    () => Array.from(new Map(reminders.map((r) => [r.occurrenceId || r.created_at, r])).values()),
     [reminders]
   );
 
@@ -455,7 +455,7 @@ export function Reminders() {
           <div className="grid gap-3 sm:gap-4 py-10">
             {uniqueReminders.map((reminder) => (
               <Card
-                key={reminder.created_at}
+                key={reminder.occurrenceId || reminder.created_at}
                 className="flex justify-between items-center p-3 xs:p-4 sm:p-5 md:p-6 gap-3 xs:gap-4 hover:shadow-lg transition-all duration-300 bg-white dark:bg-dark-50 border border-primary-100/20 dark:border-dark-600/20 hover:scale-[1.02] hover:border-primary-200/40 dark:hover:border-primary-100/40 rounded-xl sm:rounded-2xl"
               >
                 <div className="flex gap-2 xs:gap-3 sm:gap-4 md:gap-5 items-center flex-1 min-w-0">
@@ -477,6 +477,11 @@ export function Reminders() {
                         |
                       </span>
                       <span className="inline-block font-medium">{formatTimeForDisplay(reminder.time)}</span>
+                      {reminder.recurrence && (
+                        <span className="inline-block text-primary-100/80 dark:text-primary-100/60">
+                          Repeats {reminder.recurrence.freq}
+                        </span>
+                      )}
                     </div>
                   </div>
                 </div>
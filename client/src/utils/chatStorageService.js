@@ -28,6 +28,27 @@ export const loadChatSessions = async (userId = null) => {
 };
 
 
+/**
+ * Load one page of a session's messages from backend (MongoDB)
+ * @param {string} sessionId - Session ID
+ * @param {string} userId - User ID
+ * @param {number|null} before - nextCursor of the page already shown, or null for the newest page
+ * @returns {Promise<Object>} - { success, messages (oldest first), nextCursor, lastSeq }
+ */
+export const loadSessionMessages = async (sessionId, userId = null, before = null) => {
+  try {
+    const params = new URLSearchParams({ userId: userId || '' });
+    if (before !== null && before !== undefined) params.set('before', before);
+    const response = await fetch(`${API_BASE}/loadChat/${encodeURIComponent(sessionId)}/messages?${params}`);
+    if (!response.ok) throw new Error('Failed to load chat messages');
+    return await response.json();
+  } catch (error) {
+    console.error('Error loading chat messages:', error);
+    return { success: false, error: error.message, messages: [], nextCursor: null };
+  }
+};
+
+
 /**
  * Save all chat sessions to backend (MongoDB)
  * @param {Array} sessions - Array of chat sessions
@@ -99,6 +120,31 @@ export const updateSessionMessages = async (sessionId, messages, userId = null)
 };
 
 
+/**
+ * Append only new messages to a session in backend (MongoDB)
+ * @param {string} sessionId - Session ID to append to
+ * @param {Array} messages - Messages not yet stored
+ * @param {number} lastSeq - Sequence number of the last stored message this client knows of
+ * @param {string} userId - User ID
+ * @returns {Promise<Object>} - { success, lastSeq } or, when another write got there first,
+ *   { success: false, conflict: true, lastSeq, ids } with the ids of messages stored since lastSeq
+ */
+export const appendSessionMessages = async (sessionId, messages, lastSeq, userId = null) => {
+  try {
+    const response = await fetch(`${API_BASE}/appendMessages/${encodeURIComponent(sessionId)}/messages`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ messages, lastSeq, userId })
+    });
+    const data = await response.json();
+    return { ...data, conflict: response.status === 409, status: response.status };
+  } catch (error) {
+    console.error('Error appending session messages:', error);
+    return { success: false, conflict: false, error: error.message };
+  }
+};
+
+
 /**
  * Delete a chat session in backend (MongoDB)
  * @param {string} sessionId - Session ID to delete
@@ -1,10 +1,12 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 from routes.format_reminder import format_reminder_bp
 from routes.ask_query import chat_bp
 from routes.saved_contacts import saved_contacts_bp
 from routes.blog_fetch import blog_fetch_bp
+from routes.utils import metrics, model_routing, mongo, indexes
+from routes.utils.ai_utils import llm_client
 
 import traceback
 import os
@@ -30,6 +32,9 @@ app.register_blueprint(chat_bp)
 app.register_blueprint(saved_contacts_bp)
 app.register_blueprint(blog_fetch_bp)
 
+# Create any missing Mongo indexes without delaying startup (python -m routes.utils.indexes to run by hand)
+indexes.ensure_in_background()
+
 @app.route('/', methods=['GET'])
 def index():
     return "Welcome to the AI Assistant API!"
@@ -38,6 +43,36 @@ def index():
 def health_check():
     return "API is running smoothly!", 200
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # In-process counters and timings (per worker), optionally filtered by ?prefix=
+    return jsonify(metrics.snapshot(request.args.get('prefix')))
+
+@app.route('/metrics/llm-cache', methods=['GET'])
+def get_llm_cache_stats():
+    cache = llm_client.cache
+    return jsonify(cache.stats() if cache is not None else {"backend": None, "enabled": False})
+
+@app.route('/metrics/llm-breaker', methods=['GET'])
+def get_llm_breaker_state():
+    # Circuit breaker guarding Gemini calls in this worker
+    return jsonify(llm_client.breaker.snapshot())
+
+@app.route('/metrics/llm-routes', methods=['GET'])
+def get_llm_routes():
+    # Model and generation config per call-site route, with latency and tokens per call
+    return jsonify(model_routing.describe())
+
+@app.route('/metrics/llm-admission', methods=['GET'])
+def get_llm_admission_state():
+    # Live queue depth per priority class; wait times are under /metrics?prefix=admission
+    return jsonify(llm_client.admission.snapshot())
+
+@app.route('/metrics/mongo', methods=['GET'])
+def get_mongo_pool_state():
+    # Shared Mongo client pool: open/in-use connections, utilization and checkout wait times
+    return jsonify(mongo.snapshot())
+
 # Error handler for 404 Not Found
 @app.errorhandler(404)
 def not_found(error):
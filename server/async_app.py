@@ -0,0 +1,51 @@
+from quart import Quart, jsonify, request
+from quart_cors import cors
+from dotenv import load_dotenv
+from routes.async_chat import async_chat_bp
+from routes.utils import metrics, mongo
+from routes.utils.ai_utils import llm_client
+
+import traceback
+
+# Load environment variables from .env file
+load_dotenv()
+
+# ASGI variant of app.py serving the async chat and reminder endpoints.
+# Run alongside the WSGI app to compare throughput under identical load:
+#   hypercorn async_app:app --bind 0.0.0.0:5001
+app = Quart(__name__)
+app = cors(app, allow_origin="*")
+
+app.register_blueprint(async_chat_bp)
+
+@app.route('/', methods=['GET'])
+async def index():
+    return "Welcome to the AI Assistant API (async)!"
+
+@app.route('/health', methods=['GET'])
+async def health_check():
+    return "API is running smoothly!", 200
+
+@app.route('/metrics', methods=['GET'])
+async def get_metrics():
+    return jsonify(metrics.snapshot(request.args.get('prefix')))
+
+@app.route('/metrics/llm-admission', methods=['GET'])
+async def get_llm_admission_state():
+    return jsonify(llm_client.admission.snapshot())
+
+@app.route('/metrics/mongo', methods=['GET'])
+async def get_mongo_pool_state():
+    return jsonify(mongo.snapshot())
+
+@app.errorhandler(404)
+async def not_found(error):
+    return {"error": "Resource not found"}, 404
+
+@app.errorhandler(Exception)
+async def handle_exception(error):
+    app.logger.error('Unhandled Exception:\n' + traceback.format_exc())
+    return jsonify({"error": "Internal Server Error"}), 500
+
+if __name__ == '__main__':
+    app.run(port=5001, debug=True)
@@ -1,29 +1,38 @@
 # ================== IMPORTS & GLOBALS ==================
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from dotenv import load_dotenv
 from textblob import TextBlob
 from bson import ObjectId
-from pymongo import MongoClient
-from datetime import datetime, timedelta
+from pymongo.errors import PyMongoError
+from datetime import datetime
 
 from routes.format_reminder import save_to_mongodb
-from routes.utils.ai_utils import analyze_emergency_intent, analyze_reminder_intent, llm_client, GEMINI_MODEL
+from routes.utils import metrics, fanout, admission, conversation, session_store, date_context, reminder_defaults, datetime_normalizer, recurrence, mongo
+from routes.utils.emergency_rules import looks_urgent
+from routes.utils.llm_resilience import LLMError, classify_error
+from routes.utils.reminder_parser import try_parse_locally
+from routes.utils.ai_utils import analyze_message_intent, analyze_emergency_intent, analyze_reminder_intent, llm_client, REMINDER_LIST_SCHEMA
 
 import json as pyjson
 
 import os
-import re
+import queue
+import threading
+import time
 
 # Load environment variables
 load_dotenv()
 
-# MongoDB setup (adjust as needed)
-MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = os.getenv("DB_NAME")
-COLLECTION_NAME = os.getenv("CHAT_SESSIONS_COLLECTION")
-mongo_client = MongoClient(MONGO_URI)
-db = mongo_client[DB_NAME]
-chat_sessions_col = db[COLLECTION_NAME]
+
+# MongoDB: chat sessions live in the shared registry's client
+def chat_sessions():
+    """Chat sessions collection from the shared Mongo registry (created on first use)."""
+    return mongo.require("CHAT_SESSIONS_COLLECTION")
+
+
+def chat_messages():
+    """Chat messages collection (one document per message, keyed by sessionId and seq)."""
+    return mongo.require("CHAT_MESSAGES_COLLECTION")
 
 
 # LLM client now provided by routes.utils.ai_utils (centralized)
@@ -39,348 +48,28 @@ SYSTEM_PROMPT = """You are an omniscient AI assistant with comprehensive mastery
 
 # ================== SMART DATE/TIME CONTEXT & VALIDATION ==================
 
+_DATE_TIME_MODES = {
+    'default_date': lambda ctx, title: reminder_defaults.default_date(title, ctx),
+    'default_time': lambda ctx, title: reminder_defaults.default_time(title, ctx),
+    'validate_date': lambda ctx, value: datetime_normalizer.normalize_date(value, ctx),
+    'validate_time': lambda ctx, value: datetime_normalizer.normalize_time(value),
+}
+
+
 def smart_date_time_context(mode, *args, **kwargs):
     """
     Unified function for all date/time context, inference, and validation.
     mode: 'context', 'default_date', 'default_time', 'validate_date', 'validate_time'
     args: depends on mode
+    Date lookups and the rendered context come from the shared per-minute date_context snapshot.
     """
-    now = datetime.now()
-
-    def context():
-        today = now.strftime("%Y-%m-%d")
-        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-        day_after_tomorrow = (now + timedelta(days=2)).strftime("%Y-%m-%d")
-        days_ahead = {}
-        weekdays_ahead = {}
-        for i in range(14):
-            future_date = now + timedelta(days=i)
-            day_name = future_date.strftime("%A").lower()
-            date_str = future_date.strftime("%Y-%m-%d")
-            if i < 7:
-                days_ahead[day_name] = date_str
-            if future_date.weekday() < 5:
-                if f"next {day_name}" not in weekdays_ahead:
-                    weekdays_ahead[f"next {day_name}"] = date_str
-        current_time = now.strftime("%H:%M")
-        current_hour = now.hour
-        if 5 <= current_hour < 9:
-            time_of_day = "early morning"
-            suggested_time = "9:00 AM"
-        elif 9 <= current_hour < 12:
-            time_of_day = "morning"
-            suggested_time = "10:00 AM"
-        elif 12 <= current_hour < 14:
-            time_of_day = "midday"
-            suggested_time = "3:00 PM"
-        elif 14 <= current_hour < 17:
-            time_of_day = "afternoon"
-            suggested_time = "4:00 PM"
-        elif 17 <= current_hour < 20:
-            time_of_day = "evening"
-            suggested_time = "7:00 PM"
-        elif 20 <= current_hour < 23:
-            time_of_day = "night"
-            suggested_time = "9:00 AM"
-        else:
-            time_of_day = "late night"
-            suggested_time = "9:00 AM"
-        current_month = now.strftime("%B").lower()
-        next_month = (now.replace(day=28) + timedelta(days=4)).replace(day=1)
-        next_month_name = next_month.strftime("%B").lower()
-        current_week_start = now - timedelta(days=now.weekday())
-        next_week_start = current_week_start + timedelta(days=7)
-        this_week = f"this week (starts {current_week_start.strftime('%B %d')})"
-        next_week = f"next week (starts {next_week_start.strftime('%B %d')})"
-        context = f"""
-CURRENT DATE & TIME CONTEXT (Use this for intelligent date/time inference):
-
-Current Information:
-
-Day Name Mappings (next 7 days):
-""" + "\n".join([f"- {day} ({(now + timedelta(days=i)).strftime('%B %d')}): {date}" for i, (day, date) in enumerate(days_ahead.items()) if day != now.strftime('%A').lower() and i < 7]) + f"""
-
-Weekday Mappings (for appointments/business):
-""" + "\n".join([f"- {day}: {date}" for day, date in weekdays_ahead.items()]) + f"""
-
-Smart Time Defaults (use when time not specified):
-
-Smart Date Defaults (use when date not specified):
-
-Extended Time References:
-
-INFERENCE RULES:
-1. "medicine" without time → 9:00 AM (morning) or 8:00 PM (if "evening" mentioned)
-2. "appointment" without date → next weekday (Monday-Friday)
-3. "tomorrow" → {tomorrow}
-4. "today" → {today}
-5. Weekday names → map to next occurrence of that day
-6. Meal names → breakfast: 8:00 AM, lunch: 12:00 PM, dinner: 7:00 PM
-7. Time of day words → morning: 9:00 AM, afternoon: 3:00 PM, evening: 7:00 PM, night: 8:00 PM
-8. No date/time specified → use smart defaults based on task type and current time
-"""
-        return context
-
-    def default_date(title):
-        title_lower = title.lower()
-        current_hour = now.hour
-        if any(word in title_lower for word in ['medicine', 'medication', 'pill', 'vitamin', 'drug', 'treatment', 'dose']):
-            if current_hour >= 18:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            elif 'tonight' in title_lower or 'evening' in title_lower:
-                return now.strftime("%Y-%m-%d")
-            else:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        if any(word in title_lower for word in ['appointment', 'meeting', 'doctor', 'dentist', 'visit', 'consultation']):
-            days_ahead = 1
-            future_date = now + timedelta(days=days_ahead)
-            while future_date.weekday() >= 5:
-                days_ahead += 1
-                future_date = now + timedelta(days=days_ahead)
-                if days_ahead > 7:
-                    break
-            return future_date.strftime("%Y-%m-%d")
-        if any(word in title_lower for word in ['work', 'office', 'meeting', 'call', 'email', 'project', 'deadline']):
-            days_ahead = 1
-            future_date = now + timedelta(days=days_ahead)
-            while future_date.weekday() >= 5:
-                days_ahead += 1
-                future_date = now + timedelta(days=days_ahead)
-                if days_ahead > 7:
-                    break
-            return future_date.strftime("%Y-%m-%d")
-        if any(word in title_lower for word in ['breakfast', 'lunch', 'dinner', 'meal', 'eat']):
-            if 'breakfast' in title_lower and current_hour >= 10:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            elif 'lunch' in title_lower and current_hour >= 14:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            elif 'dinner' in title_lower and current_hour >= 21:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            else:
-                return now.strftime("%Y-%m-%d")
-        if any(word in title_lower for word in ['workout', 'exercise', 'gym', 'walk', 'run', 'jog', 'fitness']):
-            if current_hour >= 20:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            else:
-                return now.strftime("%Y-%m-%d")
-        if any(word in title_lower for word in ['shop', 'buy', 'store', 'grocery', 'errand', 'pickup', 'get']):
-            if current_hour >= 19:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            else:
-                return now.strftime("%Y-%m-%d")
-        if current_hour >= 20:
-            return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        elif current_hour >= 18:
-            return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        else:
-            return now.strftime("%Y-%m-%d")
-
-    def default_time(title):
-        title_lower = title.lower()
-        current_hour = now.hour
-        if any(word in title_lower for word in ['medicine', 'medication', 'pill', 'vitamin']):
-            if 'morning' in title_lower or 'am' in title_lower:
-                return "8:00 AM"
-            elif 'evening' in title_lower or 'night' in title_lower or 'pm' in title_lower:
-                return "8:00 PM"
-            elif 'afternoon' in title_lower:
-                return "3:00 PM"
-            elif 'bedtime' in title_lower:
-                return "10:00 PM"
-            else:
-                return "9:00 AM"
-        if 'breakfast' in title_lower:
-            return "8:00 AM"
-        elif 'lunch' in title_lower:
-            return "12:30 PM"
-        elif 'dinner' in title_lower:
-            return "7:00 PM"
-        elif 'snack' in title_lower:
-            if current_hour < 12:
-                return "10:30 AM"
-            else:
-                return "3:30 PM"
-        if any(word in title_lower for word in ['appointment', 'meeting', 'doctor', 'dentist', 'consultation']):
-            if 'morning' in title_lower:
-                return "10:00 AM"
-            elif 'afternoon' in title_lower:
-                return "2:00 PM"
-            else:
-                return "10:00 AM"
-        if any(word in title_lower for word in ['work', 'office', 'call', 'email', 'meeting']):
-            return "10:00 AM"
-        if any(word in title_lower for word in ['workout', 'exercise', 'gym', 'walk', 'run', 'jog']):
-            if 'morning' in title_lower:
-                return "7:00 AM"
-            elif 'evening' in title_lower:
-                return "6:00 PM"
-            else:
-                return "7:00 AM"
-        if any(word in title_lower for word in ['shop', 'buy', 'store', 'grocery', 'errand', 'pickup']):
-            return "2:00 PM"
-        if any(word in title_lower for word in ['study', 'homework', 'read', 'learn', 'practice']):
-            if current_hour < 12:
-                return "10:00 AM"
-            else:
-                return "4:00 PM"
-        if any(word in title_lower for word in ['sleep', 'bed', 'bedtime', 'rest']):
-            return "10:00 PM"
-        if any(word in title_lower for word in ['wake', 'alarm', 'get up']):
-            return "7:00 AM"
-        if 5 <= current_hour < 9:
-            return "9:00 AM"
-        elif 9 <= current_hour < 12:
-            return "10:00 AM"
-        elif 12 <= current_hour < 14:
-            return "3:00 PM"
-        elif 14 <= current_hour < 17:
-            return "4:00 PM"
-        elif 17 <= current_hour < 20:
-            return "7:00 PM"
-        else:
-            return "9:00 AM"
-
-    def validate_date(date_str):
-        if not date_str or str(date_str).lower() in ['null', 'none', '', 'undefined']:
-            return now.strftime("%Y-%m-%d")
-        try:
-            date_str = str(date_str).strip()
-            # Already in correct format
-            if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
-                parsed = datetime.strptime(date_str, "%Y-%m-%d")
-                return parsed.strftime("%Y-%m-%d")
-            date_lower = date_str.lower()
-            if date_lower == 'today':
-                return now.strftime("%Y-%m-%d")
-            elif date_lower == 'tomorrow':
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            elif date_lower == 'yesterday':
-                return (now - timedelta(days=1)).strftime("%Y-%m-%d")
-            elif 'day after tomorrow' in date_lower:
-                return (now + timedelta(days=2)).strftime("%Y-%m-%d")
-            weekdays = ['monday', 'tuesday', 'wednesday',
-                        'thursday', 'friday', 'saturday', 'sunday']
-            for i, day in enumerate(weekdays):
-                if day in date_lower:
-                    days_ahead = (i - now.weekday()) % 7
-                    if days_ahead == 0:
-                        days_ahead = 7
-                    future_date = now + timedelta(days=days_ahead)
-                    return future_date.strftime("%Y-%m-%d")
-            if 'next week' in date_lower:
-                days_until_monday = (7 - now.weekday()) % 7
-                if days_until_monday == 0:
-                    days_until_monday = 7
-                return (now + timedelta(days=days_until_monday)).strftime("%Y-%m-%d")
-            if 'this week' in date_lower:
-                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-            date_patterns = [
-                "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%m-%d-%Y", "%d-%m-%Y", "%Y/%m/%d",
-                "%B %d, %Y", "%B %d %Y", "%d %B %Y", "%m/%d", "%d/%m"
-            ]
-            for pattern in date_patterns:
-                try:
-                    parsed_date = datetime.strptime(date_str, pattern)
-                    if parsed_date.year == 1900:
-                        parsed_date = parsed_date.replace(year=now.year)
-                    return parsed_date.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
-            numbers = re.findall(r'\d+', date_str)
-            if len(numbers) >= 2:
-                try:
-                    if len(numbers) == 2:
-                        month, day = int(numbers[0]), int(numbers[1])
-                        if month <= 12 and day <= 31:
-                            date_obj = datetime(now.year, month, day)
-                            return date_obj.strftime("%Y-%m-%d")
-                    elif len(numbers) >= 3:
-                        month, day, year = int(numbers[0]), int(
-                            numbers[1]), int(numbers[2])
-                        if year < 100:
-                            year += 2000
-                        if month <= 12 and day <= 31:
-                            date_obj = datetime(year, month, day)
-                            return date_obj.strftime("%Y-%m-%d")
-                except ValueError:
-                    pass
-        except Exception as e:
-            return now.strftime("%Y-%m-%d")
-        return now.strftime("%Y-%m-%d")
-
-    def validate_time(time_str):
-        if not time_str or str(time_str).lower() in ['null', 'none', '', 'undefined']:
-            return "9:00 AM"
-
-        def format_to_12hour(hour, minute):
-            if hour == 0:
-                return f"12:{minute:02d} AM"
-            elif hour < 12:
-                return f"{hour}:{minute:02d} AM"
-            elif hour == 12:
-                return f"12:{minute:02d} PM"
-            else:
-                return f"{hour-12}:{minute:02d} PM"
-        try:
-            time_str = str(time_str).strip().lower()
-            if re.match(r'\d{1,2}:\d{2}\s*(am|pm|a\.?m\.?|p\.?m\.?)', time_str):
-                return time_str.upper().replace('.', '')
-            if re.match(r'\d{1,2}:\d{2}$', time_str):
-                parts = time_str.split(':')
-                hour, minute = int(parts[0]), int(parts[1])
-                if 0 <= hour <= 23 and 0 <= minute <= 59:
-                    return format_to_12hour(hour, minute)
-            time_mappings = {
-                'midnight': '12:00 AM', 'noon': '12:00 PM', 'breakfast': '8:00 AM',
-                'lunch': '12:30 PM', 'dinner': '7:00 PM', 'bedtime': '10:00 PM',
-                'morning': '9:00 AM', 'afternoon': '3:00 PM', 'evening': '7:00 PM', 'night': '8:00 PM'
-            }
-            for word, time_val in time_mappings.items():
-                if word in time_str:
-                    return time_val
-            am_pm_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.?m\.?|p\.?m\.?)'
-            match = re.search(am_pm_pattern, time_str)
-            if match:
-                hour = int(match.group(1))
-                minute = int(match.group(2)) if match.group(2) else 0
-                period = match.group(3).lower().replace('.', '')
-                if 1 <= hour <= 12 and 0 <= minute <= 59:
-                    period_str = "AM" if 'a' in period else "PM"
-                    return f"{hour}:{minute:02d} {period_str}"
-            colon_match = re.search(r'(\d{1,2}):(\d{2})', time_str)
-            if colon_match:
-                hour = int(colon_match.group(1))
-                minute = int(colon_match.group(2))
-                if 0 <= hour <= 23 and 0 <= minute <= 59:
-                    return format_to_12hour(hour, minute)
-            hour_only_match = re.search(r'\b(\d{1,2})\b', time_str)
-            if hour_only_match:
-                hour = int(hour_only_match.group(1))
-                if 0 <= hour <= 23:
-                    return format_to_12hour(hour, 0)
-                elif 1 <= hour <= 12:
-                    if hour < 8:
-                        return f"{hour}:00 PM"
-                    else:
-                        return f"{hour}:00 AM"
-        except Exception as e:
-            return "9:00 AM"
-            
-        return "9:00 AM"
-
+    ctx = date_context.current()
     if mode == 'context':
-        return context()
-    elif mode == 'default_date':
-        return default_date(args[0])
-    elif mode == 'default_time':
-        return default_time(args[0])
-    elif mode == 'validate_date':
-        return validate_date(args[0])
-    elif mode == 'validate_time':
-        return validate_time(args[0])
-    else:
+        return ctx.chat_context
+    handler = _DATE_TIME_MODES.get(mode)
+    if handler is None:
         raise ValueError('Unknown mode for smart_date_time_context')
+    return handler(ctx, args[0])
 
 # ================== END SMART DATE/TIME CONTEXT & VALIDATION ==================
 
@@ -388,115 +77,74 @@ INFERENCE RULES:
 # ================== REMINDER DETECTION & SETUP ==================
 
 
-def setup_reminder(user_input, user_id):
-    
-    """
-    Process reminder creation, formatting, and saving. Returns result dict or error.
-    """
-    try:
-        reminder_client = llm_client
-        date_context = smart_date_time_context('context')
-        enhanced_system_prompt = f"""You are an expert reminder creation assistant with advanced date/time intelligence. Parse user input into structured reminders with perfect contextual inference.
+def prepare_inferred_reminders(reminders, user_id):
+    """Fill missing dates/times with smart defaults and normalize them, for a batch of parsed reminders."""
+    return [{"userId": user_id, **reminder} for reminder in datetime_normalizer.normalize_reminders(reminders)]
+
+
+def save_inferred_reminders(reminders, user_id):
+    """Fill missing dates/times with smart defaults, validate, and save each reminder."""
+    results = [save_to_mongodb(reminder) for reminder in prepare_inferred_reminders(reminders, user_id)]
+    return {"success": True, "reminders": results, "count": len(results)}
 
-{date_context}
+
+# Static part of the reminder prompt; it precedes the date context so every request starts
+# with the same prefix, which Gemini's implicit caching can reuse
+REMINDER_SETUP_INSTRUCTIONS = """You are an expert reminder creation assistant with advanced date/time intelligence. Parse user input into structured reminders with perfect contextual inference.
 
 CORE INSTRUCTIONS:
 1. Extract title, date, and time from user input with intelligent inference
-2. ALWAYS fill in missing date/time using the context above and smart defaults
+2. ALWAYS fill in missing date/time using the date context below and smart defaults
 3. Convert relative dates and times accurately using current context
 4. Handle natural language patterns like \"tomorrow morning\", \"Monday afternoon\", \"next week\"
 5. Return valid JSON with proper date formats (YYYY-MM-DD) and time formats (HH:MM)
+6. Repeating requests ("every day", "twice a day", "every Monday until June") are ONE reminder: date is the first day and recurrence holds the rule (freq daily/weekly, interval, byDay, times, until); use recurrence null otherwise
 
-CRITICAL: Never return null/empty dates or times. Always infer using context and defaults above."""
-        response = reminder_client.chat.completions.create(
-            model=GEMINI_MODEL,
-            messages=[
-                {"role": "system", "content": enhanced_system_prompt},
-                {"role": "user", "content": f'Parse this into a reminder with intelligent date/time inference: {user_input}'}
-            ]
-        )
+CRITICAL: Never return null/empty dates or times. Always infer using the context and defaults below."""
 
-        def extract_content(resp):
-            try:
-                # Handle API response object
-                if hasattr(resp, 'choices') and resp.choices:
-                    if hasattr(resp.choices[0], 'message') and hasattr(resp.choices[0].message, 'content'):
-                        return resp.choices[0].message.content
-                
-                # Handle dictionary response
-                if isinstance(resp, dict) and 'choices' in resp:
-                    choices = resp['choices']
-                    if isinstance(choices, list) and choices:
-                        msg = choices[0].get('message')
-                        if isinstance(msg, dict):
-                            return msg.get('content', '')
-                        elif isinstance(msg, str):
-                            return msg
-                
-                # Handle string response directly
-                if isinstance(resp, str):
-                    return resp
-                    
-                # Handle iterable response (streaming)
-                if hasattr(resp, '__iter__') and not isinstance(resp, dict) and not isinstance(resp, str):
-                    try:
-                        return ''.join([getattr(chunk, 'content', str(chunk)) for chunk in resp if chunk])
-                    except Exception:
-                        return str(list(resp))
-                
-                # Fallback
-                return str(resp)
-            except Exception as e:
-                
-                return ""
-        content = extract_content(response)
-        if not isinstance(content, str):
-            content = str(content)
-        if not isinstance(content, str):
-            content = str(content)
-        array_match = re.search(
-            r'```(?:json)?\s*(\[[\s\S]*?\])\s*```|(\[[\s\S]*?\])', content)
-        if array_match:
-            array_text = next(
-                group for group in array_match.groups() if group is not None)
-            reminders_array = pyjson.loads(array_text)
-            if isinstance(reminders_array, list) and len(reminders_array) > 0:
-                results = []
-                for reminder in reminders_array:
-                    title = reminder.get('title') or "New Reminder"
-                    date = reminder.get('date') or smart_date_time_context(
-                        'default_date', title)
-                    time = reminder.get('time') or smart_date_time_context(
-                        'default_time', title)
-                    date = smart_date_time_context('validate_date', date)
-                    time = smart_date_time_context('validate_time', time)
-                    reminder_data = {"userId": user_id,
-                                     "title": title, "date": date, "time": time}
-                    saved_reminder = save_to_mongodb(reminder_data)
-                    results.append(saved_reminder)
-                return {"success": True, "reminders": results, "count": len(results)}
-        match = re.search(
-            r'```(?:json)?\s*(\{[\s\S]*?\})\s*```|(\{[\s\S]*?\})', content)
-        if match:
-            try:
-                json_text = next(
-                    group for group in match.groups() if group is not None)
-                reminder_json = pyjson.loads(json_text)
-                title = reminder_json.get('title') or "New Reminder"
-                date = reminder_json.get('date') or smart_date_time_context(
-                    'default_date', title)
-                time = reminder_json.get('time') or smart_date_time_context(
-                    'default_time', title)
-                date = smart_date_time_context('validate_date', date)
-                time = smart_date_time_context('validate_time', time)
-                reminder_data = {"userId": user_id,
-                                 "title": title, "date": date, "time": time}
-                saved_reminder = save_to_mongodb(reminder_data)
-                return {"success": True, "reminder": saved_reminder}
-            except Exception as e:
-                
-                return {"error": "Failed to parse reminder JSON", "raw": content}
-        return {"error": "No JSON found in LLM response", "raw": content}
+
+def reminder_setup_messages(user_input):
+    """Builds the LLM messages for parsing a chat message into reminders."""
+    date_context = smart_date_time_context('context')
+    return [
+        {"role": "system", "content": f"{REMINDER_SETUP_INSTRUCTIONS}\n\n{date_context}"},
+        {"role": "user", "content": f'Parse this into a reminder with intelligent date/time inference: {user_input}'}
+    ]
+
+
+def reminders_from_parsed(parsed, content):
+    """
+    Normalise the schema-parsed reminder list returned by the parse_reminder call.
+    Returns ('many', list) or (None, error_dict).
+    """
+    if isinstance(parsed, list):
+        reminders = [r for r in parsed if isinstance(r, dict)]
+        if reminders:
+            return 'many', reminders
+    return None, {"error": "No JSON found in LLM response", "raw": content}
+
+
+def setup_reminder(user_input, user_id):
+    
+    """
+    Process reminder creation, formatting, and saving. Returns result dict or error.
+    """
+    try:
+        # Common templates are parsed locally; only low-confidence input goes to the LLM
+        local_reminders = try_parse_locally(user_input)
+        if local_reminders:
+            return save_inferred_reminders(local_reminders, user_id)
+
+        response = llm_client.chat.completions.create(
+            messages=reminder_setup_messages(user_input),
+            call_site="parse_reminder",
+            response_schema=REMINDER_LIST_SCHEMA,
+        )
+        message = response.choices[0].message
+        kind, parsed = reminders_from_parsed(message.parsed, message.content)
+        if kind == 'many':
+            return save_inferred_reminders(parsed, user_id)
+        return parsed
     except Exception as e:
         
         return {"error": str(e)}
@@ -515,39 +163,463 @@ def fix_id(doc):
 
 
 
+# ================== CHAT REPLY HELPERS ==================
+
+# Speculative mode: start the main reply while intent classification is still running
+SPECULATIVE_CHAT = os.getenv("SPECULATIVE_CHAT", "true").lower() in ("1", "true", "yes")
+
+# 'combined' (default) uses the single LLM classifier for all signals: one call per message,
+# fewer tokens and one admission slot. 'fanout' runs the emergency and reminder classifiers
+# as separate concurrent stages, so one slow classifier can miss the deadline without the other
+INTENT_MODE = os.getenv("INTENT_MODE", "combined").lower()
+# Overall budget for intent classification; late stages fall back to safe defaults
+INTENT_DEADLINE_MS = int(os.getenv("INTENT_DEADLINE_MS", "4000"))
+
+# Emergency gets the conservative default: no alarm is raised, but the reply uses the
+# careful emergency prompt because we could not rule an emergency out
+EMERGENCY_TIMEOUT_DEFAULT = (False, 0.0, {"reason": "classifier_timeout", "conservative": True})
+REMINDER_TIMEOUT_DEFAULT = (False, 0.0, {})
+
+
+def message_priority(user_message):
+    """Admission priority for a chat message: possible distress goes ahead of everything else."""
+    return admission.EMERGENCY if looks_urgent(user_message) else admission.INTERACTIVE
+
+
+def textblob_polarity(text):
+    return TextBlob(text).sentiment.polarity  # type: ignore
+
+
+def intent_stage_defaults():
+    """Per-stage fallbacks for INTENT_MODE, used when a stage is late or raises."""
+    if INTENT_MODE == "fanout":
+        return {"emergency": EMERGENCY_TIMEOUT_DEFAULT, "reminder": REMINDER_TIMEOUT_DEFAULT, "sentiment": 0.0}
+    return {
+        "intent": {
+            "emergency": EMERGENCY_TIMEOUT_DEFAULT,
+            "reminder": REMINDER_TIMEOUT_DEFAULT,
+            "sentiment": {"polarity": None, "label": None},
+        },
+        "sentiment": 0.0,
+    }
+
+
+def combine_intent(results, late):
+    """Merge stage results into one intent dict shaped like analyze_message_intent() plus 'emergency_unresolved'."""
+    if INTENT_MODE == "fanout":
+        intent = {
+            "emergency": results["emergency"],
+            "reminder": results["reminder"],
+            "sentiment": {"polarity": None, "label": None},
+        }
+        emergency_late = "emergency" in late
+    else:
+        intent = dict(results["intent"])
+        emergency_late = "intent" in late
+    if intent["sentiment"].get("polarity") is None:
+        intent["sentiment"] = {"polarity": results["sentiment"], "label": None}
+    intent["emergency_unresolved"] = emergency_late
+    return intent
+
+
+def classify_message(user_message):
+    """
+    Run the intent classifiers and TextBlob sentiment concurrently under INTENT_DEADLINE_MS.
+    Returns: (intent dict shaped like analyze_message_intent() plus 'emergency_unresolved',
+              stage timings in ms, names of stages that fell back to defaults)
+    """
+    if INTENT_MODE == "fanout":
+        stages = {
+            "emergency": lambda: analyze_emergency_intent(user_message),
+            "reminder": lambda: analyze_reminder_intent(user_message),
+            "sentiment": lambda: textblob_polarity(user_message),
+        }
+    else:
+        stages = {
+            "intent": lambda: analyze_message_intent(user_message),
+            "sentiment": lambda: textblob_polarity(user_message),
+        }
+
+    results, timings, late = fanout.run_stages(stages, INTENT_DEADLINE_MS / 1000.0, intent_stage_defaults())
+    return combine_intent(results, late), timings, late
+
+
+def with_stage_timings(response, timings, late):
+    """Attach per-stage intent timings as debug headers."""
+    response.headers["Server-Timing"] = fanout.server_timing_header(timings, late)
+    if late:
+        response.headers["X-Intent-Defaults"] = ",".join(sorted(late))
+    return response
+
+
+def emotion_instruction_for(polarity):
+    if polarity > 0.1:
+        return "The user seems happy or positive. You can reply in an encouraging and friendly tone."
+    elif polarity < -0.1:
+        return "The user seems upset or worried. Please reply with extra empathy and reassurance."
+    return ""
+
+
+def build_system_prompt(chat_history, is_emergency=False, reminder_failed=False, emotion_instruction=""):
+    """Builds the main chat system prompt for the detected intent."""
+    base_context = ""
+    if chat_history and len(chat_history) > 0:
+        base_context = f" You are in an ongoing conversation with the user. Remember the context from previous messages in this session to provide more personalized and coherent responses. This is message #{len(chat_history) + 1} in the current session."
+
+    if is_emergency:
+        return SYSTEM_PROMPT + base_context + " IMPORTANT: The user's message has been detected as a potential emergency situation. Respond with immediate care, empathy, and appropriate guidance while being supportive and calm."
+    elif reminder_failed:
+        return SYSTEM_PROMPT + base_context + " The user seems to want to set a reminder but the automatic processing failed. Politely acknowledge this and suggest they can use the reminders section or try rephrasing with more specific details like date, time, and task."
+    return SYSTEM_PROMPT + base_context + \
+        (f" {emotion_instruction}" if emotion_instruction else "")
+
+
+def build_chat_messages(system_prompt, context, user_message):
+    """
+    Builds the messages array: system prompt, conversation summary, recent history,
+    then the new user message. context is (summary, recent) from conversation.prepare_context().
+    """
+    summary, recent_history = context
+    messages = [{"role": "system", "content": system_prompt}]
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+
+    # Recent history is already token-budgeted by prepare_context()
+    for msg in recent_history:
+        messages.append({"role": msg['role'], "content": msg['content']})
+
+    # Add the current user message
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def extract_reply(resp):
+    """Robustly extract the reply text from an LLM response."""
+    try:
+        # Handle API response object
+        if hasattr(resp, 'choices') and resp.choices:
+            if hasattr(resp.choices[0], 'message') and hasattr(resp.choices[0].message, 'content'):
+                return resp.choices[0].message.content
+
+        # Handle dictionary response
+        if isinstance(resp, dict) and 'choices' in resp:
+            choices = resp['choices']
+            if isinstance(choices, list) and choices:
+                msg = choices[0].get('message')
+                if isinstance(msg, dict):
+                    return msg.get('content', '')
+                elif isinstance(msg, str):
+                    return msg
+
+        # Handle string response directly
+        if isinstance(resp, str):
+            return resp
+
+        # Handle iterable response (streaming)
+        if hasattr(resp, '__iter__') and not isinstance(resp, dict) and not isinstance(resp, str):
+            try:
+                return ''.join([getattr(chunk, 'content', str(chunk)) for chunk in resp if chunk])
+            except Exception:
+                return str(list(resp))
+
+        # Fallback
+        return str(resp)
+    except Exception as e:
+
+        return "I apologize, but I encountered an error processing your request. Please try again."
+
+
+def generate_chat_reply(messages):
+    """Runs the main chat completion and returns the cleaned reply text."""
+    response = llm_client.chat.completions.create(
+        messages=messages,
+        call_site="chat",
+    )
+    return finalize_reply(response)
+
+
+def finalize_reply(response):
+    """Extracts, strips and guards the reply text of a chat completion."""
+    reply = extract_reply(response)
+    if not isinstance(reply, str):
+        reply = str(reply)
+    reply = reply.strip()
+
+    # Ensure we have a valid response
+    if not reply:
+        reply = "I apologize, but I didn't receive a proper response. Please try again."
+    return reply
+
+
+def start_speculation(priority=None):
+    """
+    Whether to start a speculative reply. Speculation runs outside admission control,
+    so it only starts while a slot of this priority is free; counts the decision.
+    """
+    if not SPECULATIVE_CHAT:
+        return False
+    if not llm_client.admission.has_capacity(priority):
+        metrics.incr("chat.speculation.skipped_busy")
+        return False
+    metrics.incr("chat.speculation.started")
+    return True
+
+
+def discard_speculation(future, reason):
+    """Drops a speculative reply (asyncio task or SpeculativeStream) that can no longer be used and counts why."""
+    if future is None:
+        return
+    future.cancel()
+    metrics.incr("chat.speculation.wasted")
+    metrics.incr(f"chat.speculation.wasted.{reason}")
+
+def reminder_response(reminder_result, reminder_confidence, reminder_components):
+    """Builds the chat response payload for a message handled by the reminder path."""
+    if reminder_result and reminder_result.get('success'):
+        # Successful reminder creation
+        reminder_data = reminder_result.get(
+            'reminder') or reminder_result.get('reminders', [])
+        # If it's a list, take the first dict
+        if isinstance(reminder_data, list) and len(reminder_data) > 0:
+            first = reminder_data[0]
+            if isinstance(first, dict):
+                title = first.get('title', 'your reminder')
+                date = first.get('date', '')
+                time = first.get('time', '')
+                rule = first.get('recurrence')
+            else:
+                title, date, time, rule = 'your reminder', '', '', None
+        elif isinstance(reminder_data, dict):
+            title = reminder_data.get('title', 'your reminder')
+            date = reminder_data.get('date', '')
+            time = reminder_data.get('time', '')
+            rule = reminder_data.get('recurrence')
+        else:
+            title, date, time, rule = 'your reminder', '', '', None
+
+        if rule:
+            confirmation_msg = f"Perfect! I've set a repeating reminder for '{title}' {recurrence.describe(rule, time)}, starting {date}. I'll make sure to notify you each time."
+        elif date and time:
+            confirmation_msg = f"Perfect! I've set a reminder for '{title}' on {date} at {time}. I'll make sure to notify you when it's time."
+        elif date:
+            confirmation_msg = f"Great! I've set a reminder for '{title}' on {date}. I'll remind you about this."
+        elif time:
+            confirmation_msg = f"Done! I've set a reminder for '{title}' at {time}. You'll get notified when it's time."
+        else:
+            confirmation_msg = f"I've created a reminder for '{title}'. You can view and edit it in your reminders section."
+
+        return {
+            "success": True,
+            "message": confirmation_msg,
+            "emergency_detected": False,
+            "emergency_confidence": 0,
+            "emergency_analysis": None,
+            "reminder_detected": True,
+            "reminder_confidence": reminder_confidence,
+            "reminder_components": reminder_components,
+            "reminder_result": reminder_result
+        }
+    else:
+        # Reminder processing failed, continue with normal AI response but mention the attempt
+        return {
+            "success": False,
+            "message": "Failed to process reminder.",
+            "emergency_detected": False,
+            "emergency_confidence": 0,
+            "emergency_analysis": None,
+            "reminder_detected": True,
+            "reminder_confidence": reminder_confidence,
+            "reminder_components": reminder_components,
+            "reminder_result": reminder_result
+        }
+
+
+
+# Served straight away when Gemini times out or the circuit breaker is open
+LLM_FALLBACK_REPLY = (
+    "I'm sorry, I'm having trouble answering right now. Please try again in a moment. "
+    "If you need urgent help, please use the emergency button or call your local emergency number."
+)
+
+REMINDER_FALLBACK_NOTE = "\n\nI noticed you wanted to set a reminder. You can also use the Reminders section in the app to create reminders manually, or try rephrasing with specific details like 'Remind me to take medicine at 9 AM tomorrow'."
+
+
+def sse_event(event, data):
+    """Formats one Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {pyjson.dumps(data)}\n\n"
+
+
+class SpeculativeStream:
+    """
+    Streams a chat reply into a buffer on a background thread so tokens are ready
+    the moment the intent verdict allows them to be sent. cancel() stops the producer
+    before the Gemini call or at the next chunk. The producer runs outside admission
+    control; iterating claims the slot, so only a kept speculation holds one.
+    """
+    _DONE = object()
+
+    def __init__(self, messages):
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._error = None
+        self._future = fanout.submit(self._produce, messages)
+
+    def _produce(self, messages):
+        stream = None
+        try:
+            # Discarded before a worker picked it up: never call Gemini
+            if self._cancelled.is_set():
+                return
+            with admission.deferred():
+                stream = llm_client.chat.completions.create(messages=messages, stream=True, call_site="chat")
+                for chunk in stream:
+                    if self._cancelled.is_set():
+                        metrics.incr("chat.speculation.stopped")
+                        break
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        self._queue.put(text)
+        except Exception as e:
+            # Re-raised on the consuming side as an LLMError so the route can fall back;
+            # anything else (bad payload, SDK network error) would end the stream silently
+            self._error = classify_error(e)
+            metrics.incr(f"chat.speculation.errors.{type(self._error).__name__}")
+        finally:
+            # Closing the generator drops the upstream response instead of reading it to the end
+            if stream is not None:
+                stream.close()
+            self._queue.put(self._DONE)
+
+    def cancel(self):
+        self._cancelled.set()
+        self._future.cancel()
+
+    def __iter__(self):
+        try:
+            with llm_client.admission.slot():
+                while True:
+                    text = self._queue.get()
+                    if text is self._DONE:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    yield text
+        finally:
+            # Shed by admission or the client went away: stop the producer as well
+            self.cancel()
+
+
+def stream_chat_reply(messages):
+    """Yields reply text pieces straight from the streaming completion."""
+    for chunk in llm_client.chat.completions.create(messages=messages, stream=True, call_site="chat"):
+        text = chunk.choices[0].delta.content
+        if text:
+            yield text
+
+def load_turn_context(data, user_id):
+    """
+    History and prompt context for one chat turn. Clients that send only sessionId get
+    their history assembled server-side from the session store; a chatHistory array is
+    still accepted from older clients. Returns (chat_history, context, session or None).
+    """
+    session_id = data.get('sessionId')
+    if data.get('chatHistory') is not None or not session_id:
+        chat_history = data.get('chatHistory') or []
+        return chat_history, conversation.prepare_context(chat_sessions(), session_id, user_id, chat_history), None
+
+    session = session_store.get_session(chat_sessions(), chat_messages(), session_id, user_id)
+    stored = session["messages"] if session else []
+    # The client may already have persisted the message being answered
+    message_id = data.get('messageId')
+    if message_id:
+        stored = [m for m in stored if not (isinstance(m, dict) and m.get('id') == message_id)]
+    chat_history = session_store.to_chat_history(stored)
+    summary = session["summary"] if session else None
+    return chat_history, conversation.prepare_context(chat_sessions(), session_id, user_id, chat_history, summary), session
+
+
+def record_turn(data, user_id, session, user_message, reply):
+    """
+    Appends the user message and reply to a server-assembled session as one sequenced
+    append. Returns {"messageId", "lastSeq"} for the reply (both None when nothing was recorded).
+    """
+    recorded = {"messageId": None, "lastSeq": None}
+    if session is None:
+        return recorded
+    session_id = data.get('sessionId')
+    message_id = data.get('messageId')
+    ai_message = session_store.new_message(reply, is_user=False)
+    try:
+        for _ in range(session_store.SESSION_APPEND_RETRIES):
+            # The client may have appended the user message itself while the reply was generated
+            known_ids = {m.get('id') for m in session["messages"] if isinstance(m, dict)}
+            new_messages = [ai_message] if message_id in known_ids else [
+                session_store.new_message(user_message, is_user=True, message_id=message_id), ai_message]
+            result = session_store.append_messages(
+                chat_sessions(), chat_messages(), session_id, user_id, new_messages, session["lastSeq"])
+            if result is None:
+                return recorded
+            if not result.get("conflict"):
+                return {"messageId": ai_message["id"], "lastSeq": result["lastSeq"]}
+            session = session_store.get_session(chat_sessions(), chat_messages(), session_id, user_id)
+            if session is None:
+                return recorded
+    except PyMongoError:
+        metrics.incr("session_cache.append_errors")
+    return recorded
+
+# ================== END CHAT REPLY HELPERS ==================
+
+
 # ================= Route Definitions =================
 
 @chat_bp.route("/loadChat", methods=["GET"])
 def load_chat_sessions():
     user_id = request.args.get("userId")
-    sessions = list(chat_sessions_col.find({"userId": user_id}))
-    for s in sessions:
-        fix_id(s)
+    # Session summaries only; messages are paged in from /loadChat/<session_id>/messages
+    sessions = [fix_id(s) for s in session_store.list_sessions(chat_sessions(), user_id)]
     # Find current session and session counter if you store them
     current_session_id = sessions[0]["id"] if sessions else None
     session_counter = len(sessions) + 1
+    # The newest page of the session shown first, saving the client a round trip
+    current_messages = session_store.message_page(
+        chat_sessions(), chat_messages(), current_session_id, user_id) if current_session_id else None
     return jsonify({
         "success": True,
         "sessions": sessions,
         "currentSessionId": current_session_id,
-        "sessionCounter": session_counter
+        "sessionCounter": session_counter,
+        "currentMessages": current_messages
     })
 
+@chat_bp.route("/loadChat/<session_id>/messages", methods=["GET"])
+def load_session_messages(session_id):
+    """
+    One page of a session's messages, oldest first. Pass the returned nextCursor as
+    before= to fetch the page preceding it; nextCursor is null on the oldest page.
+    """
+    user_id = request.args.get("userId")
+    try:
+        before = int(request.args["before"]) if request.args.get("before") else None
+        limit = int(request.args.get("limit", session_store.CHAT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"success": False, "error": "before and limit must be integers"}), 400
+    page = session_store.message_page(chat_sessions(), chat_messages(), session_id, user_id, before, limit)
+    if page is None:
+        return jsonify({"success": False, "error": "Session not found"}), 404
+    return jsonify({"success": True, **page})
+
 @chat_bp.route("/saveChat", methods=["PUT"])
 def save_chat_sessions():
     data = request.json
     user_id = data.get("userId") if data is not None else None
     sessions = data.get("sessions", []) if data is not None else []
-    # Remove all old sessions for this user
-    if user_id is not None:
-        chat_sessions_col.delete_many({"userId": user_id})
-    # Insert new sessions
-    for session in sessions:
-        session_id = session["id"] if session is not None and "id" in session and session["id"] is not None else None
-        session["_id"] = ObjectId(session_id) if session_id is not None else ObjectId()
-        session["userId"] = user_id
-        chat_sessions_col.replace_one({"_id": session["_id"]}, session, upsert=True)
-    return jsonify({"success": True})
+    # Write only the sessions that changed or were removed, in one ordered bulk_write
+    try:
+        result = session_store.sync_sessions(chat_sessions(), chat_messages(), user_id, sessions)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, **result})
 
 @chat_bp.route("/createChat", methods=["POST"])
 def create_chat_session():
@@ -556,13 +628,14 @@ def create_chat_session():
     user_id = data.get("userId") if data is not None else None
     session = {
         "name": session_name,
-        "messages": [],
         "createdAt": datetime.utcnow().isoformat(),
         "lastActivity": datetime.utcnow().isoformat(),
         "messageCount": 0,
+        "rev": 0,
+        "lastSeq": 0,
         "userId": user_id
     }
-    result = chat_sessions_col.insert_one(session)
+    result = chat_sessions().insert_one(session)
     session["id"] = str(result.inserted_id)
     session["_id"] = result.inserted_id
     return jsonify({"success": True, "session": fix_id(session)})
@@ -572,31 +645,47 @@ def update_session_messages(session_id):
     data = request.json
     messages = data.get("messages", []) if data is not None else []
     user_id = data.get("userId") if data is not None else None
-    result = chat_sessions_col.update_one(
-        {"_id": ObjectId(session_id), "userId": user_id},
-        {"$set": {
-            "messages": messages,
-            "lastActivity": datetime.utcnow().isoformat(),
-            "messageCount": len(messages)
-        }}
-    )
-    return jsonify({"success": result.modified_count > 0})
+    # Full replacement for older clients; new ones append deltas to /appendMessages
+    last_seq = session_store.replace_messages(chat_sessions(), chat_messages(), session_id, user_id, messages)
+    return jsonify({"success": last_seq is not None, "lastSeq": last_seq})
+
+@chat_bp.route("/appendMessages/<session_id>/messages", methods=["POST"])
+def append_session_messages(session_id):
+    """
+    Appends only new messages. lastSeq is the sequence number the client last saw;
+    a write based on an older (or newer) one is rejected with 409 and the current lastSeq.
+    """
+    data = request.json or {}
+    messages = data.get("messages")
+    last_seq = data.get("lastSeq", 0)
+    if (not isinstance(messages, list) or not messages or len(messages) > session_store.SESSION_APPEND_MAX
+            or not all(isinstance(m, dict) for m in messages)):
+        return jsonify({"success": False, "error": f"messages must be a list of 1-{session_store.SESSION_APPEND_MAX} message objects"}), 400
+    if not isinstance(last_seq, int) or isinstance(last_seq, bool) or last_seq < 0:
+        return jsonify({"success": False, "error": "lastSeq must be a non-negative integer"}), 400
+
+    result = session_store.append_messages(
+        chat_sessions(), chat_messages(), session_id, data.get("userId"), messages, last_seq)
+    if result is None:
+        return jsonify({"success": False, "error": "Session not found"}), 404
+    if result.get("conflict"):
+        return jsonify({"success": False, "error": "Out-of-order append", "lastSeq": result["lastSeq"], "ids": result["ids"]}), 409
+    return jsonify({"success": True, "lastSeq": result["lastSeq"], "messageCount": result["messageCount"],
+                    "seqs": [m["seq"] for m in result["messages"]]})
 
 @chat_bp.route("/deleteChat/<session_id>", methods=["DELETE"])
 def delete_chat_session(session_id):
     user_id = request.args.get("userId")
-    chat_sessions_col.delete_one({"_id": ObjectId(session_id), "userId": user_id})
-    # Return remaining sessions for this user
-    sessions = list(chat_sessions_col.find({"userId": user_id}))
-    for s in sessions:
-        fix_id(s)
+    session_store.delete_session(chat_sessions(), chat_messages(), session_id, user_id)
+    # Return remaining sessions for this user (summaries, as /loadChat does)
+    sessions = [fix_id(s) for s in session_store.list_sessions(chat_sessions(), user_id)]
     return jsonify({"success": True, "remainingSessions": sessions})
 
 @chat_bp.route("/updateActivity/<session_id>/activity", methods=["PATCH"])
 def update_session_activity(session_id):
     data = request.json
     user_id = data.get("userId") if data is not None else None
-    result = chat_sessions_col.update_one(
+    result = chat_sessions().update_one(
         {"_id": ObjectId(session_id), "userId": user_id},
         {"$set": {"lastActivity": datetime.utcnow().isoformat()}}
     )
@@ -607,185 +696,181 @@ def send_message():
     data = request.get_json()
     user_message = data.get('input') if data is not None else None
     user_id = data.get('userId') if data is not None else None
-    chat_history = data.get('chatHistory', []) if data is not None else []  # Get chat history for context
-    session_id = data.get('sessionId', None) if data is not None else None  # Get session ID for context
     
     if not user_message or not user_id:
         return jsonify({"error": "No message provided"}), 400
-        
-    
-    # Emergency sentiment analysis
-    is_emergency, emergency_confidence, emergency_analysis = analyze_emergency_intent(
-        user_message)
 
-    # Reminder intent analysis
-    is_reminder_request, reminder_confidence, reminder_components = analyze_reminder_intent(
-        user_message)
+    # Tag every LLM call made for this message (including worker-thread stages) for admission control
+    with admission.request_scope(user_id, message_priority(user_message)):
+        # History from the session (or legacy chatHistory) as a rolling summary plus a token-budgeted tail
+        chat_history, context, session = load_turn_context(data, user_id)
+
+        # Speculatively start the common-case reply while the classifier runs.
+        # Tone comes from local TextBlob sentiment since the LLM verdict isn't known yet.
+        # Skipped when upstream is saturated so a guess never competes with real calls.
+        speculative_reply = None
+        if start_speculation():
+            local_polarity = TextBlob(user_message).sentiment.polarity  # type: ignore
+            speculative_prompt = build_system_prompt(
+                chat_history, emotion_instruction=emotion_instruction_for(local_polarity))
+            speculative_reply = SpeculativeStream(build_chat_messages(speculative_prompt, context, user_message))
+
+        # Emergency, reminder and sentiment analysis, concurrently under one deadline
+        intent, stage_timings, late_stages = classify_message(user_message)
+        is_emergency, emergency_confidence, emergency_analysis = intent["emergency"]
+        is_reminder_request, reminder_confidence, reminder_components = intent["reminder"]
+        # An unresolved emergency verdict still gets the careful emergency prompt
+        use_emergency_prompt = is_emergency or intent["emergency_unresolved"]
+
+        # Sentiment for response tone - the LLM polarity when available, else TextBlob
+        emotion_instruction = emotion_instruction_for(intent["sentiment"]["polarity"])
+
+        # Handle reminder requests first (before emergency, as reminders are specific intent)
+        reminder_result = None
+        # Lowered from 0.4 to 0.2 for more lenient detection
+        if is_reminder_request and reminder_confidence > 0.2:
+            discard_speculation(speculative_reply, "reminder")
+
+            # Call format reminder API
+            reminder_result = setup_reminder(user_message, user_id)
+            payload = reminder_response(reminder_result, reminder_confidence, reminder_components)
+            payload.update(record_turn(data, user_id, session, user_message, payload["message"]))
+            return with_stage_timings(jsonify(payload), stage_timings, late_stages)
+
+        # Reuse the speculative reply unless the emergency or reminder-failed prompt is required
+        if speculative_reply is not None and (use_emergency_prompt or is_reminder_request):
+            discard_speculation(speculative_reply, "emergency" if use_emergency_prompt else "reminder_failed")
+            speculative_reply = None
 
-    # Regular sentiment analysis for response tone
-    blob = TextBlob(user_message)
-    polarity = blob.sentiment.polarity  # type: ignore
-    if polarity > 0.1:
-        emotion_instruction = "The user seems happy or positive. You can reply in an encouraging and friendly tone."
-    elif polarity < -0.1:
-        emotion_instruction = "The user seems upset or worried. Please reply with extra empathy and reassurance."
-    else:
-        emotion_instruction = ""
-
-    # Handle reminder requests first (before emergency, as reminders are specific intent)
-    reminder_result = None
-    # Lowered from 0.4 to 0.2 for more lenient detection
-    if is_reminder_request and reminder_confidence > 0.2:
-        # Call format reminder API
-        reminder_result = setup_reminder(user_message, user_id)
-
-        if reminder_result and reminder_result.get('success'):
-            # Successful reminder creation
-            reminder_data = reminder_result.get(
-                'reminder') or reminder_result.get('reminders', [])
-            # If it's a list, take the first dict
-            if isinstance(reminder_data, list) and len(reminder_data) > 0:
-                first = reminder_data[0]
-                if isinstance(first, dict):
-                    title = first.get('title', 'your reminder')
-                    date = first.get('date', '')
-                    time = first.get('time', '')
-                else:
-                    title, date, time = 'your reminder', '', ''
-            elif isinstance(reminder_data, dict):
-                title = reminder_data.get('title', 'your reminder')
-                date = reminder_data.get('date', '')
-                time = reminder_data.get('time', '')
-            else:
-                title, date, time = 'your reminder', '', ''
-
-            if date and time:
-                confirmation_msg = f"Perfect! I've set a reminder for '{title}' on {date} at {time}. I'll make sure to notify you when it's time."
-            elif date:
-                confirmation_msg = f"Great! I've set a reminder for '{title}' on {date}. I'll remind you about this."
-            elif time:
-                confirmation_msg = f"Done! I've set a reminder for '{title}' at {time}. You'll get notified when it's time."
+        try:
+            if speculative_reply is not None:
+                reply = finalize_reply("".join(speculative_reply))
+                metrics.incr("chat.speculation.used")
             else:
-                confirmation_msg = f"I've created a reminder for '{title}'. You can view and edit it in your reminders section."
-
-            return jsonify({
-                "success": True,
-                "message": confirmation_msg,
-                "emergency_detected": False,
-                "emergency_confidence": 0,
-                "emergency_analysis": None,
-                "reminder_detected": True,
-                "reminder_confidence": reminder_confidence,
-                "reminder_components": reminder_components,
-                "reminder_result": reminder_result
-            })
-        else:
-            # Reminder processing failed, continue with normal AI response but mention the attempt
-            return jsonify({
-                "success": False,
-                "message": "Failed to process reminder.",
-                "emergency_detected": False,
-                "emergency_confidence": 0,
-                "emergency_analysis": None,
-                "reminder_detected": True,
-                "reminder_confidence": reminder_confidence,
-                "reminder_components": reminder_components,
-                "reminder_result": reminder_result
-            })
-
-    # Modify system prompt based on emergency detection or reminder context
-    base_context = ""
-    if chat_history and len(chat_history) > 0:
-        base_context = f" You are in an ongoing conversation with the user. Remember the context from previous messages in this session to provide more personalized and coherent responses. This is message #{len(chat_history) + 1} in the current session."
-    
-    if is_emergency:
-        system_prompt = SYSTEM_PROMPT + base_context + " IMPORTANT: The user's message has been detected as a potential emergency situation. Respond with immediate care, empathy, and appropriate guidance while being supportive and calm."
-    elif is_reminder_request and not reminder_result:
-        system_prompt = SYSTEM_PROMPT + base_context + " The user seems to want to set a reminder but the automatic processing failed. Politely acknowledge this and suggest they can use the reminders section or try rephrasing with more specific details like date, time, and task."
-    else:
-        system_prompt = SYSTEM_PROMPT + base_context + \
-            (f" {emotion_instruction}" if emotion_instruction else "")
+                system_prompt = build_system_prompt(
+                    chat_history,
+                    is_emergency=use_emergency_prompt,
+                    reminder_failed=is_reminder_request and not reminder_result,
+                    emotion_instruction=emotion_instruction,
+                )
+                reply = generate_chat_reply(build_chat_messages(system_prompt, context, user_message))
+        except LLMError:
+            # Upstream timed out or the breaker is open - answer now instead of waiting on Gemini
+            reply = LLM_FALLBACK_REPLY
+            metrics.incr("chat.fallback_reply")
+
+        # Add reminder context to response if reminder was attempted but failed
+        if is_reminder_request and not reminder_result:
+            reply += REMINDER_FALLBACK_NOTE
+
+        recorded = record_turn(data, user_id, session, user_message, reply)
+
+        return with_stage_timings(jsonify({
+            "success": True,
+            "message": reply,
+            **recorded,
+            "emergency_detected": is_emergency,
+            "emergency_confidence": emergency_confidence,
+            "emergency_analysis": emergency_analysis,
+            "reminder_detected": is_reminder_request,
+            "reminder_confidence": reminder_confidence,
+            "reminder_components": reminder_components,
+            "reminder_result": reminder_result
+        }), stage_timings, late_stages)
+
+
+@chat_bp.route('/chat/message/stream', methods=['POST'])
+def stream_message():
+    """
+    Streaming variant of /chat/message. Emits Server-Sent Events:
+    'token' events with reply text as it is generated, then one 'done' event
+    carrying the emergency and reminder metadata (same fields as /chat/message).
+    """
+    data = request.get_json()
+    user_message = data.get('input') if data is not None else None
+    user_id = data.get('userId') if data is not None else None
 
-    # Build messages array with chat history for context
-    messages = [{"role": "system", "content": system_prompt}]
-    
-    # Add chat history for context (limit to last 10 messages to avoid token limits)
-    if chat_history and len(chat_history) > 0:
-        # Take the last 10 messages to maintain recent context while staying within token limits
-        recent_history = chat_history[-10:] if len(chat_history) > 10 else chat_history
-        
-        for msg in recent_history:
-            # Ensure the message has proper role and content
-            if msg is not None and isinstance(msg, dict) and msg.get('role') in ['user', 'assistant'] and msg.get('content'):
-                messages.append({
-                    "role": msg['role'],
-                    "content": msg['content']
-                })
-    
-    # Add the current user message
-    messages.append({"role": "user", "content": user_message})
+    if not user_message or not user_id:
+        return jsonify({"error": "No message provided"}), 400
 
-    response = llm_client.chat.completions.create(
-        model=GEMINI_MODEL,
-        messages=messages
+    # Start streaming the common-case reply into a buffer while the classifier runs
+    priority = message_priority(user_message)
+    chat_history, context, session = load_turn_context(data, user_id)
+    speculative = None
+    if start_speculation(priority):
+        local_polarity = TextBlob(user_message).sentiment.polarity  # type: ignore
+        speculative_prompt = build_system_prompt(
+            chat_history, emotion_instruction=emotion_instruction_for(local_polarity))
+        with admission.request_scope(user_id, priority):
+            speculative = SpeculativeStream(build_chat_messages(speculative_prompt, context, user_message))
+
+    def generate():
+        with admission.request_scope(user_id, priority):
+            yield from generate_events()
+
+    def generate_events():
+        intent, _, _ = classify_message(user_message)
+        is_emergency, emergency_confidence, emergency_analysis = intent["emergency"]
+        is_reminder_request, reminder_confidence, reminder_components = intent["reminder"]
+        use_emergency_prompt = is_emergency or intent["emergency_unresolved"]
+
+        if is_reminder_request and reminder_confidence > 0.2:
+            discard_speculation(speculative, "reminder")
+            reminder_result = setup_reminder(user_message, user_id)
+            payload = reminder_response(reminder_result, reminder_confidence, reminder_components)
+            yield sse_event("token", {"content": payload["message"]})
+            payload.update(record_turn(data, user_id, session, user_message, payload["message"]))
+            yield sse_event("done", payload)
+            return
+
+        if speculative is not None and not (use_emergency_prompt or is_reminder_request):
+            pieces = speculative
+            metrics.incr("chat.speculation.used")
+        else:
+            discard_speculation(speculative, "emergency" if use_emergency_prompt else "reminder_failed")
+            system_prompt = build_system_prompt(
+                chat_history,
+                is_emergency=use_emergency_prompt,
+                reminder_failed=is_reminder_request,
+                emotion_instruction=emotion_instruction_for(intent["sentiment"]["polarity"]),
+            )
+            pieces = stream_chat_reply(build_chat_messages(system_prompt, context, user_message))
+
+        sent = []
+        with metrics.timed("chat.stream.total"):
+            started = time.perf_counter()
+            first = True
+            try:
+                for text in pieces:
+                    if first:
+                        metrics.observe("chat.stream.first_token", time.perf_counter() - started)
+                        first = False
+                    sent.append(text)
+                    yield sse_event("token", {"content": text})
+            except LLMError:
+                metrics.incr("chat.fallback_reply")
+                text = LLM_FALLBACK_REPLY if first else "\n\n" + LLM_FALLBACK_REPLY
+                sent.append(text)
+                yield sse_event("token", {"content": text})
+
+        if is_reminder_request:
+            sent.append(REMINDER_FALLBACK_NOTE)
+            yield sse_event("token", {"content": REMINDER_FALLBACK_NOTE})
+
+        yield sse_event("done", {
+            "success": True,
+            **record_turn(data, user_id, session, user_message, "".join(sent)),
+            "emergency_detected": is_emergency,
+            "emergency_confidence": emergency_confidence,
+            "emergency_analysis": emergency_analysis,
+            "reminder_detected": is_reminder_request,
+            "reminder_confidence": reminder_confidence,
+            "reminder_components": reminder_components,
+            "reminder_result": None
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-
-    # --- Robustly extract content from response ---
-    def extract_content(resp):
-        try:
-            # Handle API response object
-            if hasattr(resp, 'choices') and resp.choices:
-                if hasattr(resp.choices[0], 'message') and hasattr(resp.choices[0].message, 'content'):
-                    return resp.choices[0].message.content
-            
-            # Handle dictionary response
-            if isinstance(resp, dict) and 'choices' in resp:
-                choices = resp['choices']
-                if isinstance(choices, list) and choices:
-                    msg = choices[0].get('message')
-                    if isinstance(msg, dict):
-                        return msg.get('content', '')
-                    elif isinstance(msg, str):
-                        return msg
-            
-            # Handle string response directly
-            if isinstance(resp, str):
-                return resp
-                
-            # Handle iterable response (streaming)
-            if hasattr(resp, '__iter__') and not isinstance(resp, dict) and not isinstance(resp, str):
-                try:
-                    return ''.join([getattr(chunk, 'content', str(chunk)) for chunk in resp if chunk])
-                except Exception:
-                    return str(list(resp))
-            
-            # Fallback
-            return str(resp)
-        except Exception as e:
-            
-            return "I apologize, but I encountered an error processing your request. Please try again."
-
-    reply = extract_content(response)
-    if not isinstance(reply, str):
-        reply = str(reply)
-    reply = reply.strip()
-    
-    # Ensure we have a valid response
-    if not reply:
-        reply = "I apologize, but I didn't receive a proper response. Please try again."
-
-    # Add reminder context to response if reminder was attempted but failed
-    if is_reminder_request and not reminder_result:
-        reply += "\n\nI noticed you wanted to set a reminder. You can also use the Reminders section in the app to create reminders manually, or try rephrasing with specific details like 'Remind me to take medicine at 9 AM tomorrow'."
-
-    return jsonify({
-        "success": True,
-        "message": reply,
-        "emergency_detected": is_emergency,
-        "emergency_confidence": emergency_confidence,
-        "emergency_analysis": emergency_analysis,
-        "reminder_detected": is_reminder_request,
-        "reminder_confidence": reminder_confidence,
-        "reminder_components": reminder_components,
-        "reminder_result": reminder_result
-    })
@@ -0,0 +1,268 @@
+# ================== Async Chat & Reminder Routes ==================
+# ASGI implementation of /chat/message and /format-reminder. Gemini calls use the
+# google.genai aio surface and reminder writes use the shared AsyncMongoClient, so
+# one worker process can hold many in-flight conversations. Chat session reads and
+# writes reuse the sync session_store helpers from ask_query and run on worker
+# threads (asyncio.to_thread) to stay off the event loop. Served by async_app.py.
+from quart import Blueprint, request, jsonify
+from textblob import TextBlob
+from datetime import datetime
+from dotenv import load_dotenv
+
+from routes.utils import metrics, admission, recurrence, mongo
+from routes.utils.llm_resilience import LLMError
+from routes.utils.reminder_parser import try_parse_locally
+from routes.utils.ai_utils import (
+    analyze_emergency_intent_async,
+    analyze_message_intent_async,
+    analyze_reminder_intent_async,
+    parse_reminder_from_text_async,
+    llm_client,
+    REMINDER_LIST_SCHEMA,
+)
+from routes.format_reminder import (
+    apply_reminder_defaults,
+    convert_to_json_friendly,
+    get_dynamic_date_context_for_reminder,
+)
+from routes.ask_query import (
+    INTENT_MODE,
+    INTENT_DEADLINE_MS,
+    REMINDER_FALLBACK_NOTE,
+    LLM_FALLBACK_REPLY,
+    message_priority,
+    build_chat_messages,
+    build_system_prompt,
+    combine_intent,
+    discard_speculation,
+    start_speculation,
+    emotion_instruction_for,
+    finalize_reply,
+    intent_stage_defaults,
+    load_turn_context,
+    record_turn,
+    reminders_from_parsed,
+    prepare_inferred_reminders,
+    reminder_response,
+    reminder_setup_messages,
+    textblob_polarity,
+    with_stage_timings,
+)
+from routes.utils import fanout
+
+import asyncio
+import time
+
+# Load environment variables
+load_dotenv()
+
+async_chat_bp = Blueprint('async_chat', __name__)
+
+
+def get_async_reminders_collection():
+    """Reminders collection on the shared async Mongo client (created inside the running event loop)."""
+    return mongo.async_collection("REMINDERS_COLLECTION")
+
+
+async def save_to_mongodb_async(reminder):
+    """Async counterpart of format_reminder.save_to_mongodb()."""
+    reminders_collection = get_async_reminders_collection()
+    if reminders_collection is None:
+        raise RuntimeError("Reminders collection is not initialized.")
+    reminder_to_save = recurrence.attach(reminder)
+    now = datetime.now()
+    reminder_to_save['created_at'] = now
+    reminder_to_save['updated_at'] = now
+    result = await reminders_collection.insert_one(reminder_to_save)
+
+    json_safe_reminder = convert_to_json_friendly(reminder_to_save)
+    if isinstance(json_safe_reminder, dict):
+        json_safe_reminder['id'] = str(result.inserted_id)
+    return json_safe_reminder
+
+
+async def generate_chat_reply_async(messages):
+    response = await llm_client.chat.completions.acreate(messages=messages, call_site="chat")
+    return finalize_reply(response)
+
+
+async def speculate_chat_reply_async(messages):
+    """generate_chat_reply_async() outside admission control; the caller claims the slot if it keeps the reply."""
+    with admission.deferred():
+        return await generate_chat_reply_async(messages)
+
+
+async def setup_reminder_async(user_input, user_id):
+    """Async counterpart of ask_query.setup_reminder()."""
+    try:
+        local_reminders = try_parse_locally(user_input)
+        if local_reminders:
+            kind, parsed = 'many', local_reminders
+        else:
+            response = await llm_client.chat.completions.acreate(
+                messages=reminder_setup_messages(user_input),
+                call_site="parse_reminder",
+                response_schema=REMINDER_LIST_SCHEMA,
+            )
+            message = response.choices[0].message
+            kind, parsed = reminders_from_parsed(message.parsed, message.content)
+
+        if kind == 'many':
+            results = [await save_to_mongodb_async(r) for r in prepare_inferred_reminders(parsed, user_id)]
+            return {"success": True, "reminders": results, "count": len(results)}
+        return parsed
+    except Exception as e:
+
+        return {"error": str(e)}
+
+
+async def run_stages_async(stages, deadline, defaults):
+    """asyncio counterpart of fanout.run_stages(): stages are coroutines, late ones get defaults."""
+    started = time.perf_counter()
+    durations = {}
+
+    async def run(name, coro):
+        t0 = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            durations[name] = time.perf_counter() - t0
+
+    tasks = {name: asyncio.create_task(run(name, coro)) for name, coro in stages.items()}
+    await asyncio.wait(tasks.values(), timeout=deadline)
+    return fanout.collect(tasks, durations, started, defaults)
+
+
+async def classify_message_async(user_message):
+    """Async counterpart of ask_query.classify_message()."""
+    sentiment = asyncio.to_thread(textblob_polarity, user_message)
+    if INTENT_MODE == "fanout":
+        stages = {
+            "emergency": analyze_emergency_intent_async(user_message),
+            "reminder": analyze_reminder_intent_async(user_message),
+            "sentiment": sentiment,
+        }
+    else:
+        stages = {"intent": analyze_message_intent_async(user_message), "sentiment": sentiment}
+
+    results, timings, late = await run_stages_async(stages, INTENT_DEADLINE_MS / 1000.0, intent_stage_defaults())
+    return combine_intent(results, late), timings, late
+
+
+@async_chat_bp.route('/chat/message', methods=['POST'])
+async def send_message_async():
+    data = await request.get_json()
+    user_message = data.get('input') if data is not None else None
+    user_id = data.get('userId') if data is not None else None
+
+    if not user_message or not user_id:
+        return jsonify({"error": "No message provided"}), 400
+
+    admission.tag_task(user_id, message_priority(user_message))
+    # Session and summary lookups use the sync chat_sessions collection, so keep them off the event loop
+    chat_history, context, session = await asyncio.to_thread(load_turn_context, data, user_id)
+
+    # Speculatively start the common-case reply while the classifier runs (not when upstream is saturated).
+    # Cancelling the task aborts the in-flight aio request.
+    speculative_reply = None
+    if start_speculation():
+        local_polarity = TextBlob(user_message).sentiment.polarity  # type: ignore
+        speculative_prompt = build_system_prompt(
+            chat_history, emotion_instruction=emotion_instruction_for(local_polarity))
+        speculative_reply = asyncio.create_task(
+            speculate_chat_reply_async(build_chat_messages(speculative_prompt, context, user_message)))
+
+    intent, stage_timings, late_stages = await classify_message_async(user_message)
+    is_emergency, emergency_confidence, emergency_analysis = intent["emergency"]
+    is_reminder_request, reminder_confidence, reminder_components = intent["reminder"]
+    use_emergency_prompt = is_emergency or intent["emergency_unresolved"]
+
+    reminder_result = None
+    if is_reminder_request and reminder_confidence > 0.2:
+        discard_speculation(speculative_reply, "reminder")
+        reminder_result = await setup_reminder_async(user_message, user_id)
+        payload = reminder_response(reminder_result, reminder_confidence, reminder_components)
+        payload.update(await asyncio.to_thread(
+            record_turn, data, user_id, session, user_message, payload["message"]))
+        return with_stage_timings(jsonify(payload), stage_timings, late_stages)
+
+    # Reuse the speculative reply unless the emergency or reminder-failed prompt is required
+    if speculative_reply is not None and (use_emergency_prompt or is_reminder_request):
+        discard_speculation(speculative_reply, "emergency" if use_emergency_prompt else "reminder_failed")
+        speculative_reply = None
+
+    try:
+        if speculative_reply is not None:
+            try:
+                async with llm_client.admission.aslot():
+                    reply = await speculative_reply
+            finally:
+                speculative_reply.cancel()
+            metrics.incr("chat.speculation.used")
+        else:
+            system_prompt = build_system_prompt(
+                chat_history,
+                is_emergency=use_emergency_prompt,
+                reminder_failed=is_reminder_request,
+                emotion_instruction=emotion_instruction_for(intent["sentiment"]["polarity"]),
+            )
+            reply = await generate_chat_reply_async(build_chat_messages(system_prompt, context, user_message))
+    except LLMError:
+        reply = LLM_FALLBACK_REPLY
+        metrics.incr("chat.fallback_reply")
+
+    if is_reminder_request:
+        reply += REMINDER_FALLBACK_NOTE
+
+    recorded = await asyncio.to_thread(record_turn, data, user_id, session, user_message, reply)
+
+    return with_stage_timings(jsonify({
+        "success": True,
+        "message": reply,
+        **recorded,
+        "emergency_detected": is_emergency,
+        "emergency_confidence": emergency_confidence,
+        "emergency_analysis": emergency_analysis,
+        "reminder_detected": is_reminder_request,
+        "reminder_confidence": reminder_confidence,
+        "reminder_components": reminder_components,
+        "reminder_result": reminder_result
+    }), stage_timings, late_stages)
+
+
+@async_chat_bp.route('/format-reminder', methods=['POST'])
+async def format_reminder_async():
+    data = await request.get_json()
+    if not data:
+        return jsonify({"error": "No input provided. Please send JSON with 'input' and 'userId' fields."}), 400
+    user_input = data.get('input', '')
+    user_id = data.get('userId')
+    if not user_input:
+        return jsonify({"error": "No input provided. Please send JSON with 'input' field."}), 400
+    if not user_id:
+        return jsonify({"error": "No userId provided. Please send JSON with 'userId' field."}), 400
+    if get_async_reminders_collection() is None:
+        return jsonify({"error": "Reminders collection is not initialized due to missing environment variables."}), 500
+
+    parsed = try_parse_locally(user_input)
+    if not parsed:
+        try:
+            with admission.request_scope(user_id, admission.BACKGROUND):
+                reminders, content = await parse_reminder_from_text_async(
+                    user_input, date_context=get_dynamic_date_context_for_reminder())
+        except LLMError as e:
+            return jsonify({"error": "Reminder assistant is temporarily unavailable. Please try again shortly.", "details": str(e)}), 503
+        kind, parsed = reminders_from_parsed(reminders, content)
+        if kind is None:
+            return jsonify(parsed), 400
+
+    try:
+        results = []
+        for reminder in parsed:
+            reminder = apply_reminder_defaults(reminder)
+            results.append(await save_to_mongodb_async(
+                {"userId": user_id, "title": reminder['title'], "date": reminder['date'], "time": reminder['time'],
+                 "recurrence": reminder.get('recurrence')}))
+    except Exception as e:
+        return jsonify({"error": "Failed to process reminders", "details": str(e)}), 400
+    return jsonify({"success": True, "reminders": results, "count": len(results), "errors": None})
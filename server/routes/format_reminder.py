@@ -1,14 +1,10 @@
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 from bson import ObjectId
-from datetime import datetime, timedelta
+from datetime import datetime
 from dateutil.parser import parse as parse_datetime
 from dotenv import load_dotenv
 
-import json as pyjson
-
-import re
 import json
 import os
 
@@ -55,146 +51,45 @@ def convert_to_json_friendly(document):
     return result
 
 
-# Initialize MongoDB connection settings
-
-mongo_url = os.environ.get('MONGO_URI')
-db_name = os.environ.get('DB_NAME')
-reminders_collection_name = os.environ.get('REMINDERS_COLLECTION')
-
 # Use shared AI helpers from the centralized utils module
 from routes.utils.ai_utils import parse_reminder_from_text
+from routes.utils.reminder_parser import try_parse_locally
+from routes.utils.llm_resilience import LLMError
+from routes.utils import admission, date_context, reminder_defaults, recurrence, metrics, mongo
 
-# Initialize MongoDB client
-if mongo_url and db_name and reminders_collection_name:
-    mongo_client = MongoClient(mongo_url)
-    db = mongo_client[db_name]
-    reminders_collection = db[reminders_collection_name]
-else:
-    mongo_client = None
-    db = None
-    reminders_collection = None
+
+def get_reminders_collection():
+    """Reminders collection from the shared Mongo registry; None when not configured."""
+    return mongo.collection("REMINDERS_COLLECTION")
 
 
 def get_dynamic_date_context_for_reminder():
     """
-    Generate dynamic date and time context for the AI reminder system
+    Dynamic date and time context for the AI reminder system (cached per minute by date_context)
     """
-    now = datetime.now()
-    today = now.strftime("%Y-%m-%d")
-    tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
-    yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # Get day names for the next 7 days
-    days_ahead = {}
-    for i in range(7):
-        future_date = now + timedelta(days=i)
-        day_name = future_date.strftime("%A").lower()
-        date_str = future_date.strftime("%Y-%m-%d")
-        days_ahead[day_name] = date_str
-
-    # Get current time info
-    current_time = now.strftime("%H:%M")
-    current_hour = now.hour
-
-    # Determine time of day
-    if 5 <= current_hour < 12:
-        time_of_day = "morning"
-        suggested_time = "9:00 AM"
-    elif 12 <= current_hour < 17:
-        time_of_day = "afternoon"
-        suggested_time = "3:00 PM"
-    elif 17 <= current_hour < 21:
-        time_of_day = "evening"
-        suggested_time = "7:00 PM"
-    else:
-        time_of_day = "night"
-        suggested_time = "8:00 PM"
-
-    context = f"""
-CURRENT DATE & TIME CONTEXT (Use this for intelligent date/time inference):
-
-Current Information:
-- Today is: {today} ({now.strftime("%A")})
-- Tomorrow is: {tomorrow} ({(now + timedelta(days=1)).strftime("%A")})
-- Current time: {current_time} ({time_of_day})
-
-Day Name Mappings:
-- Today ({now.strftime("%A").lower()}): {today}
-- Tomorrow ({(now + timedelta(days=1)).strftime("%A").lower()}): {tomorrow}
-""" + "\n".join([f"- {day}: {date}" for day, date in days_ahead.items() if day != now.strftime("%A").lower()]) + f"""
-
-Smart Defaults:
-- If no date specified: use tomorrow for medicine/health, today for general tasks
-- If no time specified: use {suggested_time} (current {time_of_day}) or 9:00 AM for medicine
-- Convert relative dates (today/tomorrow/Monday/etc.) to exact dates using the mapping above
-"""
-
-    return context
+    return date_context.current().reminder_context
 
 
 def get_smart_default_date_for_reminder(title):
     """Get intelligent default date based on reminder title"""
-    now = datetime.now()
-    title_lower = title.lower() if title else ""
-
-    # Medicine/health reminders - suggest tomorrow
-    if any(word in title_lower for word in ['medicine', 'medication', 'pill', 'vitamin', 'drug', 'treatment']):
-        return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # Appointment/meeting - suggest next weekday
-    if any(word in title_lower for word in ['appointment', 'meeting', 'doctor', 'dentist', 'visit']):
-        days_ahead = 1
-        future_date = now + timedelta(days=days_ahead)
-        while future_date.weekday() >= 5:  # Skip weekends
-            days_ahead += 1
-            future_date = now + timedelta(days=days_ahead)
-        return future_date.strftime("%Y-%m-%d")
-
-    # Evening tasks - suggest tomorrow
-    if now.hour >= 18:
-        return (now + timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # Default to today
-    return now.strftime("%Y-%m-%d")
+    return reminder_defaults.default_date(title)
 
 
 def get_smart_default_time_for_reminder(title):
     """Get intelligent default time based on reminder title"""
-    now = datetime.now()
-    title_lower = title.lower() if title else ""
-
-    # Medicine times
-    if any(word in title_lower for word in ['medicine', 'medication', 'pill', 'vitamin']):
-        if 'evening' in title_lower or 'night' in title_lower:
-            return "8:00 PM"
-        return "9:00 AM"
-
-    # Meal times
-    if 'breakfast' in title_lower:
-        return "8:00 AM"
-    elif 'lunch' in title_lower:
-        return "12:00 PM"
-    elif 'dinner' in title_lower:
-        return "7:00 PM"
-
-    # Appointment times
-    if any(word in title_lower for word in ['appointment', 'meeting', 'doctor', 'dentist']):
-        return "10:00 AM"
-
-    # Exercise/workout
-    if any(word in title_lower for word in ['workout', 'exercise', 'gym', 'walk', 'run']):
-        return "7:00 AM"
-
-    # Based on current time of day
-    current_hour = now.hour
-    if 5 <= current_hour < 12:
-        return "9:00 AM"
-    elif 12 <= current_hour < 17:
-        return "3:00 PM"
-    elif 17 <= current_hour < 21:
-        return "7:00 PM"
-    else:
-        return "8:00 PM"
+    return reminder_defaults.default_time(title)
+
+
+def apply_reminder_defaults(reminder):
+    """Fill a missing or null title/date/time in place with the smart defaults."""
+    title = reminder.get('title') or "New Reminder"
+    if not reminder.get('date') or str(reminder.get('date')).lower() in ['null', 'none', '']:
+        reminder['date'] = get_smart_default_date_for_reminder(title)
+    if not reminder.get('time') or str(reminder.get('time')).lower() in ['null', 'none', '']:
+        reminder['time'] = get_smart_default_time_for_reminder(title)
+    if not reminder.get('title'):
+        reminder['title'] = title
+    return reminder
 
 
 def process_reminders(reminders_list, user_id):
@@ -220,6 +115,8 @@ def process_reminders(reminders_list, user_id):
 
             reminder_data = {"userId": user_id,
                              "title": title, "date": date, "time": time}
+            if reminder.get('recurrence'):
+                reminder_data['recurrence'] = reminder['recurrence']
             saved_reminder = save_to_mongodb(reminder_data)
             results.append(saved_reminder)
         except Exception as e:
@@ -259,94 +156,44 @@ def format_reminder():
         return jsonify({"error": "No input provided. Please send JSON with 'input' field."}), 400
     if not user_id:
         return jsonify({"error": "No userId provided. Please send JSON with 'userId' field."}), 400
+    reminders_collection = get_reminders_collection()
     if reminders_collection is None:
         return jsonify({"error": "Reminders collection is not initialized due to missing environment variables."}), 500
 
-    # Instruct the LLM to format the input as a reminder with intelligent date/time handling
-    date_context = get_dynamic_date_context_for_reminder()
-
-    enhanced_system_prompt = f"""You are an expert reminder creation assistant. Parse user input into structured reminders with intelligent date/time inference.
-
-{date_context}
-
-INSTRUCTIONS:
-1. Extract title, date, and time from user input
-2. Use the current date/time context above to convert relative dates accurately
-3. If date is missing, apply intelligent defaults based on reminder type
-4. If time is missing, suggest appropriate default times based on context
-5. Always return a valid JSON array with proper date formats (YYYY-MM-DD) and time formats in 12-hour format (H:MM AM/PM)
-
-Return format: [{{"title": "task description", "date": "YYYY-MM-DD", "time": "H:MM AM/PM"}}]
-
-Examples using context:
-- "remind me medicine" → [{{"title": "take medicine", "date": "{(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')}", "time": "9:00 AM"}}]
-- "appointment tomorrow" → [{{"title": "appointment", "date": "{(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')}", "time": "10:00 AM"}}]
-"""
+    # Common templates are parsed locally without a network call
+    local_reminders = try_parse_locally(user_input)
+    if local_reminders:
+        return process_reminders(local_reminders, user_id)
 
-    # Use shared AI util to get LLM content
-    content = parse_reminder_from_text(user_input, date_context= date_context)
-    if not isinstance(content, str) or not content:
-        return jsonify({"error": "No valid content returned from LLM or AI helper failed."}), 500
-    
+    # Instruct the LLM to format the input as a reminder with intelligent date/time handling
+    reminder_date_context = get_dynamic_date_context_for_reminder()
 
-    # Try to extract an array first - handle markdown code blocks.
+    # Use shared AI util to get schema-constrained reminder JSON
     try:
-        # Look for JSON array in markdown code block or regular text
-        array_match = re.search(
-            r'```(?:json)?\s*(\[[\s\S]*?\])\s*```|(\[[\s\S]*?\])', content) if isinstance(content, str) else None
-        if array_match:
-            # Get the first matching group that's not None
-            array_text = next(
-                group for group in array_match.groups() if group is not None)
-            reminders_array = pyjson.loads(array_text)
-            if isinstance(reminders_array, list) and len(reminders_array) > 0:
-                # Apply intelligent defaults to all reminders in array
-                for r in reminders_array:
-                    title = r.get('title') or "New Reminder"
-                    if not r.get('date') or str(r.get('date')).lower() in ['null', 'none', '']:
-                        r['date'] = get_smart_default_date_for_reminder(title)
-                    if not r.get('time') or str(r.get('time')).lower() in ['null', 'none', '']:
-                        r['time'] = get_smart_default_time_for_reminder(title)
-                    if not r.get('title'):
-                        r['title'] = title
-                return process_reminders(reminders_array, user_id)
-    except Exception as e:
-        return jsonify({"error": "Failed to process reminders", "details": str(e), "raw": content}), 400
-
-    # If not an array, extract a single JSON object - handle markdown code blocks
-    match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```|(\{[\s\S]*?\})',
-                      content) if isinstance(content, str) else None
-    if match:
-        try:
-            # Get the first matching group that's not None
-            json_text = next(group for group in match.groups()
-                             if group is not None)
-            reminder_json = pyjson.loads(json_text)
-            # Apply intelligent defaults for single reminder
-            title = reminder_json.get('title') or "New Reminder"
-            date = reminder_json.get('date')
-            time = reminder_json.get('time')
-
-            # Use smart defaults if missing or null
-            if not date or str(date).lower() in ['null', 'none', '']:
-                date = get_smart_default_date_for_reminder(title)
-            if not time or str(time).lower() in ['null', 'none', '']:
-                time = get_smart_default_time_for_reminder(title)
+        # Form-driven reminder parsing yields to chat and emergency traffic
+        with admission.request_scope(user_id, admission.BACKGROUND):
+            reminders_array, content = parse_reminder_from_text(user_input, date_context=reminder_date_context)
+    except LLMError as e:
+        return jsonify({"error": "Reminder assistant is temporarily unavailable. Please try again shortly.", "details": str(e)}), 503
+    if not content:
+        return jsonify({"error": "No valid content returned from LLM or AI helper failed."}), 500
 
-            post_data = {"userId": user_id,
-                         "title": title, "date": date, "time": time}
-            saved_reminder = save_to_mongodb(post_data)
-            return jsonify({"success": True, "reminder": saved_reminder})
-        except Exception as e:
-            return jsonify({"error": "Failed to parse or post JSON", "details": str(e), "raw": content}), 400
-    return jsonify({"error": "No JSON found in LLM response", "raw": content}), 400
+    reminders_array = [r for r in (reminders_array or []) if isinstance(r, dict)]
+    if not reminders_array:
+        return jsonify({"error": "No JSON found in LLM response", "raw": content}), 400
+    # Apply intelligent defaults to all reminders in array
+    for r in reminders_array:
+        apply_reminder_defaults(r)
+    return process_reminders(reminders_array, user_id)
 
 
 def save_to_mongodb(reminder):
     """Save a reminder to MongoDB"""
+    reminders_collection = get_reminders_collection()
     if reminders_collection is None:
         raise RuntimeError("Reminders collection is not initialized.")
-    reminder_to_save = reminder.copy()
+    # A repeating reminder is stored once, with its normalized rule
+    reminder_to_save = recurrence.attach(reminder)
     now = datetime.now()
     reminder_to_save['created_at'] = now
     reminder_to_save['updated_at'] = now
@@ -359,37 +206,72 @@ def save_to_mongodb(reminder):
     return json_safe_reminder
 
 
+def format_reminder_item(reminder, date=None, time=None):
+    """The /reminders list entry for a one-off reminder, or for one occurrence of a series."""
+    item = {
+        "id": str(reminder.get("_id", reminder.get("id", ""))),
+        "title": reminder.get("title", ""),
+        "date": date or reminder.get("date", ""),
+        "time": time or reminder.get("time", ""),
+        "userId": reminder.get("userId", ""),
+        "created_at": reminder.get("created_at", datetime.now()).isoformat(),
+        "updated_at": reminder.get("updated_at", datetime.now()).isoformat()
+    }
+    if reminder.get("recurrence"):
+        # id stays the series id (deleting removes the series); occurrenceId tells occurrences apart
+        item["occurrenceId"] = f"{item['id']}@{item['date']} {item['time']}"
+        item["recurrence"] = reminder["recurrence"]
+        item["seriesStart"] = reminder.get("date", "")
+    return item
+
+
 @format_reminder_bp.route('/reminders', methods=['GET'])
 def get_reminders():
+    """
+    One-off reminders plus every occurrence of repeating reminders inside the window
+    from/to (YYYY-MM-DD, default REMINDER_WINDOW_DAYS from today). One-off reminders
+    are only limited to the window when from or to is given.
+    """
     user_id = request.args.get("userId")
     if not user_id:
         return jsonify({"error": "userId is required"}), 400
+    reminders_collection = get_reminders_collection()
     if reminders_collection is None:
         return jsonify({"error": "Reminders collection is not initialized due to missing environment variables."}), 500
+    start, end = request.args.get("from"), request.args.get("to")
     try:
-        cursor = reminders_collection.find({"userId": user_id})
-        reminders_list = list(cursor)
-        
+        first, last = recurrence.window(start, end)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        one_offs = {"recurrence": None}
+        if start or end:
+            one_offs["date"] = {"$gte": first.strftime("%Y-%m-%d"), "$lte": last.strftime("%Y-%m-%d")}
+        cursor = reminders_collection.find(
+            {"userId": user_id, "$or": [one_offs, recurrence.series_filter(first, last)]})
 
         # Convert ObjectId to string and ensure all fields are properly formatted
         formatted_reminders = []
-        for reminder in reminders_list:
-            formatted_reminder = {
-                "id": str(reminder.get("_id", reminder.get("id", ""))),
-                "title": reminder.get("title", ""),
-                "date": reminder.get("date", ""),
-                "time": reminder.get("time", ""),
-                "userId": reminder.get("userId", ""),
-                "created_at": reminder.get("created_at", datetime.now()).isoformat(),
-                "updated_at": reminder.get("updated_at", datetime.now()).isoformat()
-            }
-            formatted_reminders.append(formatted_reminder)
+        budget = recurrence.REMINDER_MAX_OCCURRENCES
+        truncated = False
+        for reminder in cursor:
+            if not reminder.get("recurrence"):
+                formatted_reminders.append(format_reminder_item(reminder))
+                continue
+            for date, time in recurrence.occurrences(reminder, first, last):
+                if budget <= 0:
+                    truncated = True
+                    break
+                formatted_reminders.append(format_reminder_item(reminder, date, time))
+                budget -= 1
+        metrics.incr("reminders.occurrences_expanded", recurrence.REMINDER_MAX_OCCURRENCES - budget)
 
-        
         return jsonify({
             "success": True,
             "reminders": formatted_reminders,
-            "count": len(formatted_reminders)
+            "count": len(formatted_reminders),
+            "window": {"from": first.strftime("%Y-%m-%d"), "to": last.strftime("%Y-%m-%d")},
+            "truncated": truncated
         })
     except Exception as e:
         
@@ -398,6 +280,7 @@ def get_reminders():
 
 @format_reminder_bp.route('/reminders/<reminder_id>', methods=['GET'])
 def get_reminder_by_id(reminder_id):
+    reminders_collection = get_reminders_collection()
     if reminders_collection is None:
         return jsonify({"error": "Reminders collection is not initialized due to missing environment variables."}), 500
     try:
@@ -459,6 +342,7 @@ def delete_reminder():
         user_id = data.get("userId") if data else None
         if not reminder_id or not user_id:
             return jsonify({"error": "Both id and userId are required"}), 400
+        reminders_collection = get_reminders_collection()
         if reminders_collection is None:
             return jsonify({"error": "Reminders collection is not initialized due to missing environment variables."}), 500
         result = reminders_collection.delete_one(
@@ -1,21 +1,15 @@
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
 
-import os
+from routes.utils import mongo
 
 saved_contacts_bp = Blueprint('saved_contacts', __name__)
 
-# MongoDB connection
-MONGO_URI = os.environ.get('MONGO_URI')
-db_name = os.environ.get('DB_NAME')
-saved_contacts_collection_name = os.environ.get('SAVED_CONTACTS_COLLECTION')
+# Collection comes from the shared Mongo registry on first use; missing settings give a 500, not an import error
+NOT_CONFIGURED = {'error': 'Saved contacts collection is not initialized due to missing environment variables.'}
 
-if MONGO_URI is None or db_name is None or saved_contacts_collection_name is None:
-    raise RuntimeError("Missing required environment variables for MongoDB connection.")
 
-client = MongoClient(MONGO_URI)
-db = client[db_name]
-collection = db[saved_contacts_collection_name]
+def get_contacts_collection():
+    return mongo.collection('SAVED_CONTACTS_COLLECTION')
 
 def get_user_id():
     # For demo, get user id from query param or header (replace with real auth in prod)
@@ -26,6 +20,9 @@ def get_contacts():
     user_id = get_user_id()
     if not user_id:
         return jsonify({'error': 'Missing user_id'}), 400
+    collection = get_contacts_collection()
+    if collection is None:
+        return jsonify(NOT_CONFIGURED), 500
     contacts = list(collection.find({'user_id': user_id}, {'_id': 0}))
     return jsonify(contacts)
 
@@ -34,6 +31,9 @@ def add_contact():
     user_id = get_user_id()
     if not user_id:
         return jsonify({'error': 'Missing user_id'}), 400
+    collection = get_contacts_collection()
+    if collection is None:
+        return jsonify(NOT_CONFIGURED), 500
     data = request.json
     if not data or not data.get('name') or not data.get('phone'):
         return jsonify({'error': 'Missing name or phone'}), 400
@@ -53,6 +53,9 @@ def delete_contact(contact_id):
     user_id = get_user_id()
     if not user_id:
         return jsonify({'error': 'Missing user_id'}), 400
+    collection = get_contacts_collection()
+    if collection is None:
+        return jsonify(NOT_CONFIGURED), 500
     result = collection.delete_one({'user_id': user_id, 'id': contact_id})
     if result.deleted_count == 0:
         return jsonify({'error': 'Contact not found'}), 404
@@ -0,0 +1,296 @@
+# ================== LLM Admission Control ==================
+# Sits in front of GeminiChatAdapter. Every upstream call takes a slot from a
+# bounded global pool. Waiters are served by priority class, and each user has a
+# token bucket so one chatty client cannot starve the rest. A few slots are kept
+# back for emergency traffic so people in distress are served even at saturation.
+import os
+import time
+import heapq
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+from dotenv import load_dotenv
+
+from routes.utils import metrics
+from routes.utils.llm_resilience import LLMError
+
+# Load environment variables
+load_dotenv()
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "12"))
+LLM_EMERGENCY_RESERVED = int(os.getenv("LLM_EMERGENCY_RESERVED", "2"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_USER_RATE = float(os.getenv("LLM_USER_RATE", "1.0"))  # calls per second, refilled continuously
+LLM_USER_BURST = float(os.getenv("LLM_USER_BURST", "10"))
+
+# Priority classes - lower value is served first
+EMERGENCY = 0
+INTERACTIVE = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {EMERGENCY: "emergency", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# How long each class may wait for a slot before it is shed (seconds)
+QUEUE_TIMEOUTS = {
+    EMERGENCY: float(os.getenv("LLM_QUEUE_TIMEOUT_EMERGENCY", "10")),
+    INTERACTIVE: float(os.getenv("LLM_QUEUE_TIMEOUT_INTERACTIVE", "5")),
+    BACKGROUND: float(os.getenv("LLM_QUEUE_TIMEOUT_BACKGROUND", "2")),
+}
+
+# Set per request by the routes; fanout.submit() carries them into worker threads
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+_user_id = contextvars.ContextVar("llm_user_id", default=None)
+# Set by deferred(): calls go upstream without a slot because the caller claims one later
+_deferred = contextvars.ContextVar("llm_admission_deferred", default=False)
+
+
+class LLMThrottledError(LLMError):
+    """The call was shed by admission control (rate limit, full queue or queue timeout)."""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=False)
+
+
+@contextmanager
+def request_scope(user_id, priority=INTERACTIVE):
+    """Tags LLM calls made inside the block (and in tasks submitted from it) with a user and priority."""
+    user_token = _user_id.set(user_id)
+    priority_token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(priority_token)
+        _user_id.reset(user_token)
+
+
+@contextmanager
+def deferred():
+    """
+    Lets LLM calls inside the block skip admission. Used for speculative replies: they
+    only start when has_capacity() says a slot is free, and the consumer claims the slot
+    once it decides to keep the reply, so a discarded speculation never holds one.
+    """
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def tag_task(user_id, priority=INTERACTIVE):
+    """
+    request_scope() for asyncio handlers: each request task runs in its own context copy,
+    so the values vanish with the task and need no reset. Tasks it creates inherit them.
+    """
+    _user_id.set(user_id)
+    _priority.set(priority)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "granted", "cancelled", "event", "loop", "future")
+
+    def __init__(self, priority, seq, loop=None, future=None):
+        self.priority = priority
+        self.seq = seq
+        self.granted = False
+        self.cancelled = False
+        self.event = threading.Event() if future is None else None
+        self.loop = loop
+        self.future = future
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self):
+        if self.future is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """Bounded, priority-ordered admission for upstream LLM calls. Thread- and asyncio-safe."""
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, emergency_reserved=LLM_EMERGENCY_RESERVED,
+                 max_queue=LLM_MAX_QUEUE, user_rate=LLM_USER_RATE, user_burst=LLM_USER_BURST, max_users=10000):
+        self.max_concurrency = max_concurrency
+        self.emergency_reserved = min(emergency_reserved, max_concurrency - 1)
+        self.max_queue = max_queue
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._heap = []
+        self._seq = 0
+        self._buckets = OrderedDict()
+
+    # ---------- internals (call with self._lock held) ----------
+    def _limit(self, priority):
+        if priority == EMERGENCY:
+            return self.max_concurrency
+        return self.max_concurrency - self.emergency_reserved
+
+    def _take_token(self, user_id):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(user_id)
+        return bucket.take()
+
+    def _head(self):
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _try_admit(self, priority):
+        head = self._head()
+        if head is not None and head.priority <= priority:
+            return False
+        if self._in_flight >= self._limit(priority):
+            return False
+        self._in_flight += 1
+        return True
+
+    def _enqueue(self, priority, loop=None, future=None):
+        """Admits immediately (returns None) or returns a queued waiter. Raises LLMThrottledError."""
+        name = PRIORITY_NAMES[priority]
+        user_id = _user_id.get()
+        with self._lock:
+            # Emergencies are never rate limited
+            if priority != EMERGENCY and user_id is not None and not self._take_token(user_id):
+                metrics.incr(f"admission.shed.{name}.rate_limited")
+                raise LLMThrottledError("per-user LLM rate limit exceeded")
+            if self._try_admit(priority):
+                metrics.incr(f"admission.admitted.{name}")
+                metrics.observe(f"admission.wait.{name}", 0.0)
+                return None
+            if priority != EMERGENCY and len(self._heap) >= self.max_queue:
+                metrics.incr(f"admission.shed.{name}.queue_full")
+                raise LLMThrottledError("LLM admission queue is full")
+            self._seq += 1
+            waiter = _Waiter(priority, self._seq, loop, future)
+            heapq.heappush(self._heap, waiter)
+            metrics.incr(f"admission.queued.{name}")
+            return waiter
+
+    def _abandon(self, waiter, reason="timeout"):
+        """Called after a wait ended. Returns True if the slot was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+        metrics.incr(f"admission.shed.{PRIORITY_NAMES[waiter.priority]}.{reason}")
+        return False
+
+    def _grant_waiting(self):
+        while True:
+            head = self._head()
+            if head is None or self._in_flight >= self._limit(head.priority):
+                return
+            heapq.heappop(self._heap)
+            head.granted = True
+            self._in_flight += 1
+            head.wake()
+
+    # ---------- public API ----------
+    def has_capacity(self, priority=None):
+        """True when a call of this priority would be admitted right now without queueing."""
+        priority = _priority.get() if priority is None else priority
+        with self._lock:
+            head = self._head()
+            return (head is None or head.priority > priority) and self._in_flight < self._limit(priority)
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiting()
+
+    @contextmanager
+    def slot(self, priority=None):
+        """Blocks until the call may go upstream. Raises LLMThrottledError when shed."""
+        if _deferred.get():
+            metrics.incr("admission.deferred")
+            yield
+            return
+        priority = _priority.get() if priority is None else priority
+        started = time.perf_counter()
+        waiter = self._enqueue(priority)
+        if waiter is not None:
+            waiter.event.wait(QUEUE_TIMEOUTS[priority])
+            if not self._abandon(waiter):
+                raise LLMThrottledError("timed out waiting for an LLM slot")
+            metrics.incr(f"admission.admitted.{PRIORITY_NAMES[priority]}")
+            metrics.observe(f"admission.wait.{PRIORITY_NAMES[priority]}", time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, priority=None):
+        """asyncio variant of slot()."""
+        if _deferred.get():
+            metrics.incr("admission.deferred")
+            yield
+            return
+        priority = _priority.get() if priority is None else priority
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        waiter = self._enqueue(priority, loop, loop.create_future())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), QUEUE_TIMEOUTS[priority])
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                if self._abandon(waiter, "cancelled"):
+                    self.release()
+                raise
+            if not self._abandon(waiter):
+                raise LLMThrottledError("timed out waiting for an LLM slot")
+            metrics.incr(f"admission.admitted.{PRIORITY_NAMES[priority]}")
+            metrics.observe(f"admission.wait.{PRIORITY_NAMES[priority]}", time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self):
+        with self._lock:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiter in self._heap:
+                if not waiter.cancelled:
+                    queued[PRIORITY_NAMES[waiter.priority]] += 1
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "emergency_reserved": self.emergency_reserved,
+                "queued": queued,
+                "tracked_users": len(self._buckets),
+            }
@@ -4,20 +4,40 @@ import re
 import json as pyjson
 from dotenv import load_dotenv
 
+from routes.utils.llm_cache import CACHE_TTLS, make_cache_key, build_cache_from_env
+from routes.utils.emergency_rules import pre_classify_emergency
+from routes.utils.intent_model import reminder_gate_skips, log_reminder_verdict
+from routes.utils import metrics
+from routes.utils.admission import AdmissionController
+from routes.utils.model_routing import CHAT_MODEL, route_for, record_usage
+from routes.utils.llm_resilience import (
+    LLMError,
+    CircuitBreaker,
+    LLM_TIMEOUT_MS,
+    call_with_retries,
+    call_with_retries_async,
+    classify_error,
+)
+
 # Load environment variables
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = os.getenv("MODEL_NAME", "gemini-2.0-flash")
+# Main chat model; other call sites are routed per model_routing.ROUTES
+GEMINI_MODEL = CHAT_MODEL
 
 # Import new Gemini SDK
 try:
     import google.genai as genai
+    from google.genai import types as genai_types
 except ImportError:
     raise ImportError("Please install the new SDK with: pip install -U google-genai")
 
-# Initialize underlying genai client
-genai_client = genai.Client(api_key=GEMINI_API_KEY)
+# Initialize underlying genai client; per-call timeouts are set on each request
+genai_client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=genai_types.HttpOptions(timeout=LLM_TIMEOUT_MS),
+)
 
 
 # ================== Helper Functions ==================
@@ -61,70 +81,264 @@ def _clean_text(s: str):
     return s
 
 
-# ================== Core Adapter ==================
-class GeminiChatAdapter:
-    """Provides an OpenAI-style chat.completions.create() API."""
+def _parse_json_object(content):
+    """Extracts the first JSON object from LLM text. Returns {} when none parses."""
+    content = content or ""
+    match = re.search(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```|(\{[\s\S]*?\})", content)
+    json_text = next((g for g in (match.groups() if match else []) if g), content)
 
-    class _Completions:
-        def __init__(self, adapter):
-            self._adapter = adapter
+    try:
+        data = pyjson.loads(json_text)
+    except Exception:
+        # Non-greedy match stops at the first "}" - decode from the opening brace instead
+        try:
+            data, _ = pyjson.JSONDecoder().raw_decode(content[content.index("{"):])
+        except Exception:
+            data = {}
+    return data if isinstance(data, dict) else {}
+
+
+def _parse_json_array(content):
+    """Extracts the first JSON array from LLM text; a lone object becomes a one-item list. Returns None when none parses."""
+    content = content or ""
+    start = content.find("[")
+    if start != -1:
+        try:
+            data, _ = pyjson.JSONDecoder().raw_decode(content[start:])
+            if isinstance(data, list):
+                return data
+        except Exception:
+            pass
+    data = _parse_json_object(content)
+    return [data] if data else None
+
+
+def parse_structured(text, schema, call_site):
+    """
+    Parses a schema-constrained response. Native JSON mode output parses directly;
+    anything else goes through the regex fallback. Outcomes are counted per call site
+    under llm.structured.<call_site>.{ok,fallback,failed}.
+    Returns a dict / list, or None when nothing usable was found.
+    """
+    expected = list if schema.get("type") == "ARRAY" else dict
+    try:
+        data = pyjson.loads(text or "")
+        if isinstance(data, expected):
+            metrics.incr(f"llm.structured.{call_site}.ok")
+            return data
+    except ValueError:
+        pass
 
-        def create(self, model=None, messages=None):
-            model_to_use = model or GEMINI_MODEL
-            # Build prompt
-            if isinstance(messages, (list, tuple)):
-                prompt = "\n\n".join(
-                    [f"{m.get('role', 'user').upper()}: {m.get('content', '')}" for m in messages]
-                )
-            else:
-                prompt = str(messages)
+    data = _parse_json_array(text) if expected is list else (_parse_json_object(text) or None)
+    metrics.incr(f"llm.structured.{call_site}.{'fallback' if data else 'failed'}")
+    return data
 
-            try:
-                client = getattr(self._adapter, '_raw_client', None) or genai_client
-                resp = client.models.generate_content(model=model_to_use, contents=prompt)
-                text = _clean_text(_extract_text(resp))
 
-                class _Msg:
-                    def __init__(self, content):
-                        self.content = content
+def _confidence(value):
+    """A classifier confidence as a float; 0.0 when the model left it out, sent null or sent a non-number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ================== Core Adapter ==================
+class _Msg:
+    def __init__(self, content, parsed=None):
+        self.content = content
+        # dict / list when the call requested a response_schema
+        self.parsed = parsed
+
 
-                class _Choice:
-                    def __init__(self, msg):
-                        self.message = msg
+class _Choice:
+    def __init__(self, msg=None, delta=None):
+        self.message = msg
+        self.delta = delta
 
-                Resp = type("Resp", (), {"choices": [_Choice(_Msg(text))]})
-                return Resp()
 
-            except Exception as e:
-                err = f"GENAI_ERROR: {e}"
+def _make_response(text, parsed=None):
+    return type("Resp", (), {"choices": [_Choice(msg=_Msg(text, parsed))]})()
 
-                class _Msg:
-                    def __init__(self, content):
-                        self.content = content
 
-                class _Choice:
-                    def __init__(self, msg):
-                        self.message = msg
+def _make_chunk(text):
+    return type("Chunk", (), {"choices": [_Choice(delta=_Msg(text))]})()
 
-                Resp = type("Resp", (), {"choices": [_Choice(_Msg(err))]})
-                return Resp()
 
-    def __init__(self, raw_client=None):
+class GeminiChatAdapter:
+    """Provides an OpenAI-style chat.completions.create() API."""
+
+    class _Completions:
+        def __init__(self, adapter):
+            self._adapter = adapter
+
+        @staticmethod
+        def _build_prompt(messages):
+            if isinstance(messages, (list, tuple)):
+                return "\n\n".join(
+                    [f"{m.get('role', 'user').upper()}: {m.get('content', '')}" for m in messages]
+                )
+            return str(messages)
+
+        def _cache_lookup(self, model_to_use, messages, call_site):
+            """Returns (cache_key, ttl, cached_text); key is None when the call site isn't cached."""
+            cache = self._adapter.cache
+            ttl = CACHE_TTLS.get(call_site) if cache is not None else None
+            if not ttl:
+                return None, None, None
+            cache_key = make_cache_key(model_to_use, messages)
+            return cache_key, ttl, cache.get(cache_key, call_site)
+
+        def _remember(self, cache_key, ttl, text, response, response_schema, call_site):
+            """Cache a reply for its call site; structured replies that did not parse are never cached."""
+            if not cache_key or not text:
+                return
+            if response_schema is not None and not response.choices[0].message.parsed:
+                metrics.incr(f"llm_cache.skipped_unparsed.{call_site}")
+                return
+            self._adapter.cache.set(cache_key, text, ttl)
+
+        @staticmethod
+        def _request_config(route, response_schema=None):
+            structured = {}
+            if response_schema is not None:
+                structured = {"response_mime_type": "application/json", "response_schema": response_schema}
+            return genai_types.GenerateContentConfig(
+                max_output_tokens=route["max_output_tokens"],
+                temperature=route["temperature"],
+                http_options=genai_types.HttpOptions(timeout=route["timeout_ms"]),
+                **structured,
+            )
+
+        @staticmethod
+        def _finish(resp, response_schema, call_site):
+            """Returns (text, response). Structured output skips _clean_text so JSON escapes survive."""
+            if response_schema is None:
+                text = _clean_text(resp)
+                return text, _make_response(text)
+            return resp, _make_response(resp, parse_structured(resp, response_schema, call_site))
+
+        def create(self, model=None, messages=None, stream=False, call_site=None, response_schema=None):
+            """
+            call_site names the caller; it selects the model and generation config
+            (model_routing.CALL_SITE_ROUTES) and the cache TTL (llm_cache.CACHE_TTLS).
+            An explicit model overrides the routed one.
+            response_schema requests native JSON output; the parsed value is on
+            choices[0].message.parsed (None when nothing usable came back).
+            Raises llm_resilience.LLMError (LLMTimeoutError / LLMUnavailableError) on failure.
+            """
+            route_name, route = route_for(call_site)
+            model_to_use = model or route["model"]
+            prompt = self._build_prompt(messages)
+            client = getattr(self._adapter, '_raw_client', None) or genai_client
+            config = self._request_config(route, response_schema)
+
+            if stream:
+                return self._stream(client, model_to_use, prompt, config, route_name)
+
+            cache_key, ttl, cached = self._cache_lookup(model_to_use, messages, call_site)
+            if cached is not None:
+                return self._finish(cached, response_schema, call_site)[1]
+
+            with self._adapter.admission.slot(), metrics.timed(f"llm.{route_name}.latency"):
+                resp = call_with_retries(
+                    lambda: client.models.generate_content(model=model_to_use, contents=prompt, config=config),
+                    self._adapter.breaker,
+                )
+            record_usage(route_name, resp)
+            text, response = self._finish(_extract_text(resp), response_schema, call_site)
+            self._remember(cache_key, ttl, text, response, response_schema, call_site)
+            return response
+
+        async def acreate(self, model=None, messages=None, call_site=None, response_schema=None):
+            """Async variant of create() using the google.genai aio surface."""
+            route_name, route = route_for(call_site)
+            model_to_use = model or route["model"]
+            prompt = self._build_prompt(messages)
+            client = getattr(self._adapter, '_raw_client', None) or genai_client
+            config = self._request_config(route, response_schema)
+
+            cache_key, ttl, cached = self._cache_lookup(model_to_use, messages, call_site)
+            if cached is not None:
+                return self._finish(cached, response_schema, call_site)[1]
+
+            async with self._adapter.admission.aslot():
+                with metrics.timed(f"llm.{route_name}.latency"):
+                    resp = await call_with_retries_async(
+                        lambda: client.aio.models.generate_content(model=model_to_use, contents=prompt, config=config),
+                        self._adapter.breaker,
+                    )
+            record_usage(route_name, resp)
+            text, response = self._finish(_extract_text(resp), response_schema, call_site)
+            self._remember(cache_key, ttl, text, response, response_schema, call_site)
+            return response
+
+        def _stream(self, client, model_to_use, prompt, config, route_name):
+            """
+            Yields OpenAI-style chunks (chunk.choices[0].delta.content) as Gemini produces text.
+            Opening the stream is retried; a failure after text was sent raises LLMError.
+            """
+            breaker = self._adapter.breaker
+
+            def open_stream():
+                # The SDK sends the request lazily, so pull the first part inside the retry
+                parts = iter(client.models.generate_content_stream(model=model_to_use, contents=prompt, config=config))
+                return next(parts, None), parts
+
+            # The admission slot is held until the whole reply has streamed
+            with self._adapter.admission.slot(), metrics.timed(f"llm.{route_name}.latency"):
+                first, parts = call_with_retries(open_stream, breaker)
+                last = first
+                if first is not None and getattr(first, "text", None):
+                    yield _make_chunk(first.text)
+                try:
+                    for part in parts:
+                        last = part
+                        text = getattr(part, "text", None)
+                        if text:
+                            yield _make_chunk(text)
+                except Exception as e:
+                    error = classify_error(e)
+                    breaker.record_failure(error)
+                    raise error from e
+            # The final chunk carries usage for the whole response
+            record_usage(route_name, last)
+
+    def __init__(self, raw_client=None, cache=None, breaker=None, admission=None):
         # store underlying client used to call model APIs
         self._raw_client = raw_client
+        # optional llm_cache.ResponseCache for repeated classification prompts
+        self.cache = cache
+        # shared by every call through this adapter so an unhealthy upstream fails fast
+        self.breaker = breaker or CircuitBreaker()
+        # priority-ordered, per-user rate-limited admission for upstream calls
+        self.admission = admission or AdmissionController()
         self.chat = type("Chat", (), {"completions": self._Completions(self)})()
 
 
 # Instantiate adapter using the real genai client
-llm_client = GeminiChatAdapter(raw_client=genai_client)
+llm_client = GeminiChatAdapter(raw_client=genai_client, cache=build_cache_from_env())
 
 
 # ================== REMINDER INTENT ==================
 def analyze_reminder_intent(text):
     """
     Detect reminder intent using Gemini.
+    Messages the local intent model is confident are not reminders skip the LLM call.
     Returns: (is_reminder: bool, confidence: float, details: dict)
     """
+    if reminder_gate_skips(text):
+        return False, 0.0, {}
+    return _classify_reminder_with_llm(text)
+
+
+async def analyze_reminder_intent_async(text):
+    """Async variant of analyze_reminder_intent()."""
+    if reminder_gate_skips(text):
+        return False, 0.0, {}
+    return await _classify_reminder_with_llm_async(text)
+
+
+def _reminder_intent_messages(text):
     system_prompt = (
         "You are a reminder intent classification assistant. "
         "Given a user message, detect if it is a reminder request. "
@@ -132,68 +346,170 @@ def analyze_reminder_intent(text):
         "Return JSON: {is_reminder: bool, confidence: float, details: {task, date, time}}"
     )
     user_prompt = f"Classify and extract reminder intent from this message: {text}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+REMINDER_INTENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "is_reminder": {"type": "BOOLEAN"},
+        "confidence": {"type": "NUMBER"},
+        "details": {
+            "type": "OBJECT",
+            "properties": {"task": {"type": "STRING"}, "date": {"type": "STRING"}, "time": {"type": "STRING"}},
+        },
+    },
+    "required": ["is_reminder", "confidence"],
+}
+
+
+def _reminder_intent_result(text, data):
+    data = data or {}
+
+    is_reminder = bool(data.get("is_reminder", False))
+    confidence = _confidence(data.get("confidence"))
+    if data:
+        log_reminder_verdict(text, is_reminder, confidence, model=route_for("reminder_intent")[1]["model"])
 
-    response = llm_client.chat.completions.create(
-        model=GEMINI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+    return (
+        is_reminder,
+        confidence,
+        data.get("details") or {},
     )
 
-    content = getattr(response.choices[0].message, "content", "")
-    match = re.search(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```|(\{[\s\S]*?\})", content)
-    json_text = next((g for g in (match.groups() if match else []) if g), content)
 
+def _classify_reminder_with_llm(text):
+    # A missed reminder is recoverable, so an LLM failure just means "not a reminder"
     try:
-        data = pyjson.loads(json_text)
-    except Exception:
-        data = {}
+        response = llm_client.chat.completions.create(
+            messages=_reminder_intent_messages(text),
+            call_site="reminder_intent",
+            response_schema=REMINDER_INTENT_SCHEMA,
+        )
+    except LLMError:
+        return False, 0.0, {}
+    return _reminder_intent_result(text, response.choices[0].message.parsed)
 
-    return (
-        bool(data.get("is_reminder", False)),
-        float(data.get("confidence", 0.0)),
-        data.get("details", {}),
-    )
+
+async def _classify_reminder_with_llm_async(text):
+    try:
+        response = await llm_client.chat.completions.acreate(
+            messages=_reminder_intent_messages(text),
+            call_site="reminder_intent",
+            response_schema=REMINDER_INTENT_SCHEMA,
+        )
+    except LLMError:
+        return False, 0.0, {}
+    return _reminder_intent_result(text, response.choices[0].message.parsed)
 
 
 # ================== REMINDER PARSER ==================
+REMINDER_LIST_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "title": {"type": "STRING"},
+            "date": {"type": "STRING"},
+            "time": {"type": "STRING"},
+            # One rule per repeating reminder instead of one reminder per occurrence (see routes.utils.recurrence)
+            "recurrence": {
+                "type": "OBJECT",
+                "nullable": True,
+                "properties": {
+                    "freq": {"type": "STRING", "enum": ["daily", "weekly"]},
+                    "interval": {"type": "INTEGER"},
+                    "byDay": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "times": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "until": {"type": "STRING", "nullable": True},
+                },
+                "required": ["freq"],
+            },
+        },
+        "required": ["title", "date", "time"],
+    },
+}
+
+
 def parse_reminder_from_text(user_input, date_context=None):
     """
     Parse free-form reminder text into structured JSON.
-    Returns: raw Gemini response text.
+    Returns: (reminders: list of {title, date, time, recurrence} dicts or None, raw Gemini response text)
     """
-    system_prompt = f"""
-You are an expert reminder creation assistant. 
-Parse user input into structured reminders with intelligent date/time inference.
+    response = llm_client.chat.completions.create(
+        messages=_reminder_parse_messages(user_input, date_context),
+        call_site="parse_reminder",
+        response_schema=REMINDER_LIST_SCHEMA,
+    )
+    message = response.choices[0].message
+    return message.parsed, message.content
 
-{date_context or ''}
+
+async def parse_reminder_from_text_async(user_input, date_context=None):
+    """Async variant of parse_reminder_from_text()."""
+    response = await llm_client.chat.completions.acreate(
+        messages=_reminder_parse_messages(user_input, date_context),
+        call_site="parse_reminder",
+        response_schema=REMINDER_LIST_SCHEMA,
+    )
+    message = response.choices[0].message
+    return message.parsed, message.content
+
+
+# Static part of the parser prompt; kept ahead of the per-minute date context so the prompt
+# starts with a stable prefix Gemini's implicit caching can reuse
+REMINDER_PARSE_INSTRUCTIONS = """
+You are an expert reminder creation assistant.
+Parse user input into structured reminders with intelligent date/time inference.
 
 INSTRUCTIONS:
 - Extract title, date, and time from user input
 - Convert relative dates using the date context
 - Use sensible defaults for missing fields
+- A repeating request ("every day", "three times a day", "every Monday until June") is ONE reminder:
+  date is the first day, and recurrence holds the rule instead of listing each occurrence
 - Output strictly valid JSON array:
-  [{{"title": "...", "date": "YYYY-MM-DD", "time": "H:MM AM/PM"}}]
+  [{"title": "...", "date": "YYYY-MM-DD", "time": "H:MM AM/PM",
+    "recurrence": null | {"freq": "daily|weekly", "interval": 1, "byDay": ["monday"],
+                          "times": ["8:00 AM", "8:00 PM"], "until": "YYYY-MM-DD" | null}}]
 """
 
-    response = llm_client.chat.completions.create(
-        model=GEMINI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Parse this: {user_input}"},
-        ],
-    )
 
-    return getattr(response.choices[0].message, "content", None)
+def _reminder_parse_messages(user_input, date_context=None):
+    system_prompt = REMINDER_PARSE_INSTRUCTIONS + f"\n{date_context or ''}\n"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Parse this: {user_input}"},
+    ]
 
 
 # ================== EMERGENCY INTENT ==================
 def analyze_emergency_intent(text):
     """
     Detect emergency intent (medical, safety, emotional).
+    Clearly safe messages are settled by the local rule engine; anything that might be an
+    emergency reaches Gemini.
     Returns: (is_emergency: bool, confidence: float, details: dict)
+    Raises LLMError when Gemini fails, so the caller can apply its conservative default.
     """
+    verdict = pre_classify_emergency(text)
+    if verdict is not None:
+        return verdict
+    return _classify_emergency_with_llm(text)
+
+
+async def analyze_emergency_intent_async(text):
+    """Async variant of analyze_emergency_intent()."""
+    verdict = pre_classify_emergency(text)
+    if verdict is not None:
+        return verdict
+    return await _classify_emergency_with_llm_async(text)
+
+
+def _emergency_intent_messages(text):
     system_prompt = (
         "You are an emergency detection assistant. "
         "Classify if the user's message indicates an emergency (medical, safety, emotional). "
@@ -201,26 +517,166 @@ def analyze_emergency_intent(text):
         "Return JSON: {is_emergency: bool, confidence: float, details: {type, urgency, reason}}"
     )
     user_prompt = f"Classify and extract emergency intent from this message: {text}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    response = llm_client.chat.completions.create(
-        model=GEMINI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
 
-    content = getattr(response.choices[0].message, "content", "")
-    match = re.search(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```|(\{[\s\S]*?\})", content)
-    json_text = next((g for g in (match.groups() if match else []) if g), content)
+EMERGENCY_INTENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "is_emergency": {"type": "BOOLEAN"},
+        "confidence": {"type": "NUMBER"},
+        "details": {
+            "type": "OBJECT",
+            "properties": {"type": {"type": "STRING"}, "urgency": {"type": "STRING"}, "reason": {"type": "STRING"}},
+        },
+    },
+    "required": ["is_emergency", "confidence"],
+}
 
-    try:
-        data = pyjson.loads(json_text)
-    except Exception:
-        data = {}
+
+def _emergency_intent_result(data):
+    data = data or {}
 
     return (
         bool(data.get("is_emergency", False)),
-        float(data.get("confidence", 0.0)),
-        data.get("details", {}),
+        _confidence(data.get("confidence")),
+        data.get("details") or {},
+    )
+
+
+def _classify_emergency_with_llm(text):
+    response = llm_client.chat.completions.create(
+        messages=_emergency_intent_messages(text),
+        call_site="emergency_intent",
+        response_schema=EMERGENCY_INTENT_SCHEMA,
     )
+    return _emergency_intent_result(response.choices[0].message.parsed)
+
+
+async def _classify_emergency_with_llm_async(text):
+    response = await llm_client.chat.completions.acreate(
+        messages=_emergency_intent_messages(text),
+        call_site="emergency_intent",
+        response_schema=EMERGENCY_INTENT_SCHEMA,
+    )
+    return _emergency_intent_result(response.choices[0].message.parsed)
+
+
+# ================== COMBINED INTENT ==================
+def analyze_message_intent(text):
+    """
+    Detect emergency, reminder and sentiment signals with a single Gemini call.
+    Returns: {
+        "emergency": (is_emergency: bool, confidence: float, details: dict),
+        "reminder": (is_reminder: bool, confidence: float, details: dict),
+        "sentiment": {"polarity": float | None, "label": str | None},
+    }
+    When the rule engine rules out an emergency or the intent model rules out a
+    reminder, only the remaining single-signal classifier is called (or none at all)
+    and sentiment is left to the caller.
+    """
+    verdict = pre_classify_emergency(text)
+    skip_reminder = reminder_gate_skips(text)
+    if verdict is not None or skip_reminder:
+        return {
+            "emergency": verdict if verdict is not None else _classify_emergency_with_llm(text),
+            "reminder": (False, 0.0, {}) if skip_reminder else _classify_reminder_with_llm(text),
+            "sentiment": {"polarity": None, "label": None},
+        }
+
+    response = llm_client.chat.completions.create(
+        messages=_message_intent_messages(text),
+        call_site="message_intent",
+        response_schema=MESSAGE_INTENT_SCHEMA,
+    )
+    return _message_intent_result(text, response.choices[0].message.parsed)
+
+
+async def analyze_message_intent_async(text):
+    """Async variant of analyze_message_intent()."""
+    verdict = pre_classify_emergency(text)
+    skip_reminder = reminder_gate_skips(text)
+    if verdict is not None or skip_reminder:
+        if verdict is None:
+            verdict = await _classify_emergency_with_llm_async(text)
+        return {
+            "emergency": verdict,
+            "reminder": (False, 0.0, {}) if skip_reminder else await _classify_reminder_with_llm_async(text),
+            "sentiment": {"polarity": None, "label": None},
+        }
+
+    response = await llm_client.chat.completions.acreate(
+        messages=_message_intent_messages(text),
+        call_site="message_intent",
+        response_schema=MESSAGE_INTENT_SCHEMA,
+    )
+    return _message_intent_result(text, response.choices[0].message.parsed)
+
+
+def _message_intent_messages(text):
+    system_prompt = (
+        "You are a message analysis assistant for an elderly care app. "
+        "For the user's message, do three things in one pass: "
+        "1) Classify if it indicates an emergency (medical, safety, emotional); if yes, extract type, urgency and reason. "
+        "2) Detect if it is a reminder request; if yes, extract the task, date and time if present. "
+        "3) Rate the sentiment polarity from -1.0 (very negative) to 1.0 (very positive). "
+        "Return JSON: {emergency: {is_emergency: bool, confidence: float, details: {type, urgency, reason}}, "
+        "reminder: {is_reminder: bool, confidence: float, details: {task, date, time}}, "
+        "sentiment: {polarity: float, label: 'positive' | 'neutral' | 'negative'}}"
+    )
+    user_prompt = f"Analyze this message: {text}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+MESSAGE_INTENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "emergency": EMERGENCY_INTENT_SCHEMA,
+        "reminder": REMINDER_INTENT_SCHEMA,
+        "sentiment": {
+            "type": "OBJECT",
+            "properties": {
+                "polarity": {"type": "NUMBER"},
+                "label": {"type": "STRING", "enum": ["positive", "neutral", "negative"]},
+            },
+        },
+    },
+    "required": ["emergency", "reminder", "sentiment"],
+}
+
+
+def _message_intent_result(text, data):
+    data = data or {}
+
+    emergency = data.get("emergency") if isinstance(data.get("emergency"), dict) else {}
+    reminder = data.get("reminder") if isinstance(data.get("reminder"), dict) else {}
+    sentiment = data.get("sentiment") if isinstance(data.get("sentiment"), dict) else {}
+
+    try:
+        polarity = float(sentiment["polarity"])
+    except (KeyError, TypeError, ValueError):
+        polarity = None
+
+    if reminder:
+        log_reminder_verdict(text, reminder.get("is_reminder", False), _confidence(reminder.get("confidence")),
+                             model=route_for("message_intent")[1]["model"])
+
+    return {
+        "emergency": (
+            bool(emergency.get("is_emergency", False)),
+            _confidence(emergency.get("confidence")),
+            emergency.get("details", {}) or {},
+        ),
+        "reminder": (
+            bool(reminder.get("is_reminder", False)),
+            _confidence(reminder.get("confidence")),
+            reminder.get("details", {}) or {},
+        ),
+        "sentiment": {"polarity": polarity, "label": sentiment.get("label")},
+    }
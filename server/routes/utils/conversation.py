@@ -0,0 +1,198 @@
+# ================== Conversation Context ==================
+# Builds chat prompt context from a rolling per-session summary plus a
+# token-budgeted tail of recent messages, so input tokens per turn stay bounded
+# however long a session runs. The summary is stored on the chat_sessions
+# document as {"text", "covered", "anchor"}: covered counts the history messages
+# folded into it and anchor fingerprints the last of them.
+import os
+import hashlib
+import threading
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from dotenv import load_dotenv
+
+from routes.utils import metrics, fanout, admission
+from routes.utils.llm_resilience import LLMError
+from routes.utils.ai_utils import llm_client
+
+# Load environment variables
+load_dotenv()
+
+# Recent messages sent verbatim on every turn
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))
+# Messages that slid out of the tail are still sent verbatim up to this budget;
+# beyond it they are folded into the summary (so the summarizer runs in batches)
+SUMMARY_SLACK_TOKENS = int(os.getenv("SUMMARY_SLACK_TOKENS", "600"))
+# Largest transcript handed to one summarizer call
+SUMMARY_INPUT_TOKENS = int(os.getenv("SUMMARY_INPUT_TOKENS", "4000"))
+SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", "150"))
+
+# Rough English average; good enough for budgeting without a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def _valid_messages(chat_history):
+    return [
+        {"role": m["role"], "content": str(m["content"])}
+        for m in chat_history or []
+        if isinstance(m, dict) and m.get("role") in ("user", "assistant") and m.get("content")
+    ]
+
+
+def split_recent(messages, budget):
+    """
+    Splits messages into (older, tail) where tail is the newest run that fits the
+    token budget. The newest message is always kept, truncated if it alone is too long.
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = estimate_tokens(messages[start - 1]["content"])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    tail = messages[start:]
+    if len(tail) == 1 and used > budget:
+        tail = [{**tail[0], "content": tail[0]["content"][:budget * CHARS_PER_TOKEN] + " ..."}]
+    return messages[:start], tail
+
+
+def _anchor(messages, covered):
+    if covered <= 0:
+        return None
+    return hashlib.sha1(messages[covered - 1]["content"].encode("utf-8")).hexdigest()[:16]
+
+
+def _session_filter(session_id, user_id):
+    if not session_id or not ObjectId.is_valid(session_id):
+        return None
+    return {"_id": ObjectId(session_id), "userId": user_id}
+
+
+def load_summary(collection, session_id, user_id):
+    query = _session_filter(session_id, user_id)
+    if collection is None or query is None:
+        return {}
+    doc = collection.find_one(query, {"summary": 1})
+    return (doc or {}).get("summary") or {}
+
+
+def _summary_messages(previous_summary, new_messages):
+    transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in new_messages)
+    system_prompt = (
+        "You maintain a running summary of a conversation between an elderly user and their assistant. "
+        "Merge the new messages into the existing summary. Keep facts about the user (health, family, "
+        "preferences, plans, reminders they mentioned) and open questions; drop small talk. "
+        f"Write plain prose, at most {SUMMARY_MAX_WORDS} words."
+    )
+    user_prompt = f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _next_chunk(messages, start, budget):
+    """
+    The oldest run of messages from start that fits the token budget, as (end index, batch).
+    One message is always taken, truncated if it alone is too long.
+    """
+    used, end = 0, start
+    while end < len(messages):
+        cost = estimate_tokens(messages[end]["content"])
+        if used + cost > budget and end > start:
+            break
+        used += cost
+        end += 1
+    batch = messages[start:end]
+    if len(batch) == 1 and used > budget:
+        batch = [{**batch[0], "content": batch[0]["content"][:budget * CHARS_PER_TOKEN] + " ..."}]
+    return end, batch
+
+
+def update_summary(collection, session_id, user_id, previous_summary, older):
+    """
+    Folds the messages in older that the summary doesn't cover yet into it, oldest first,
+    in chunks of at most SUMMARY_INPUT_TOKENS. Each chunk is stored as soon as it is
+    summarized, so covered only ever advances past messages that were actually folded in.
+    """
+    covered = previous_summary.get("covered", 0)
+    text = previous_summary.get("text")
+    try:
+        while covered < len(older):
+            end, batch = _next_chunk(older, covered, SUMMARY_INPUT_TOKENS)
+            with admission.request_scope(user_id, admission.BACKGROUND), metrics.timed("chat.summary.update"):
+                response = llm_client.chat.completions.create(
+                    messages=_summary_messages(text, batch),
+                    call_site="summarize",
+                )
+            merged = (response.choices[0].message.content or "").strip()
+            if not merged:
+                break
+            text, covered = merged, end
+            collection.update_one(_session_filter(session_id, user_id), {
+                "$set": {"summary": {
+                    "text": text,
+                    "covered": covered,
+                    "anchor": _anchor(older, covered),
+                    "updatedAt": datetime.utcnow().isoformat(),
+                }},
+                # Bump the revision so cached sessions pick up the new summary
+                "$inc": {"rev": 1},
+            })
+            metrics.incr("chat.summary.chunks")
+    except (LLMError, PyMongoError):
+        metrics.incr("chat.summary.errors")
+    finally:
+        with _pending_lock:
+            _pending.discard(session_id)
+
+
+def _schedule_update(collection, session_id, user_id, previous_summary, older):
+    with _pending_lock:
+        if session_id in _pending:
+            return
+        _pending.add(session_id)
+    fanout.submit(update_summary, collection, session_id, user_id, previous_summary, older)
+
+
+def prepare_context(collection, session_id, user_id, chat_history, summary=None):
+    """
+    Returns (summary_text or None, recent messages) for ask_query.build_chat_messages().
+    Messages that slid out of the recent window but aren't summarized yet are sent
+    verbatim up to SUMMARY_SLACK_TOKENS; past that, a background update folds them in.
+    summary is the session's stored summary when the caller already has it (else it is loaded).
+    """
+    messages = _valid_messages(chat_history)
+    older, tail = split_recent(messages, HISTORY_TOKEN_BUDGET)
+    if not older:
+        return None, tail
+
+    if summary is None:
+        summary = load_summary(collection, session_id, user_id)
+    covered = summary.get("covered", 0)
+    if summary and (covered > len(older) or summary.get("anchor") != _anchor(older, covered)):
+        # History no longer matches what was summarized (edited, or cleared and reused)
+        metrics.incr("chat.summary.reset")
+        summary, covered = {}, 0
+
+    gap = older[covered:]
+    if sum(estimate_tokens(m["content"]) for m in gap) > SUMMARY_SLACK_TOKENS:
+        if _session_filter(session_id, user_id) is not None and collection is not None:
+            _schedule_update(collection, session_id, user_id, summary, older)
+        # Until the new summary lands, keep only the newest part of the gap
+        _, gap = split_recent(gap, SUMMARY_SLACK_TOKENS)
+
+    recent = gap + tail
+    metrics.incr("chat.context.turns")
+    metrics.incr("chat.context.history_tokens", sum(estimate_tokens(m["content"]) for m in recent))
+    return summary.get("text"), recent
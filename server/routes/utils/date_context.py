@@ -0,0 +1,135 @@
+# ================== Date Context Service ==================
+# Clock-derived values (today, tomorrow, weekday mappings, time of day) and the
+# rendered date-context prompt fragments, computed once per minute per timezone
+# and shared by the chat reminder path (ask_query) and /format-reminder.
+import os
+from datetime import datetime, timedelta
+from functools import cached_property
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# IANA zone for reminder dates (e.g. "Asia/Kolkata"); empty means the server's local time
+DATE_CONTEXT_TZ = os.getenv("DATE_CONTEXT_TZ", "")
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# tz name -> DateContext for the current minute
+_snapshots = {}
+
+
+class DateContext:
+    """Date lookups and prompt fragments for one minute. now is naive wall-clock time in the zone."""
+
+    def __init__(self, now):
+        self.now = now
+        self.today = now.strftime("%Y-%m-%d")
+        self.tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+        self.day_after_tomorrow = (now + timedelta(days=2)).strftime("%Y-%m-%d")
+        self.weekday_name = WEEKDAYS[now.weekday()]
+        # Next 14 days: date strings, "Month DD" labels and weekday names by offset
+        self.dates = [(now + timedelta(days=i)) for i in range(14)]
+        self.date_strs = [d.strftime("%Y-%m-%d") for d in self.dates]
+        # weekday name -> date of its next occurrence, today included
+        self.days_ahead = {WEEKDAYS[d.weekday()]: s for d, s in zip(self.dates[:7], self.date_strs)}
+        # weekday name -> date of its next occurrence, a week out (never today)
+        self.next_weekday = {
+            day: (now + timedelta(days=(i - now.weekday()) % 7 or 7)).strftime("%Y-%m-%d")
+            for i, day in enumerate(WEEKDAYS)
+        }
+        # Next Monday (or a week from today when today is Monday)
+        self.next_week = (now + timedelta(days=(7 - now.weekday()) % 7 or 7)).strftime("%Y-%m-%d")
+        # First weekday (Mon-Fri) after today
+        self.next_business_day = next(s for d, s in zip(self.dates[1:], self.date_strs[1:]) if d.weekday() < 5)
+
+    @cached_property
+    def chat_context(self):
+        """Date context for the chat reminder-setup prompt."""
+        now = self.now
+        weekdays_ahead = {}
+        for d, date_str in zip(self.dates, self.date_strs):
+            key = f"next {WEEKDAYS[d.weekday()]}"
+            if d.weekday() < 5 and key not in weekdays_ahead:
+                weekdays_ahead[key] = date_str
+        return f"""
+CURRENT DATE & TIME CONTEXT (Use this for intelligent date/time inference):
+
+Current Information:
+
+Day Name Mappings (next 7 days):
+""" + "\n".join([f"- {day} ({(now + timedelta(days=i)).strftime('%B %d')}): {date}" for i, (day, date) in enumerate(self.days_ahead.items()) if day != self.weekday_name and i < 7]) + f"""
+
+Weekday Mappings (for appointments/business):
+""" + "\n".join([f"- {day}: {date}" for day, date in weekdays_ahead.items()]) + f"""
+
+Smart Time Defaults (use when time not specified):
+
+Smart Date Defaults (use when date not specified):
+
+Extended Time References:
+
+INFERENCE RULES:
+1. "medicine" without time → 9:00 AM (morning) or 8:00 PM (if "evening" mentioned)
+2. "appointment" without date → next weekday (Monday-Friday)
+3. "tomorrow" → {self.tomorrow}
+4. "today" → {self.today}
+5. Weekday names → map to next occurrence of that day
+6. Meal names → breakfast: 8:00 AM, lunch: 12:00 PM, dinner: 7:00 PM
+7. Time of day words → morning: 9:00 AM, afternoon: 3:00 PM, evening: 7:00 PM, night: 8:00 PM
+8. No date/time specified → use smart defaults based on task type and current time
+"""
+
+    @cached_property
+    def reminder_context(self):
+        """Date context for the /format-reminder parser prompt (includes the current time)."""
+        now = self.now
+        current_hour = now.hour
+        if 5 <= current_hour < 12:
+            time_of_day, suggested_time = "morning", "9:00 AM"
+        elif 12 <= current_hour < 17:
+            time_of_day, suggested_time = "afternoon", "3:00 PM"
+        elif 17 <= current_hour < 21:
+            time_of_day, suggested_time = "evening", "7:00 PM"
+        else:
+            time_of_day, suggested_time = "night", "8:00 PM"
+        tomorrow_name = WEEKDAYS[self.dates[1].weekday()]
+
+        return f"""
+CURRENT DATE & TIME CONTEXT (Use this for intelligent date/time inference):
+
+Current Information:
+- Today is: {self.today} ({self.weekday_name.capitalize()})
+- Tomorrow is: {self.tomorrow} ({tomorrow_name.capitalize()})
+- Current time: {now.strftime("%H:%M")} ({time_of_day})
+
+Day Name Mappings:
+- Today ({self.weekday_name}): {self.today}
+- Tomorrow ({tomorrow_name}): {self.tomorrow}
+""" + "\n".join([f"- {day}: {date}" for day, date in self.days_ahead.items() if day != self.weekday_name]) + f"""
+
+Smart Defaults:
+- If no date specified: use tomorrow for medicine/health, today for general tasks
+- If no time specified: use {suggested_time} (current {time_of_day}) or 9:00 AM for medicine
+- Convert relative dates (today/tomorrow/Monday/etc.) to exact dates using the mapping above
+"""
+
+
+def _wall_clock(tz_name):
+    if not tz_name:
+        return datetime.now()
+    return datetime.now(ZoneInfo(tz_name)).replace(tzinfo=None)
+
+
+def current(tz_name=None):
+    """The DateContext for this minute in tz_name (default DATE_CONTEXT_TZ, else server local time)."""
+    tz_name = DATE_CONTEXT_TZ if tz_name is None else tz_name
+    minute = _wall_clock(tz_name).replace(second=0, microsecond=0)
+    snapshot = _snapshots.get(tz_name)
+    if snapshot is None or snapshot.now != minute:
+        # Racing requests may both build one; they are identical, so last write wins
+        snapshot = _snapshots[tz_name] = DateContext(minute)
+    return snapshot
+
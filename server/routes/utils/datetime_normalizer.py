@@ -0,0 +1,217 @@
+# ================== Date/Time Normalizer ==================
+# Normalizes LLM- and user-supplied reminder dates to YYYY-MM-DD and times to
+# "H:MM AM/PM". Each value is classified once by its shape (ISO, relative word,
+# weekday, numeric with separators, month name, free text) and sent straight to
+# the matching parser; the patterns are compiled at import. Outputs match the
+# previous validate_date / validate_time chains, quirks included (e.g. an input
+# starting "9:30 pm" is returned whole, upper-cased).
+import re
+import calendar
+from datetime import datetime
+
+from routes.utils import date_context, reminder_defaults
+
+EMPTY_VALUES = ('null', 'none', '', 'undefined')
+DEFAULT_TIME = "9:00 AM"
+
+# ================== Date Patterns ==================
+_ISO_PREFIX = re.compile(r'\d{4}-\d{2}-\d{2}')
+_ISO = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+# Numeric dates with one kind of separator; a day may carry one leading space (as strptime's %d allows)
+_NUMERIC = re.compile(r'( ?\d+)([/-])( ?\d+)(?:\2( ?\d+))?')
+_DIGITS = re.compile(r'\d+')
+# strptime's own field patterns (%m, %d, %Y)
+_MONTH_FIELD = re.compile(r'1[0-2]|0[1-9]|[1-9]')
+_DAY_FIELD = re.compile(r'3[01]|[12]\d|0[1-9]|[1-9]| [1-9]')
+_YEAR_FIELD = re.compile(r'\d\d\d\d')
+_MONTH_NAME = re.compile("|".join(name.lower() for name in calendar.month_name if name), re.IGNORECASE)
+
+# Field order of the numeric formats, tried in the same order as the old strptime list
+_NUMERIC_FORMATS = {
+    ('-', 3): [("Y", "m", "d"), ("m", "d", "Y"), ("d", "m", "Y")],
+    ('/', 3): [("m", "d", "Y"), ("d", "m", "Y"), ("Y", "m", "d")],
+    ('/', 2): [("m", "d"), ("d", "m")],
+}
+_FIELDS = {"m": _MONTH_FIELD, "d": _DAY_FIELD, "Y": _YEAR_FIELD}
+_TEXT_FORMATS = ("%B %d, %Y", "%B %d %Y", "%d %B %Y")
+
+# ================== Time Patterns ==================
+_TIME_AMPM_PREFIX = re.compile(r'\d{1,2}:\d{2}\s*(am|pm|a\.?m\.?|p\.?m\.?)')
+_TIME_HHMM = re.compile(r'(\d{1,2}):(\d{2})$')
+_TIME_AMPM = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.?m\.?|p\.?m\.?)')
+_TIME_COLON = re.compile(r'(\d{1,2}):(\d{2})')
+_TIME_HOUR = re.compile(r'\b(\d{1,2})\b')
+# Checked in order, as substrings
+TIME_WORDS = (
+    ('midnight', '12:00 AM'), ('noon', '12:00 PM'), ('breakfast', '8:00 AM'),
+    ('lunch', '12:30 PM'), ('dinner', '7:00 PM'), ('bedtime', '10:00 PM'),
+    ('morning', '9:00 AM'), ('afternoon', '3:00 PM'), ('evening', '7:00 PM'), ('night', '8:00 PM'),
+)
+
+
+def format_12hour(hour, minute):
+    if hour == 0:
+        return f"12:{minute:02d} AM"
+    elif hour < 12:
+        return f"{hour}:{minute:02d} AM"
+    elif hour == 12:
+        return f"12:{minute:02d} PM"
+    return f"{hour - 12}:{minute:02d} PM"
+
+
+# ================== Dates ==================
+def _numeric_date(ctx, parts, order, current_year_for_1900=True):
+    """A date from separated digit fields in the given order, or None if strptime would reject it."""
+    fields = {}
+    for value, field in zip(parts, order):
+        if not _FIELDS[field].fullmatch(value):
+            return None
+        fields[field] = int(value)
+    try:
+        parsed = datetime(fields.get("Y", 1900), fields["m"], fields["d"])
+        # strptime's placeholder year (no year given) means this year
+        if parsed.year == 1900 and current_year_for_1900:
+            parsed = parsed.replace(year=ctx.now.year)
+    except ValueError:
+        return None
+    return parsed.strftime("%Y-%m-%d")
+
+
+def _text_date(ctx, text):
+    for pattern in _TEXT_FORMATS:
+        try:
+            parsed = datetime.strptime(text, pattern)
+            if parsed.year == 1900:
+                parsed = parsed.replace(year=ctx.now.year)
+            return parsed.strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _loose_numbers_date(ctx, text):
+    """Last resort: the first two or three digit runs read as month/day[/year]."""
+    numbers = _DIGITS.findall(text)
+    if len(numbers) < 2:
+        return None
+    try:
+        if len(numbers) == 2:
+            month, day, year = int(numbers[0]), int(numbers[1]), ctx.now.year
+        else:
+            month, day, year = int(numbers[0]), int(numbers[1]), int(numbers[2])
+            if year < 100:
+                year += 2000
+        if month <= 12 and day <= 31:
+            return datetime(year, month, day).strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    return None
+
+
+def _normalize_date(ctx, text):
+    if _ISO_PREFIX.match(text):
+        match = _ISO.fullmatch(text)
+        # A malformed ISO-looking value falls back to today rather than to the other formats
+        return (match and _numeric_date(ctx, match.groups(), ("Y", "m", "d"), False)) or ctx.today
+
+    lower = text.lower()
+    if lower == 'today':
+        return ctx.today
+    if lower == 'tomorrow':
+        return ctx.tomorrow
+    if lower == 'yesterday':
+        return ctx.yesterday
+    if 'day after tomorrow' in lower:
+        return ctx.day_after_tomorrow
+    for day, date in ctx.next_weekday.items():
+        if day in lower:
+            return date
+    if 'next week' in lower:
+        return ctx.next_week
+    if 'this week' in lower:
+        return ctx.tomorrow
+
+    numeric = _NUMERIC.fullmatch(text)
+    if numeric:
+        sep = numeric.group(2)
+        parts = [p for p in (numeric.group(1), numeric.group(3), numeric.group(4)) if p is not None]
+        for order in _NUMERIC_FORMATS.get((sep, len(parts)), ()):
+            result = _numeric_date(ctx, parts, order)
+            if result:
+                return result
+    elif _MONTH_NAME.search(text):
+        result = _text_date(ctx, text)
+        if result:
+            return result
+    return _loose_numbers_date(ctx, text) or ctx.today
+
+
+def normalize_date(value, ctx=None):
+    """Any date-ish value -> YYYY-MM-DD; unusable input becomes today."""
+    ctx = ctx or date_context.current()
+    if not value or str(value).lower() in EMPTY_VALUES:
+        return ctx.today
+    try:
+        return _normalize_date(ctx, str(value).strip())
+    except Exception:
+        return ctx.today
+
+
+# ================== Times ==================
+def _normalize_time(text):
+    if _TIME_AMPM_PREFIX.match(text):
+        return text.upper().replace('.', '')
+    hhmm = _TIME_HHMM.match(text)
+    if hhmm:
+        hour, minute = int(hhmm.group(1)), int(hhmm.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return format_12hour(hour, minute)
+    for word, value in TIME_WORDS:
+        if word in text:
+            return value
+    match = _TIME_AMPM.search(text)
+    if match:
+        hour = int(match.group(1))
+        minute = int(match.group(2)) if match.group(2) else 0
+        if 1 <= hour <= 12 and 0 <= minute <= 59:
+            return f"{hour}:{minute:02d} {'AM' if 'a' in match.group(3) else 'PM'}"
+    match = _TIME_COLON.search(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return format_12hour(hour, minute)
+    match = _TIME_HOUR.search(text)
+    if match and int(match.group(1)) <= 23:
+        return format_12hour(int(match.group(1)), 0)
+    return DEFAULT_TIME
+
+
+def normalize_time(value):
+    """Any time-ish value -> "H:MM AM/PM"; unusable input becomes 9:00 AM."""
+    if not value or str(value).lower() in EMPTY_VALUES:
+        return DEFAULT_TIME
+    try:
+        return _normalize_time(str(value).strip().lower())
+    except Exception:
+        return DEFAULT_TIME
+
+
+# ================== Batch ==================
+def normalize_reminders(reminders, ctx=None):
+    """
+    [{title, date, time}] with smart defaults for missing dates/times and every value
+    normalized, for a batch of parsed reminders sharing one date context. A parsed
+    recurrence rule is passed through for save-time normalization.
+    """
+    ctx = ctx or date_context.current()
+    results = []
+    for reminder in reminders:
+        title = reminder.get('title') or "New Reminder"
+        date = reminder.get('date') or reminder_defaults.default_date(title, ctx)
+        time_value = reminder.get('time') or reminder_defaults.default_time(title, ctx)
+        result = {"title": title, "date": normalize_date(date, ctx), "time": normalize_time(time_value)}
+        if reminder.get('recurrence'):
+            result['recurrence'] = reminder['recurrence']
+        results.append(result)
+    return results
+
@@ -0,0 +1,123 @@
+# ================== Emergency Pre-classifier ==================
+# Deterministic rules that settle clearly safe messages locally so only messages
+# that might describe distress pay for a Gemini call in analyze_emergency_intent.
+# A positive is never final here: emergency phrases also appear in harmless
+# sentences ("I fell in love with this song", "a movie about a heart attack"),
+# and an emergency verdict alerts the user's contacts, so every possible
+# emergency goes to the LLM classifier.
+import re
+
+from routes.utils import metrics
+
+# Phrases that describe an emergency, matched on word boundaries. Used to send a
+# message to the LLM and to prioritise it (looks_urgent), never to decide it.
+EMERGENCY_PHRASES = {
+    "medical": [
+        "chest pain", "chest hurts", "heart attack", "can't breathe", "cannot breathe",
+        "can not breathe", "not breathing", "stopped breathing", "stroke", "unconscious",
+        "passed out", "fainted", "collapsed", "overdose", "overdosed", "bleeding a lot",
+        "bleeding heavily", "won't stop bleeding", "choking", "seizure", "not waking up",
+        "won't wake up", "face is drooping", "can't feel my",
+        "i fell", "i have fallen", "i've fallen", "fell down", "had a fall", "can't get up",
+        "cannot get up", "severe pain", "terrible pain", "broke my", "broken bone",
+        "call an ambulance", "need an ambulance", "call 911", "call 112", "call 999",
+        "short of breath", "trouble breathing", "difficulty breathing", "hard to breathe",
+        "heart is racing", "coughing blood", "vomiting blood",
+    ],
+    "emotional": [
+        "suicide", "suicidal", "kill myself", "want to die", "end my life", "hurt myself",
+    ],
+    "safety": [
+        "house is on fire", "there is a fire", "there's a fire", "gas leak", "smell gas",
+        "someone broke in", "breaking in", "intruder",
+        "i'm lost", "i am lost", "someone is following me", "stranger in my house",
+    ],
+}
+
+# Words that signal possible distress; any hit keeps an unmatched message in the LLM band
+RISK_TERMS = [
+    "pain", "painful", "hurt", "hurts", "hurting", "ache", "aching", "bleed", "bleeding", "blood",
+    "fall", "fell", "fallen", "falling", "dizzy", "dizziness", "faint", "lightheaded", "breath",
+    "breathe", "breathing", "chest", "heart", "help", "ambulance", "911", "hospital", "doctor",
+    "sick", "ill", "vomit", "vomiting", "fever", "collapse", "wake", "scared", "afraid", "frightened",
+    "alone", "lonely", "die", "dying", "dead", "death", "kill", "hopeless", "depressed", "attack",
+    "fire", "smoke", "gas", "burglar", "stranger", "lost", "confused", "injured", "injury", "broken",
+    "bruise", "cut", "burn", "burned", "choke", "numb", "weak", "shaking", "emergency", "urgent",
+    "police", "accident", "medicine", "medication", "pills", "overdose", "unwell", "worse",
+    "tablets", "too many", "responding", "unresponsive", "end it", "gone", "miss me", "goodbye",
+    "can't go on", "give up", "no point", "won't be here", "better off without",
+]
+
+# Clearly benign intents (information, small talk, entertainment). Only a message that
+# matches one of these and carries no risk term is settled as safe without the LLM.
+BENIGN_PATTERNS = [
+    r"\bweather\b", r"\bforecast\b", r"\bnews\b", r"\brecipe\b", r"\bjoke\b", r"\bstory\b",
+    r"\bpoem\b", r"\bsong\b", r"\bmovie\b", r"\bgame\b", r"\bwhat time is it\b", r"\bwhat day is\b",
+    # Greetings and thanks only when they are the whole message ("hi, my husband isn't responding" is not)
+    r"^(hi|hello|hey|good (morning|afternoon|evening)|thanks|thank you)( there)?[\s!.,]*$",
+    r"\bhow are you\b", r"\btell me about\b", r"\bwho (is|was)\b", r"\bwhat is the capital\b",
+]
+
+# Negation cues that cancel a phrase found within the next few words ("no chest pain", "I didn't fall")
+NEGATION_CUES = {
+    "no", "not", "never", "without", "don't", "dont", "didn't", "didnt", "doesn't", "isn't",
+    "wasn't", "haven't", "hasn't", "hadn't", "nor", "nothing", "none",
+}
+NEGATION_WINDOW = 3
+
+
+def _phrase_regex(phrases):
+    alternation = "|".join(sorted((re.escape(p) for p in phrases), key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b")
+
+
+_EMERGENCY_RE = _phrase_regex([phrase for phrases in EMERGENCY_PHRASES.values() for phrase in phrases])
+_RISK_RE = _phrase_regex(RISK_TERMS)
+_BENIGN_RE = re.compile("|".join(BENIGN_PATTERNS))
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", str(text or "").lower().replace("’", "'")).strip()
+
+
+def _is_negated(text, start):
+    preceding = _WORD_RE.findall(text[:start])[-NEGATION_WINDOW:]
+    return any(word in NEGATION_CUES for word in preceding)
+
+
+def pre_classify_emergency(text):
+    """
+    Settle clearly safe messages without the LLM.
+    Returns: (False, confidence, details) for a message that is recognisably benign and
+    carries no emergency phrase or risk term, else None so the LLM classifier decides.
+    """
+    normalized = _normalize(text)
+    if not normalized:
+        return None
+
+    # Negated phrases ("I didn't fall") are deferred too; the LLM reads them better than a window
+    if _EMERGENCY_RE.search(normalized):
+        metrics.incr("emergency_rules.deferred.emergency_phrase")
+        return None
+
+    # Absence of a risk term alone proves nothing ("I'm going to end it all"); settle
+    # as safe only when the message is also recognisably benign
+    if not _BENIGN_RE.search(normalized) or _RISK_RE.search(normalized):
+        metrics.incr("emergency_rules.deferred")
+        return None
+    metrics.incr("emergency_rules.decided.safe")
+    return False, 0.95, {"type": None, "urgency": "none", "reason": "no distress signals", "source": "rules"}
+
+
+def looks_urgent(text):
+    """
+    Cheap check used for request prioritisation: any non-negated emergency phrase or
+    risk term. Deliberately broader than pre_classify_emergency() and records no metrics.
+    """
+    normalized = _normalize(text)
+    if not normalized:
+        return False
+    if any(not _is_negated(normalized, m.start()) for m in _EMERGENCY_RE.finditer(normalized)):
+        return True
+    return bool(_RISK_RE.search(normalized))
@@ -0,0 +1,82 @@
+# ================== Bounded Fan-out ==================
+# Two bounded thread pools for per-request concurrent work: one for intent
+# classifier stages and one for everything else (speculative replies, summary
+# refreshes), so slow background replies can never starve the stages that
+# decide the response. Plus a helper that runs named stages against an
+# overall deadline and substitutes defaults for late stages.
+import os
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from routes.utils import metrics
+
+CHAT_WORKERS = int(os.getenv("CHAT_WORKERS", "16"))
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "16"))
+
+executor = ThreadPoolExecutor(max_workers=CHAT_WORKERS, thread_name_prefix="chat-worker")
+stage_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage-worker")
+
+
+def _submit(pool, fn, *args, **kwargs):
+    ctx = contextvars.copy_context()
+    return pool.submit(ctx.run, fn, *args, **kwargs)
+
+
+def submit(fn, *args, **kwargs):
+    """Submit background work to the chat pool, carrying the caller's context variables into the worker."""
+    return _submit(executor, fn, *args, **kwargs)
+
+
+def run_stages(stages, deadline, defaults):
+    """
+    Run named zero-argument callables concurrently with one overall deadline (seconds).
+    Stages run on their own pool and get defaults[name] when they miss the deadline or raise.
+    Returns: (results: dict, timings_ms: dict, late: set of stage names)
+    """
+    started = time.perf_counter()
+    durations = {}
+
+    def run(name, fn):
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            durations[name] = time.perf_counter() - t0
+
+    futures = {name: _submit(stage_executor, run, name, fn) for name, fn in stages.items()}
+    wait(futures.values(), timeout=deadline)
+
+    return collect(futures, durations, started, defaults)
+
+
+def collect(handles, durations, started, defaults):
+    """
+    Results of stage futures or asyncio tasks once the deadline has passed: finished
+    stages keep their result, late or failed ones are cancelled and get defaults[name].
+    Returns: (results: dict, timings_ms: dict, late: set of stage names)
+    """
+    results, timings_ms, late = {}, {}, set()
+    for name, handle in handles.items():
+        if handle.done() and not handle.cancelled() and handle.exception() is None:
+            results[name] = handle.result()
+            timings_ms[name] = round(durations.get(name, 0.0) * 1000, 1)
+            metrics.observe(f"intent.stage.{name}", durations.get(name, 0.0))
+            continue
+        if not handle.done():
+            handle.cancel()
+            metrics.incr(f"intent.stage.{name}.deadline_missed")
+        else:
+            metrics.incr(f"intent.stage.{name}.errors")
+        results[name] = defaults[name]
+        timings_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+        late.add(name)
+    return results, timings_ms, late
+
+
+def server_timing_header(timings_ms, late=()):
+    """Format stage timings as a Server-Timing header value."""
+    return ", ".join(
+        f'{name};dur={ms}' + (';desc="default"' if name in late else "")
+        for name, ms in timings_ms.items()
+    )
@@ -0,0 +1,174 @@
+# ================== Index Manager ==================
+# Declares the indexes behind the server's hot Mongo queries, creates any that
+# are missing (create_indexes is idempotent, so this is safe on every start),
+# and explain()s each hot query to flag ones that still fall back to a
+# collection scan. Runs in the background at app start when MONGO_ENSURE_INDEXES
+# is on, and from the command line:
+#   python -m routes.utils.indexes            # create missing indexes, then explain the hot queries
+#   python -m routes.utils.indexes --check    # only report; create nothing
+import os
+import sys
+import argparse
+import threading
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from routes.utils import metrics, mongo, recurrence, llm_cache
+
+# Load environment variables
+load_dotenv()
+
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() in ("1", "true", "yes")
+
+# ================== Declared Indexes ==================
+# env var naming the collection -> [(name, keys, options)]; _id lookups use the built-in _id index
+INDEXES = {
+    # /reminders (userId, plus the date window and series filters) and delete-by-user
+    "REMINDERS_COLLECTION": [
+        ("userId_date", [("userId", ASCENDING), ("date", ASCENDING)], {}),
+    ],
+    # GET by user_id, DELETE by (user_id, id)
+    "SAVED_CONTACTS_COLLECTION": [
+        ("user_id_id", [("user_id", ASCENDING), ("id", ASCENDING)], {}),
+    ],
+    # /loadChat, /saveChat and /deleteChat list a user's sessions
+    "CHAT_SESSIONS_COLLECTION": [
+        ("userId", [("userId", ASCENDING)], {}),
+    ],
+    # Message pages and whole-session reads; unique so two writers can never hold the same seq
+    "CHAT_MESSAGES_COLLECTION": [
+        ("sessionId_seq", [("sessionId", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+    ],
+}
+# The Mongo LLM cache backend relies on a TTL index to purge expired entries
+if os.getenv("LLM_CACHE_BACKEND", "memory").lower() == "mongo":
+    INDEXES["LLM_CACHE_COLLECTION"] = [
+        ("expiresAt_ttl", [("expiresAt", ASCENDING)], {"expireAfterSeconds": 0}),
+    ]
+# Collections whose name env var is optional
+DEFAULT_NAMES = {"LLM_CACHE_COLLECTION": llm_cache.LLM_CACHE_COLLECTION_DEFAULT}
+
+
+def _hot_queries():
+    """(env var, label, filter) for the queries the routes run on every request, with placeholder values."""
+    user, oid = "index-check-user", ObjectId()
+    first, last = recurrence.window()
+    return [
+        ("REMINDERS_COLLECTION", "find by userId", {"userId": user}),
+        ("REMINDERS_COLLECTION", "/reminders window",
+         {"userId": user, "$or": [{"recurrence": None}, recurrence.series_filter(first, last)]}),
+        ("REMINDERS_COLLECTION", "delete by _id + userId", {"_id": oid, "userId": user}),
+        ("SAVED_CONTACTS_COLLECTION", "find by user_id", {"user_id": user}),
+        ("SAVED_CONTACTS_COLLECTION", "delete by user_id + id", {"user_id": user, "id": "contact"}),
+        ("CHAT_SESSIONS_COLLECTION", "find by userId", {"userId": user}),
+        ("CHAT_SESSIONS_COLLECTION", "update by _id + userId", {"_id": oid, "userId": user}),
+        ("CHAT_MESSAGES_COLLECTION", "message page", {"sessionId": oid, "seq": {"$lt": 50}}),
+        ("CHAT_MESSAGES_COLLECTION", "seq after", {"sessionId": oid, "seq": {"$gt": 0}}),
+    ]
+
+
+# ================== Provisioning ==================
+def ensure_indexes(create=True):
+    """
+    Create missing declared indexes (unless create is False).
+    Returns {env var: {"collection", "present", "missing", "created"}} or {"skipped": reason}.
+    """
+    report = {}
+    for env_name, specs in INDEXES.items():
+        coll = mongo.collection(env_name, DEFAULT_NAMES.get(env_name))
+        if coll is None:
+            report[env_name] = {"skipped": "not configured"}
+            continue
+        existing = coll.index_information()
+        # An index with the same keys under another name already serves the query
+        existing_keys = {tuple(map(tuple, info["key"])) for info in existing.values()}
+        have = {name for name, keys, _ in specs if name in existing or tuple(keys) in existing_keys}
+        missing = [(name, keys, options) for name, keys, options in specs if name not in have]
+        created = []
+        if create and missing:
+            created = coll.create_indexes([IndexModel(keys, name=name, **options) for name, keys, options in missing])
+            metrics.incr("mongo.indexes.created", len(created))
+        report[env_name] = {
+            "collection": coll.name,
+            "present": [name for name, _, _ in specs if name in have],
+            "missing": [name for name, _, _ in missing if name not in created],
+            "created": created,
+        }
+    return report
+
+
+def _stages(plan):
+    """Every stage name in an explain plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def check_queries():
+    """explain() each hot query; a winning plan containing COLLSCAN is not index-backed."""
+    results = []
+    for env_name, label, query in _hot_queries():
+        coll = mongo.collection(env_name, DEFAULT_NAMES.get(env_name))
+        if coll is None:
+            continue
+        # Updates and deletes pick their plan from the filter the same way a find does
+        plan = coll.find(query).limit(1).explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(dict.fromkeys(_stages(plan)))
+        indexed = "COLLSCAN" not in stages
+        if not indexed:
+            metrics.incr("mongo.indexes.collscan")
+        results.append({"collection": coll.name, "query": label, "indexed": indexed, "stages": stages})
+    return results
+
+
+def ensure_in_background():
+    """Provision indexes off the request path at app start (MONGO_ENSURE_INDEXES)."""
+    if not MONGO_ENSURE_INDEXES or not mongo.configured():
+        return None
+
+    def run():
+        try:
+            ensure_indexes()
+        except PyMongoError as e:
+            metrics.incr(f"mongo.indexes.errors.{type(e).__name__}")
+
+    thread = threading.Thread(target=run, name="mongo-ensure-indexes", daemon=True)
+    thread.start()
+    return thread
+
+
+# ================== CLI ==================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the declared Mongo indexes and explain the hot queries.")
+    parser.add_argument("--check", action="store_true", help="Report missing indexes without creating them")
+    args = parser.parse_args(argv)
+
+    if not mongo.configured():
+        parser.error("MONGO_URI and DB_NAME must be set")
+
+    for env_name, entry in ensure_indexes(create=not args.check).items():
+        if "skipped" in entry:
+            print(f"{env_name}: skipped ({entry['skipped']})")
+            continue
+        print(f"{entry['collection']}: present {entry['present'] or '-'}  created {entry['created'] or '-'}  "
+              f"missing {entry['missing'] or '-'}")
+
+    unindexed = 0
+    for result in check_queries():
+        status = "ok  " if result["indexed"] else "SCAN"
+        unindexed += not result["indexed"]
+        print(f"  [{status}] {result['collection']}: {result['query']}  ({' > '.join(result['stages'])})")
+    # Non-zero exit lets CI or a deploy hook fail on a collection scan
+    return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
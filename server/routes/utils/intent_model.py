@@ -0,0 +1,228 @@
+# ================== Reminder Intent Model ==================
+# A small multinomial naive Bayes model trained offline from the (message, verdict)
+# pairs the LLM reminder classifier has already produced. At runtime it gates the
+# LLM call: messages the model is confident are not reminders skip Gemini.
+#
+# Train:   python -m routes.utils.intent_model --log intent_log.jsonl --out reminder_intent_model.json
+import os
+import re
+import sys
+import json as pyjson
+import math
+import random
+import argparse
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+
+from routes.utils import metrics
+
+# Load environment variables
+load_dotenv()
+
+# JSONL file the classifiers append LLM verdicts to (unset disables logging)
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH")
+# Trained artifact used by the runtime gate (unset disables the gate)
+REMINDER_MODEL_PATH = os.getenv("REMINDER_MODEL_PATH")
+
+# Same cut-off send_message uses to take the reminder path
+REMINDER_LABEL_CONFIDENCE = 0.2
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_log_lock = threading.Lock()
+_model = None
+_model_loaded = False
+
+
+def featurize(text):
+    """Unigram and bigram tokens of the lowercased message."""
+    # Regex tokens rather than TextBlob(...).words, which needs the NLTK punkt corpus at runtime
+    tokens = _TOKEN_RE.findall(str(text or "").lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+# ================== Verdict Logging ==================
+def log_reminder_verdict(text, is_reminder, confidence, model=None):
+    """
+    Append one LLM reminder verdict to INTENT_LOG_PATH for later training.
+    model records which classifier model produced it, so routed models can be compared.
+    """
+    if not INTENT_LOG_PATH or not text:
+        return
+    record = {
+        "message": text,
+        "is_reminder": bool(is_reminder),
+        "confidence": float(confidence or 0.0),
+        "model": model,
+        "ts": datetime.utcnow().isoformat(),
+    }
+    try:
+        with _log_lock, open(INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(pyjson.dumps(record) + "\n")
+    except OSError:
+        metrics.incr("intent_model.log_errors")
+
+
+def load_verdicts(path):
+    """Read (message, label) pairs from a verdict log, de-duplicated by message."""
+    pairs = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = pyjson.loads(line)
+            except ValueError:
+                continue
+            message = record.get("message")
+            if not message:
+                continue
+            label = bool(record.get("is_reminder")) and float(record.get("confidence", 0.0)) > REMINDER_LABEL_CONFIDENCE
+            pairs[message] = label
+    return list(pairs.items())
+
+
+# ================== Model ==================
+def train(pairs, alpha=1.0):
+    """Fit multinomial naive Bayes over featurize() tokens. Returns a JSON-serializable model."""
+    counts = {True: {}, False: {}}
+    totals = {True: 0, False: 0}
+    docs = {True: 0, False: 0}
+    for text, label in pairs:
+        docs[label] += 1
+        for token in featurize(text):
+            counts[label][token] = counts[label].get(token, 0) + 1
+            totals[label] += 1
+
+    vocab = set(counts[True]) | set(counts[False])
+    n_docs = docs[True] + docs[False]
+    model = {"version": 1, "alpha": alpha, "vocab_size": len(vocab), "threshold": 0.5}
+    for label, name in ((True, "reminder"), (False, "other")):
+        denominator = totals[label] + alpha * len(vocab)
+        model[name] = {
+            "log_prior": math.log((docs[label] + alpha) / (n_docs + 2 * alpha)),
+            "unk": math.log(alpha / denominator),
+            "tokens": {t: math.log((c + alpha) / denominator) for t, c in counts[label].items()},
+        }
+    return model
+
+
+def predict_proba(model, text):
+    """Probability that the message is a reminder request."""
+    scores = {}
+    for name in ("reminder", "other"):
+        params = model[name]
+        score = params["log_prior"]
+        for token in featurize(text):
+            score += params["tokens"].get(token, params["unk"])
+        scores[name] = score
+    # Softmax over the two log scores
+    diff = max(min(scores["other"] - scores["reminder"], 700), -700)
+    return 1.0 / (1.0 + math.exp(diff))
+
+
+def choose_threshold(model, holdout, target_recall=0.98):
+    """
+    Largest threshold that still keeps at least target_recall of held-out reminders above it.
+    Messages scoring below the threshold skip the LLM, so recall is what protects users.
+    """
+    positives = sorted(predict_proba(model, text) for text, label in holdout if label)
+    if not positives:
+        return 0.5
+    allowed_misses = int(math.floor(len(positives) * (1 - target_recall)))
+    return max(positives[allowed_misses] - 1e-9, 0.0)
+
+
+def evaluate(model, holdout, threshold):
+    """Precision/recall of 'is reminder' (score >= threshold) and the share of messages the gate skips."""
+    tp = fp = fn = tn = 0
+    for text, label in holdout:
+        predicted = predict_proba(model, text) >= threshold
+        if predicted and label:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif label:
+            fn += 1
+        else:
+            tn += 1
+    total = tp + fp + fn + tn
+    return {
+        "threshold": round(threshold, 6),
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 0.0,
+        "skip_rate": round((fn + tn) / total, 4) if total else 0.0,
+        "missed_reminders": fn,
+        "holdout_size": total,
+    }
+
+
+def save_model(model, path):
+    with open(path, "w", encoding="utf-8") as f:
+        pyjson.dump(model, f, separators=(",", ":"))
+
+
+def load_model(path):
+    with open(path, encoding="utf-8") as f:
+        return pyjson.load(f)
+
+
+# ================== Runtime Gate ==================
+def _get_model():
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        if REMINDER_MODEL_PATH and os.path.exists(REMINDER_MODEL_PATH):
+            try:
+                _model = load_model(REMINDER_MODEL_PATH)
+            except (OSError, ValueError):
+                metrics.incr("intent_model.load_errors")
+    return _model
+
+
+def reminder_gate_skips(text):
+    """True when the model is confident the message is not a reminder, so the LLM call can be skipped."""
+    model = _get_model()
+    if model is None:
+        return False
+    skip = predict_proba(model, text) < model.get("threshold", 0.5)
+    metrics.incr("intent_model.gate.skipped" if skip else "intent_model.gate.passed")
+    return skip
+
+
+# ================== Training Command ==================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the reminder-intent gate from logged LLM verdicts.")
+    parser.add_argument("--log", default=INTENT_LOG_PATH, help="JSONL verdict log (default: INTENT_LOG_PATH)")
+    parser.add_argument("--out", default=REMINDER_MODEL_PATH or "reminder_intent_model.json", help="Model artifact path")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of pairs held out for evaluation")
+    parser.add_argument("--target-recall", type=float, default=0.98, help="Reminder recall the gate threshold must keep")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args(argv)
+
+    if not args.log or not os.path.exists(args.log):
+        parser.error("verdict log not found; set INTENT_LOG_PATH or pass --log")
+
+    pairs = load_verdicts(args.log)
+    random.Random(args.seed).shuffle(pairs)
+    split = max(1, int(len(pairs) * args.holdout))
+    holdout, training = pairs[:split], pairs[split:]
+    if not training or not any(label for _, label in training):
+        parser.error(f"need both reminder and non-reminder examples (got {len(pairs)} pairs)")
+
+    # Ship the model that was evaluated so the reported numbers describe the artifact
+    model = train(training)
+    model["threshold"] = choose_threshold(model, holdout, args.target_recall)
+    report = evaluate(model, holdout, model["threshold"])
+    model["report"] = report
+    save_model(model, args.out)
+
+    print(f"Trained on {len(training)} pairs, evaluated on {len(holdout)} held-out pairs")
+    print(f"Gate threshold: {report['threshold']}  (target recall {args.target_recall})")
+    print(f"Held-out precision: {report['precision']}  recall: {report['recall']}  "
+          f"missed reminders: {report['missed_reminders']}")
+    print(f"LLM calls skipped on held-out set: {report['skip_rate'] * 100:.1f}%")
+    print(f"Model written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
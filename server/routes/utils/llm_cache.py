@@ -0,0 +1,198 @@
+# ================== LLM Response Cache ==================
+import os
+import re
+import json as pyjson
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+from routes.utils import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Per-call-site TTLs in seconds. Call sites not listed here (e.g. the main chat reply) are never cached.
+CACHE_TTLS = {
+    "message_intent": int(os.getenv("LLM_CACHE_TTL_MESSAGE_INTENT", "3600")),
+    "emergency_intent": int(os.getenv("LLM_CACHE_TTL_EMERGENCY_INTENT", "3600")),
+    "reminder_intent": int(os.getenv("LLM_CACHE_TTL_REMINDER_INTENT", "86400")),
+    # Reminder prompts embed the current date/time context, so keep these short-lived
+    "parse_reminder": int(os.getenv("LLM_CACHE_TTL_PARSE_REMINDER", "60")),
+}
+
+LLM_CACHE_COLLECTION_DEFAULT = "llm_cache"
+
+
+def make_cache_key(model, messages):
+    """Content-addressed key: sha256 of the model plus whitespace-normalized messages."""
+    if isinstance(messages, (list, tuple)):
+        normalized = [
+            {"role": str(m.get("role", "user")).lower(), "content": re.sub(r"\s+", " ", str(m.get("content", ""))).strip()}
+            for m in messages
+        ]
+    else:
+        normalized = re.sub(r"\s+", " ", str(messages)).strip()
+    payload = pyjson.dumps({"model": model, "messages": normalized}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ================== Backends ==================
+class MemoryCacheBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                metrics.incr("llm_cache.evictions")
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """Local SQLite file shared by all workers on the same host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+
+class MongoCacheBackend:
+    """
+    Mongo collection shared by all workers. The TTL index on expiresAt that purges
+    stale entries is declared in routes.utils.indexes and created at app start.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get(self, key):
+        doc = self.collection.find_one({"_id": key, "expiresAt": {"$gt": datetime.utcnow()}}, {"value": 1})
+        return doc["value"] if doc else None
+
+    def set(self, key, value, ttl):
+        self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "value": value, "expiresAt": datetime.utcnow() + timedelta(seconds=ttl)},
+            upsert=True,
+        )
+
+
+# ================== Layered Cache ==================
+class ResponseCache:
+    """In-memory LRU in front of an optional shared backend (SQLite or Mongo)."""
+
+    def __init__(self, memory=None, shared=None):
+        self.memory = memory or MemoryCacheBackend()
+        self.shared = shared
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, call_site, outcome):
+        with self._lock:
+            site = self._stats.setdefault(call_site, {"hits": 0, "misses": 0})
+            site[outcome] += 1
+        metrics.incr(f"llm_cache.{outcome}.{call_site}")
+
+    def get(self, key, call_site):
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception:
+                metrics.incr("llm_cache.shared_errors")
+                value = None
+            if value is not None:
+                metrics.incr("llm_cache.shared_hits")
+                self.memory.set(key, value, CACHE_TTLS.get(call_site, 60))
+        self._count(call_site, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, ttl):
+        self.memory.set(key, value, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl)
+            except Exception:
+                metrics.incr("llm_cache.shared_errors")
+
+    def stats(self):
+        """Per-call-site hit/miss counts and hit rates."""
+        with self._lock:
+            sites = {
+                site: dict(counts, hit_rate=round(counts["hits"] / (counts["hits"] + counts["misses"]), 3))
+                for site, counts in self._stats.items()
+                if counts["hits"] + counts["misses"]
+            }
+        return {
+            "backend": type(self.shared).__name__ if self.shared is not None else None,
+            "memory_entries": len(self.memory),
+            "sites": sites,
+        }
+
+
+def build_cache_from_env():
+    """
+    LLM_CACHE_BACKEND: 'off', 'memory' (default), 'sqlite' or 'mongo'.
+    The shared backends sit behind the in-memory LRU so hits survive worker restarts.
+    """
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    if backend in ("off", "none", "false", "0"):
+        return None
+
+    memory = MemoryCacheBackend(max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")))
+    shared = None
+    if backend == "sqlite":
+        shared = SQLiteCacheBackend(os.getenv("LLM_CACHE_SQLITE_PATH", "llm_cache.sqlite3"))
+    elif backend == "mongo":
+        from routes.utils import mongo
+        collection = mongo.collection("LLM_CACHE_COLLECTION", LLM_CACHE_COLLECTION_DEFAULT)
+        if collection is not None:
+            shared = MongoCacheBackend(collection)
+    return ResponseCache(memory=memory, shared=shared)
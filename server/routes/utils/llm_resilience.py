@@ -0,0 +1,188 @@
+# ================== LLM Resilience ==================
+# Typed failures, bounded retries with jittered backoff and a circuit breaker for
+# Gemini calls. GeminiChatAdapter wraps every upstream request with these so a slow
+# or failing upstream surfaces as an LLMError quickly instead of tying up workers.
+import os
+import time
+import random
+import asyncio
+import threading
+from dotenv import load_dotenv
+
+from routes.utils import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Per-request HTTP timeouts (milliseconds). Classifier call sites get the shorter budget.
+LLM_TIMEOUT_MS = int(os.getenv("LLM_TIMEOUT_MS", "15000"))
+LLM_CLASSIFIER_TIMEOUT_MS = int(os.getenv("LLM_CLASSIFIER_TIMEOUT_MS", "3000"))
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_MS = int(os.getenv("LLM_RETRY_BASE_MS", "200"))
+LLM_RETRY_MAX_MS = int(os.getenv("LLM_RETRY_MAX_MS", "2000"))
+
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+
+# ================== Errors ==================
+class LLMError(Exception):
+    """An LLM call failed; retryable tells whether the same request may succeed later."""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMTimeoutError(LLMError):
+    """The upstream did not answer within the per-call timeout."""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=True)
+
+
+class LLMUnavailableError(LLMError):
+    """The upstream is overloaded or down (5xx, 429, connection errors, open circuit)."""
+
+    def __init__(self, message):
+        super().__init__(message, retryable=True)
+
+
+def classify_error(exc):
+    """Maps a google.genai / httpx exception to an LLMError subclass."""
+    if isinstance(exc, LLMError):
+        return exc
+    name = type(exc).__name__
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in name:
+        return LLMTimeoutError(f"{name}: {exc}")
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        if code == 429 or code >= 500:
+            return LLMUnavailableError(f"HTTP {code}: {exc}")
+        return LLMError(f"HTTP {code}: {exc}")
+    if isinstance(exc, (ConnectionError, OSError)) or "Connect" in name or "Network" in name:
+        return LLMUnavailableError(f"{name}: {exc}")
+    return LLMError(f"{name}: {exc}")
+
+
+# ================== Circuit Breaker ==================
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures and rejects calls
+    for `reset_seconds`. Then a single probe is let through (half-open); its outcome
+    closes the circuit or re-opens it for another period.
+    """
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_seconds=LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def state(self):
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raises LLMUnavailableError when the circuit rejects the call."""
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        metrics.incr("llm.breaker.rejected")
+        raise LLMUnavailableError("circuit open: Gemini marked unhealthy")
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                metrics.incr("llm.breaker.closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error):
+        # Client errors (bad request, auth) say nothing about upstream health
+        if not error.retryable:
+            with self._lock:
+                self._probe_in_flight = False
+            return
+        with self._lock:
+            self._failures += 1
+            reopen = self._probe_in_flight or (
+                self._opened_at is None and self._failures >= self.failure_threshold)
+            self._probe_in_flight = False
+            if reopen:
+                self._opened_at = time.monotonic()
+        if reopen:
+            metrics.incr("llm.breaker.opened")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self._state_locked(),
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+            }
+
+
+# ================== Retries ==================
+def backoff_seconds(attempt):
+    """Full-jitter exponential backoff for the given retry number (1-based)."""
+    cap = min(LLM_RETRY_MAX_MS, LLM_RETRY_BASE_MS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap) / 1000.0
+
+
+def call_with_retries(fn, breaker, max_retries=LLM_MAX_RETRIES):
+    """Runs fn() through the breaker, retrying retryable failures. Raises LLMError."""
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            error = classify_error(e)
+            breaker.record_failure(error)
+            metrics.incr(f"llm.errors.{type(error).__name__}")
+            attempt += 1
+            if not error.retryable or attempt > max_retries or breaker.state() != "closed":
+                raise error from e
+            metrics.incr("llm.retries")
+            time.sleep(backoff_seconds(attempt))
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_with_retries_async(fn, breaker, max_retries=LLM_MAX_RETRIES):
+    """Async variant of call_with_retries(); fn returns an awaitable."""
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = await fn()
+        except Exception as e:
+            error = classify_error(e)
+            breaker.record_failure(error)
+            metrics.incr(f"llm.errors.{type(error).__name__}")
+            attempt += 1
+            if not error.retryable or attempt > max_retries or breaker.state() != "closed":
+                raise error from e
+            metrics.incr("llm.retries")
+            await asyncio.sleep(backoff_seconds(attempt))
+            continue
+        breaker.record_success()
+        return result
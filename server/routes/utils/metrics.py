@@ -0,0 +1,55 @@
+# ================== In-process Metrics ==================
+import threading
+import time
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+
+
+def incr(name, amount=1):
+    """Increment a named counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name, seconds):
+    """Record one duration sample (in seconds) for a named timing."""
+    with _lock:
+        t = _timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        ms = seconds * 1000.0
+        t["count"] += 1
+        t["total_ms"] += ms
+        t["max_ms"] = max(t["max_ms"], ms)
+
+
+@contextmanager
+def timed(name):
+    """Context manager that records the wrapped block's duration under name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def get(name, default=0):
+    with _lock:
+        return _counters.get(name, default)
+
+
+def snapshot(prefix=None):
+    """Returns counters and timings (with averages), optionally filtered by name prefix."""
+    with _lock:
+        counters = {k: v for k, v in _counters.items() if not prefix or k.startswith(prefix)}
+        timings = {}
+        for k, t in _timings.items():
+            if prefix and not k.startswith(prefix):
+                continue
+            timings[k] = {
+                "count": t["count"],
+                "avg_ms": round(t["total_ms"] / t["count"], 2) if t["count"] else 0.0,
+                "max_ms": round(t["max_ms"], 2),
+            }
+    return {"counters": counters, "timings": timings}
@@ -0,0 +1,79 @@
+# ================== Chat Message Migration ==================
+# Moves the "messages" arrays embedded in chat session documents into the chat
+# messages collection (one document per message, seq 1..n in array order) and
+# unsets them, one session at a time. The routes migrate a session lazily on
+# first touch as well, so this only speeds up the switch; it is safe to stop
+# and re-run at any point.
+#   python -m routes.utils.migrate_messages              # migrate every embedded session
+#   python -m routes.utils.migrate_messages --dry-run    # count what would move
+import sys
+import argparse
+
+from dotenv import load_dotenv
+
+from routes.utils import mongo, session_store, indexes
+
+# Load environment variables
+load_dotenv()
+
+EMBEDDED = {"messages": {"$exists": True}}
+
+
+def pending(sessions):
+    """Ids of session documents that still embed messages."""
+    return [doc["_id"] for doc in sessions.find(EMBEDDED, {"_id": 1})]
+
+
+def migrate(sessions, messages, limit=None, dry_run=False):
+    """
+    Migrates up to limit embedded sessions. Sessions are read one at a time so a
+    large history never sits in memory with the rest. Returns
+    {"sessions", "messages", "raced", "remaining"}.
+    """
+    ids = pending(sessions)
+    todo = ids[:limit] if limit else ids
+    report = {"sessions": 0, "messages": 0, "raced": 0, "remaining": len(ids) - len(todo)}
+    for _id in todo:
+        doc = sessions.find_one({"_id": _id, **EMBEDDED})
+        if doc is None:
+            # Migrated by a request since the scan
+            continue
+        if dry_run:
+            report["sessions"] += 1
+            report["messages"] += len(doc.get("messages") or [])
+            continue
+        moved = session_store.migrate_session(sessions, messages, doc)
+        if moved is None:
+            # Written to mid-migration; a request or the next run picks it up
+            report["raced"] += 1
+            report["remaining"] += 1
+            continue
+        report["sessions"] += 1
+        report["messages"] += moved
+    return report
+
+
+# ================== CLI ==================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move embedded chat messages into the chat messages collection.")
+    parser.add_argument("--dry-run", action="store_true", help="Count the sessions and messages that would move")
+    parser.add_argument("--limit", type=int, default=None, help="Migrate at most this many sessions")
+    args = parser.parse_args(argv)
+
+    if not mongo.configured():
+        parser.error("MONGO_URI and DB_NAME must be set")
+    sessions = mongo.require("CHAT_SESSIONS_COLLECTION")
+    messages = mongo.require("CHAT_MESSAGES_COLLECTION")
+
+    if not args.dry_run:
+        # The unique (sessionId, seq) index must exist before messages are written
+        indexes.ensure_indexes()
+    report = migrate(sessions, messages, limit=args.limit, dry_run=args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(f"{sessions.name} -> {messages.name}: {verb} {report['messages']} messages from "
+          f"{report['sessions']} sessions; {report['raced']} raced, {report['remaining']} remaining")
+    return 1 if report["remaining"] and not args.limit and not args.dry_run else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# ================== Model Routing ==================
+# Maps each LLM call site to a route with its own model and generation config, so
+# the small JSON classifiers can run on a faster, cheaper model than the main chat.
+# Per-route latency and token counters (llm.<route>.*) make the trade-off measurable.
+import os
+from dotenv import load_dotenv
+
+from routes.utils import metrics
+from routes.utils.llm_resilience import LLM_TIMEOUT_MS, LLM_CLASSIFIER_TIMEOUT_MS
+
+# Load environment variables
+load_dotenv()
+
+CHAT_MODEL = os.getenv("MODEL_NAME", "gemini-2.0-flash")
+
+ROUTES = {
+    "classify": {
+        "model": os.getenv("LLM_CLASSIFY_MODEL", "gemini-2.0-flash-lite"),
+        "max_output_tokens": int(os.getenv("LLM_CLASSIFY_MAX_TOKENS", "256")),
+        "temperature": float(os.getenv("LLM_CLASSIFY_TEMPERATURE", "0.0")),
+        "timeout_ms": LLM_CLASSIFIER_TIMEOUT_MS,
+    },
+    "parse_reminder": {
+        "model": os.getenv("LLM_PARSE_REMINDER_MODEL", "gemini-2.0-flash-lite"),
+        "max_output_tokens": int(os.getenv("LLM_PARSE_REMINDER_MAX_TOKENS", "512")),
+        "temperature": float(os.getenv("LLM_PARSE_REMINDER_TEMPERATURE", "0.0")),
+        "timeout_ms": LLM_CLASSIFIER_TIMEOUT_MS,
+    },
+    "summarize": {
+        "model": os.getenv("LLM_SUMMARIZE_MODEL", "gemini-2.0-flash-lite"),
+        "max_output_tokens": int(os.getenv("LLM_SUMMARIZE_MAX_TOKENS", "400")),
+        "temperature": float(os.getenv("LLM_SUMMARIZE_TEMPERATURE", "0.2")),
+        "timeout_ms": LLM_TIMEOUT_MS,
+    },
+    "chat": {
+        "model": CHAT_MODEL,
+        "max_output_tokens": int(os.getenv("LLM_CHAT_MAX_TOKENS", "2048")),
+        "temperature": float(os.getenv("LLM_CHAT_TEMPERATURE", "0.7")),
+        "timeout_ms": LLM_TIMEOUT_MS,
+    },
+}
+
+# call_site -> route; anything unlisted (including no call_site) is the main chat
+CALL_SITE_ROUTES = {
+    "message_intent": "classify",
+    "emergency_intent": "classify",
+    "reminder_intent": "classify",
+    "parse_reminder": "parse_reminder",
+    "summarize": "summarize",
+    "chat": "chat",
+}
+
+
+def route_for(call_site):
+    """Returns (route_name, route_config) for a call site."""
+    name = CALL_SITE_ROUTES.get(call_site, "chat")
+    return name, ROUTES[name]
+
+
+def record_usage(route_name, resp):
+    """Count input/output tokens from a genai response's usage_metadata, when present."""
+    usage = getattr(resp, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+    output_tokens = getattr(usage, "candidates_token_count", None) or 0
+    # Part of prompt_token_count served from Gemini's implicit prefix cache (billed at the cached rate)
+    cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+    metrics.incr(f"llm.{route_name}.tokens.input", prompt_tokens)
+    metrics.incr(f"llm.{route_name}.tokens.output", output_tokens)
+    metrics.incr(f"llm.{route_name}.tokens.cached", cached_tokens)
+
+
+def describe():
+    """Routing table plus per-route call counts, latency and tokens per call."""
+    snapshot = metrics.snapshot("llm.")
+    counters, timings = snapshot["counters"], snapshot["timings"]
+    result = {}
+    for name, route in ROUTES.items():
+        latency = timings.get(f"llm.{name}.latency", {})
+        calls = latency.get("count", 0)
+        input_tokens = counters.get(f"llm.{name}.tokens.input", 0)
+        output_tokens = counters.get(f"llm.{name}.tokens.output", 0)
+        cached_tokens = counters.get(f"llm.{name}.tokens.cached", 0)
+        result[name] = {
+            **route,
+            "calls": calls,
+            "avg_latency_ms": latency.get("avg_ms"),
+            "max_latency_ms": latency.get("max_ms"),
+            "input_tokens_per_call": round(input_tokens / calls, 1) if calls else None,
+            "output_tokens_per_call": round(output_tokens / calls, 1) if calls else None,
+            "cached_tokens_per_call": round(cached_tokens / calls, 1) if calls else None,
+        }
+    return result
@@ -0,0 +1,219 @@
+# ================== Mongo Registry ==================
+# One MongoClient (and, for the ASGI app, one AsyncMongoClient) per process,
+# created on first use and shared by every blueprint, instead of a client per
+# route module built at import time. Collections are looked up by the env var
+# holding their name; a missing setting yields None (or a RuntimeError from
+# require()) at request time rather than an import-time crash.
+# Pool usage and checkout waits are tracked by a pool listener and served at
+# /metrics/mongo for sizing workers.
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, AsyncMongoClient, monitoring
+
+from routes.utils import metrics
+
+# Load environment variables
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("DB_NAME")
+# Connections per server; a request waiting longer than the wait-queue timeout fails fast
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# 0 means no socket timeout (the driver default)
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0"))
+# primary | primaryPreferred | secondary | secondaryPreferred | nearest
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "silvercare-server")
+
+
+# ================== Pool Listener ==================
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections for one client and records checkout wait times."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.open = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._started = threading.local()
+
+    def _adjust(self, attr, delta):
+        with self._lock:
+            setattr(self, attr, max(getattr(self, attr) + delta, 0))
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _wait(self, event):
+        # Events carry the checkout duration (pymongo >= 4.7); otherwise time it from the start event
+        duration = getattr(event, "duration", None)
+        if duration is None:
+            started = getattr(self._started, "at", None)
+            duration = time.perf_counter() - started if started is not None else 0.0
+        return duration
+
+    def pool_created(self, event):
+        self._adjust("pools", 1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        metrics.incr(f"mongo.{self.name}.pool_cleared")
+
+    def pool_closed(self, event):
+        self._adjust("pools", -1)
+
+    def connection_created(self, event):
+        self._adjust("open", 1)
+        metrics.incr(f"mongo.{self.name}.connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._adjust("open", -1)
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        metrics.incr(f"mongo.{self.name}.checkout_failed.{event.reason}")
+        metrics.observe(f"mongo.{self.name}.checkout_wait", self._wait(event))
+
+    def connection_checked_out(self, event):
+        self._adjust("in_use", 1)
+        metrics.observe(f"mongo.{self.name}.checkout_wait", self._wait(event))
+
+    def connection_checked_in(self, event):
+        self._adjust("in_use", -1)
+
+    def snapshot(self):
+        with self._lock:
+            capacity = MONGO_MAX_POOL_SIZE * max(self.pools, 1)
+            return {
+                "pools": self.pools,
+                "open": self.open,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "utilization": round(self.in_use / capacity, 3),
+            }
+
+
+# ================== Registry ==================
+_lock = threading.Lock()
+_client = None
+_async_client = None
+_listeners = {"sync": PoolListener("sync"), "async": PoolListener("async")}
+
+
+def configured():
+    return bool(MONGO_URI and DB_NAME)
+
+
+def client_options(listener):
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "appname": MONGO_APP_NAME,
+        "event_listeners": [listener],
+    }
+    if MONGO_SOCKET_TIMEOUT_MS:
+        options["socketTimeoutMS"] = MONGO_SOCKET_TIMEOUT_MS
+    return options
+
+
+def get_client():
+    """The process-wide MongoClient, created on first use; None when MONGO_URI/DB_NAME are unset."""
+    global _client
+    if not configured():
+        return None
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI, **client_options(_listeners["sync"]))
+    return _client
+
+
+def get_async_client():
+    """The process-wide AsyncMongoClient. Create it from inside the running event loop."""
+    global _async_client
+    if not configured():
+        return None
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncMongoClient(MONGO_URI, **client_options(_listeners["async"]))
+    return _async_client
+
+
+def get_db():
+    client = get_client()
+    return client[DB_NAME] if client is not None else None
+
+
+def collection(env_name, default=None):
+    """
+    The collection named by env var env_name (e.g. "REMINDERS_COLLECTION", falling back to
+    default) on the shared client, or None when Mongo or the collection name is not configured.
+    """
+    name = os.getenv(env_name, default)
+    client = get_client() if name else None
+    if client is None:
+        return None
+    return client[DB_NAME][name]
+
+
+def async_collection(env_name):
+    """collection() for the async client."""
+    name = os.getenv(env_name)
+    client = get_async_client() if name else None
+    if client is None:
+        return None
+    return client[DB_NAME][name]
+
+
+def require(env_name):
+    """collection(), raising RuntimeError when it is not configured."""
+    coll = collection(env_name)
+    if coll is None:
+        raise RuntimeError(f"Mongo collection {env_name} is not configured (check MONGO_URI, DB_NAME and {env_name}).")
+    return coll
+
+
+def close():
+    """Close the shared clients (tests, worker shutdown); the next call creates fresh ones."""
+    global _client, _async_client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        # AsyncMongoClient.close() is a coroutine; dropping the reference lets the loop reclaim it
+        _async_client = None
+
+
+def snapshot():
+    """Pool state per client plus checkout wait timings, for /metrics/mongo."""
+    return {
+        "configured": configured(),
+        "read_preference": MONGO_READ_PREFERENCE,
+        "clients": {
+            name: {"created": client is not None, **listener.snapshot()}
+            for name, listener, client in (("sync", _listeners["sync"], _client), ("async", _listeners["async"], _async_client))
+        },
+        **metrics.snapshot("mongo."),
+    }
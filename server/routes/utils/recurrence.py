@@ -0,0 +1,204 @@
+# ================== Recurrence Rules ==================
+# A repeating reminder is stored as one document carrying a compact rule
+# (RRULE-style) instead of one document per occurrence:
+#   {"freq": "daily" | "weekly", "interval": N, "byDay": ["monday", ...],
+#    "times": ["8:00 AM", "2:00 PM"], "until": "YYYY-MM-DD" | None}
+# The document's date is the first day of the series. Occurrences are never
+# stored; /reminders expands them lazily, only inside the requested window.
+import os
+import re
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+from routes.utils import date_context, datetime_normalizer
+
+# Load environment variables
+load_dotenv()
+
+# Window /reminders expands series over when the client does not ask for one
+REMINDER_WINDOW_DAYS = int(os.getenv("REMINDER_WINDOW_DAYS", "14"))
+# Longest window a client may request, and the most occurrences one response may carry
+REMINDER_MAX_WINDOW_DAYS = int(os.getenv("REMINDER_MAX_WINDOW_DAYS", "366"))
+REMINDER_MAX_OCCURRENCES = int(os.getenv("REMINDER_MAX_OCCURRENCES", "1000"))
+
+FREQUENCIES = ("daily", "weekly")
+WEEKDAYS = date_context.WEEKDAYS
+MAX_INTERVAL = 366
+_CLOCK = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def _weekday_index(value):
+    """'monday', 'Mon', 'MO' -> 0; None for anything else."""
+    text = str(value or "").strip().lower()
+    if len(text) < 2:
+        return None
+    for i, day in enumerate(WEEKDAYS):
+        if day.startswith(text):
+            return i
+    return None
+
+
+def _minutes(time_str):
+    """'2:30 PM' -> minutes after midnight, for ordering a day's times."""
+    match = _CLOCK.match(time_str)
+    if not match:
+        return 0
+    hour, minute = int(match.group(1)), int(match.group(2))
+    return (hour % 12 + (12 if "P" in time_str[match.end():] else 0)) * 60 + minute
+
+
+# ================== Normalization ==================
+def normalize_rule(raw, start_date):
+    """
+    A clean rule from LLM, local-parser or client input, or None when raw is not a
+    usable rule. start_date (YYYY-MM-DD) anchors weekly rules that name no weekday.
+    """
+    if not isinstance(raw, dict):
+        return None
+    freq = str(raw.get("freq") or "").strip().lower()
+    if freq not in FREQUENCIES:
+        return None
+    try:
+        interval = min(max(int(raw.get("interval") or 1), 1), MAX_INTERVAL)
+    except (TypeError, ValueError):
+        interval = 1
+
+    rule = {"freq": freq, "interval": interval}
+    if freq == "weekly":
+        indexes = {_weekday_index(day) for day in raw.get("byDay") or ()} - {None}
+        if not indexes:
+            start = _parse_date(start_date)
+            if start is None:
+                return None
+            indexes = {start.weekday()}
+        rule["byDay"] = [WEEKDAYS[i] for i in sorted(indexes)]
+
+    times = {datetime_normalizer.normalize_time(t) for t in raw.get("times") or () if t}
+    if times:
+        rule["times"] = sorted(times, key=_minutes)
+
+    until = _parse_date(raw.get("until"))
+    rule["until"] = until.strftime("%Y-%m-%d") if until else None
+    return rule
+
+
+def attach(reminder):
+    """
+    Copy of a reminder ready to store: a 'recurrence' value is normalized (or
+    dropped when unusable), and a series gets an ISO start date and its first time.
+    """
+    reminder = dict(reminder)
+    raw = reminder.pop("recurrence", None)
+    if raw is None:
+        return reminder
+    start = datetime_normalizer.normalize_date(reminder.get("date"))
+    rule = normalize_rule(raw, start)
+    if rule is None:
+        return reminder
+    reminder["date"] = start
+    if rule.get("times"):
+        reminder["time"] = rule["times"][0]
+    reminder["recurrence"] = rule
+    return reminder
+
+
+# ================== Expansion ==================
+def _days(rule, start, first, last):
+    """Dates of the series starting at start that fall in [first, last], in order, computed on demand."""
+    interval = rule.get("interval", 1)
+    until = _parse_date(rule.get("until"))
+    if until is not None:
+        last = min(last, until)
+    first = max(first, start)
+    if first > last:
+        return
+
+    if rule["freq"] == "daily":
+        # Jump straight to the first occurrence in the window
+        skip = -(-(first - start).days // interval)
+        day = start + timedelta(days=skip * interval)
+        while day <= last:
+            yield day
+            day += timedelta(days=interval)
+        return
+
+    offsets = sorted(WEEKDAYS.index(day) for day in rule["byDay"])
+    anchor = start - timedelta(days=start.weekday())
+    week = (first - anchor).days // 7
+    # Weeks between active ones (interval > 1) hold no occurrences
+    week += -week % interval
+    while True:
+        monday = anchor + timedelta(weeks=week)
+        if monday > last:
+            return
+        for offset in offsets:
+            day = monday + timedelta(days=offset)
+            if first <= day <= last:
+                yield day
+        week += interval
+
+
+def occurrences(reminder, first, last):
+    """(date, time) pairs of a series document inside [first, last] (datetimes at midnight)."""
+    rule = reminder["recurrence"]
+    start = _parse_date(reminder.get("date"))
+    if start is None:
+        return
+    times = rule.get("times") or [reminder.get("time", "")]
+    for day in _days(rule, start, first, last):
+        date = day.strftime("%Y-%m-%d")
+        for time_str in times:
+            yield date, time_str
+
+
+def window(start=None, end=None, ctx=None):
+    """
+    (first, last) datetimes for a /reminders window from optional YYYY-MM-DD bounds;
+    defaults to REMINDER_WINDOW_DAYS from today, capped at REMINDER_MAX_WINDOW_DAYS.
+    Raises ValueError for a malformed bound.
+    """
+    ctx = ctx or date_context.current()
+    first = _parse_date(start or ctx.today)
+    if first is None:
+        raise ValueError("from/to must be YYYY-MM-DD dates")
+    last = _parse_date(end) if end else first + timedelta(days=REMINDER_WINDOW_DAYS - 1)
+    if last is None:
+        raise ValueError("from/to must be YYYY-MM-DD dates")
+    return first, min(last, first + timedelta(days=REMINDER_MAX_WINDOW_DAYS - 1))
+
+
+def series_filter(first, last):
+    """Mongo filter for series documents that can have occurrences in [first, last]."""
+    return {
+        "recurrence": {"$ne": None},
+        "date": {"$lte": last.strftime("%Y-%m-%d")},
+        "$or": [{"recurrence.until": None}, {"recurrence.until": {"$gte": first.strftime("%Y-%m-%d")}}],
+    }
+
+
+def describe(rule, time=None):
+    """
+    Plain-language summary of a rule, e.g. 'every Monday and Thursday at 9:00 AM until 2025-06-30'.
+    time is the reminder's own time, used when the rule lists none.
+    """
+    interval = rule.get("interval", 1)
+    if rule["freq"] == "daily":
+        text = "every day" if interval == 1 else f"every {interval} days"
+    else:
+        days = [day.capitalize() for day in rule.get("byDay") or ()]
+        names = " and ".join(days) if len(days) <= 2 else ", ".join(days[:-1]) + " and " + days[-1]
+        text = f"every {names}" if interval == 1 else f"every {interval} weeks on {names}"
+    times = rule.get("times") or ([time] if time else [])
+    if times:
+        text += " at " + ", ".join(times)
+    if rule.get("until"):
+        text += f" until {rule['until']}"
+    return text
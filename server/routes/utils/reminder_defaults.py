@@ -0,0 +1,161 @@
+# ================== Reminder Defaults ==================
+# Smart default date/time for reminders that arrive without one, shared by the
+# chat reminder path (ask_query) and /format-reminder. The keyword rules live in
+# one table; every keyword is compiled into a single regex alternation, so a
+# title is scanned once and each rule is then a set lookup. Keywords match as
+# substrings, as the original any(word in title) chains did.
+import re
+from functools import lru_cache
+
+from routes.utils import date_context
+
+# ================== Rule Table ==================
+# (category, keywords) in priority order; the first category with a keyword in the title wins
+DATE_RULES = [
+    ("medicine", ("medicine", "medication", "pill", "vitamin", "drug", "treatment", "dose")),
+    ("appointment", ("appointment", "meeting", "doctor", "dentist", "visit", "consultation")),
+    ("work", ("work", "office", "meeting", "call", "email", "project", "deadline")),
+    ("meal", ("breakfast", "lunch", "dinner", "meal", "eat")),
+    ("exercise", ("workout", "exercise", "gym", "walk", "run", "jog", "fitness")),
+    ("errand", ("shop", "buy", "store", "grocery", "errand", "pickup", "get")),
+]
+
+TIME_RULES = [
+    ("medicine", ("medicine", "medication", "pill", "vitamin")),
+    ("breakfast", ("breakfast",)),
+    ("lunch", ("lunch",)),
+    ("dinner", ("dinner",)),
+    ("snack", ("snack",)),
+    ("appointment", ("appointment", "meeting", "doctor", "dentist", "consultation")),
+    ("work", ("work", "office", "call", "email", "meeting")),
+    ("exercise", ("workout", "exercise", "gym", "walk", "run", "jog")),
+    ("errand", ("shop", "buy", "store", "grocery", "errand", "pickup")),
+    ("study", ("study", "homework", "read", "learn", "practice")),
+    ("sleep", ("sleep", "bed", "bedtime", "rest")),
+    ("wake", ("wake", "alarm", "get up")),
+]
+
+# Words that refine a category's default (e.g. "evening medicine")
+MODIFIERS = ("morning", "afternoon", "evening", "night", "tonight", "bedtime", "am", "pm")
+
+# Fixed default times per category; categories missing here depend on modifiers or the hour
+FIXED_TIMES = {
+    "breakfast": "8:00 AM",
+    "lunch": "12:30 PM",
+    "dinner": "7:00 PM",
+    "work": "10:00 AM",
+    "errand": "2:00 PM",
+    "sleep": "10:00 PM",
+    "wake": "7:00 AM",
+}
+
+
+# ================== Matcher ==================
+def _compile(words):
+    # Longest first so the alternation prefers "bedtime" over "bed"; the lookahead
+    # reports a match at every position, so overlapping keywords are all found
+    ordered = sorted(words, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(w) for w in ordered) + "))")
+    # A matched keyword implies every shorter keyword inside it ("workout" -> "work")
+    implied = {w: frozenset(k for k in words if k in w) for w in words}
+    return pattern, implied
+
+
+KEYWORDS = frozenset(
+    [w for _, words in DATE_RULES + TIME_RULES for w in words] + list(MODIFIERS))
+_PATTERN, _IMPLIED = _compile(KEYWORDS)
+
+
+@lru_cache(maxsize=4096)
+def keywords_in(title):
+    """Every rule keyword occurring in title (already lowercased), from a single scan."""
+    found = set()
+    for match in _PATTERN.finditer(title):
+        found |= _IMPLIED[match.group(1)]
+    return frozenset(found)
+
+
+def _category(rules, found):
+    for category, words in rules:
+        if not found.isdisjoint(words):
+            return category
+    return None
+
+
+def categorize(title):
+    """(date category, time category, keywords found) for a reminder title; categories may be None."""
+    found = keywords_in((title or "").lower())
+    return _category(DATE_RULES, found), _category(TIME_RULES, found), found
+
+
+# ================== Defaults ==================
+def _date_for(ctx, category, found):
+    hour = ctx.now.hour
+    if category == "medicine":
+        if hour >= 18:
+            return ctx.tomorrow
+        return ctx.today if "tonight" in found or "evening" in found else ctx.tomorrow
+    if category in ("appointment", "work"):
+        return ctx.next_business_day
+    if category == "meal":
+        late = (("breakfast" in found and hour >= 10) or ("lunch" in found and hour >= 14)
+                or ("dinner" in found and hour >= 21))
+        return ctx.tomorrow if late else ctx.today
+    cutoff = {"exercise": 20, "errand": 19}.get(category, 18)
+    return ctx.tomorrow if hour >= cutoff else ctx.today
+
+
+def _time_for(ctx, category, found):
+    hour = ctx.now.hour
+    if category in FIXED_TIMES:
+        return FIXED_TIMES[category]
+    if category == "medicine":
+        if "morning" in found or "am" in found:
+            return "8:00 AM"
+        if "evening" in found or "night" in found or "pm" in found:
+            return "8:00 PM"
+        if "afternoon" in found:
+            return "3:00 PM"
+        return "10:00 PM" if "bedtime" in found else "9:00 AM"
+    if category == "snack":
+        return "10:30 AM" if hour < 12 else "3:30 PM"
+    if category == "appointment":
+        return "2:00 PM" if "afternoon" in found and "morning" not in found else "10:00 AM"
+    if category == "exercise":
+        return "6:00 PM" if "evening" in found and "morning" not in found else "7:00 AM"
+    if category == "study":
+        return "10:00 AM" if hour < 12 else "4:00 PM"
+    if 5 <= hour < 9:
+        return "9:00 AM"
+    if 9 <= hour < 12:
+        return "10:00 AM"
+    if 12 <= hour < 14:
+        return "3:00 PM"
+    if 14 <= hour < 17:
+        return "4:00 PM"
+    if 17 <= hour < 20:
+        return "7:00 PM"
+    return "9:00 AM"
+
+
+def default_date(title, ctx=None):
+    ctx = ctx or date_context.current()
+    date_category, _, found = categorize(title)
+    return _date_for(ctx, date_category, found)
+
+
+def default_time(title, ctx=None):
+    ctx = ctx or date_context.current()
+    _, time_category, found = categorize(title)
+    return _time_for(ctx, time_category, found)
+
+
+def defaults_for(titles, ctx=None):
+    """[(date, time)] for a batch of titles, sharing one date context."""
+    ctx = ctx or date_context.current()
+    results = []
+    for title in titles:
+        date_category, time_category, found = categorize(title)
+        results.append((_date_for(ctx, date_category, found), _time_for(ctx, time_category, found)))
+    return results
+
@@ -0,0 +1,311 @@
+# ================== Local Reminder Parser ==================
+# Parses common reminder templates ("remind me to X at 9am tomorrow",
+# "X every Monday at 3pm", "pills three times a day for two weeks") without a
+# network call. Repeating requests come back as one reminder with a recurrence
+# rule (see routes.utils.recurrence). Callers fall back to the LLM when the
+# returned confidence is below MIN_CONFIDENCE.
+import os
+import re
+from datetime import datetime, timedelta
+
+from routes.utils import metrics, date_context
+
+MIN_CONFIDENCE = float(os.getenv("LOCAL_REMINDER_MIN_CONFIDENCE", "0.8"))
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+# Same mappings the chat reminder path uses when validating LLM times
+TIME_OF_DAY = {
+    'midnight': '12:00 AM', 'noon': '12:00 PM', 'morning': '9:00 AM',
+    'afternoon': '3:00 PM', 'evening': '7:00 PM', 'night': '8:00 PM', 'tonight': '8:00 PM',
+}
+
+_WEEKDAY_ALT = "|".join(WEEKDAYS)
+_MONTH_ALT = "|".join(MONTHS) + "|" + "|".join(m[:3] for m in MONTHS)
+
+PREFIX_RE = re.compile(
+    r"^(?:please\s+)?(?:can you\s+|could you\s+)?"
+    r"(?:remind me|set (?:a |an )?reminder|create (?:a |an )?reminder|add (?:a |an )?reminder|"
+    r"reminder|don'?t let me forget|make sure i)"
+    r"(?:\s+(?:to|about|that i need to|that i have to|for|of))?\s+"
+)
+AMPM_TIME_RE = re.compile(r"\b(?:at\s+)?(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)(?=\W|$)")
+CLOCK_TIME_RE = re.compile(r"\b(?:at\s+)?(\d{1,2}):(\d{2})\b")
+BARE_HOUR_RE = re.compile(r"\bat\s+(\d{1,2})\b(?!\s*(?:days?|weeks?|hours?|minutes?|mins?))")
+TIME_WORD_RE = re.compile(
+    r"\b(?:at\s+noon|at\s+midnight|noon|midnight|tonight|"
+    r"(?:in\s+the\s+|this\s+|every\s+)?(?:morning|afternoon|evening)|at\s+night|every\s+night)\b"
+)
+EVERY_RE = re.compile(
+    rf"\b(?:every\s*day|daily|each\s+day|every\s+weekday|weekdays|(?:every|each)\s+({_WEEKDAY_ALT})s?|weekly|"
+    rf"every\s+week|every\s+(\d+)\s+days)\b"
+)
+TIMES_A_DAY_RE = re.compile(r"\b(twice|two\s+times|2\s+times|three\s+times|thrice|3\s+times)\s+(?:a|per|each)\s+day\b")
+DURATION_RE = re.compile(r"\bfor\s+(?:the\s+next\s+)?(\d+|a|one|two|three|four|five|six|seven)\s+(days?|weeks?)\b")
+EVERY_TIME_OF_DAY_RE = re.compile(r"\bevery\s+(?:morning|afternoon|evening|night)\b")
+# A repeat the parser did not read ("every hour") is left behind in the title
+UNREAD_RULE_RE = re.compile(r"\bevery\b")
+# Qualifiers the parser does not understand: exclusions ("except Sunday"), weekends,
+# alternate days, relative anchors ("before breakfast") and end dates ("until June").
+# Extracting around them would invert or drop what the user asked, so any of them
+# anywhere in the request sends it to the LLM.
+UNREAD_QUALIFIER_RE = re.compile(
+    r"\b(?:except|excluding|but\s+not|apart\s+from|other\s+than|weekends?|every\s+other|alternate|"
+    r"before|after(?!\s+tomorrow)|until|till|til)\b"
+)
+RELATIVE_DAY_RE = re.compile(r"\b(?:the\s+)?day\s+after\s+tomorrow\b|\btomorrow\b|\btoday\b")
+IN_DAYS_RE = re.compile(r"\bin\s+(\d+|a|one|two|three|four|five|six|seven)\s+(days?|weeks?)\b")
+WEEKDAY_RE = re.compile(rf"\b(?:on\s+)?(?:(next|this|coming)\s+)?({_WEEKDAY_ALT})\b")
+NEXT_WEEK_RE = re.compile(r"\bnext\s+week\b")
+ISO_DATE_RE = re.compile(r"\b(?:on\s+)?(\d{4})-(\d{1,2})-(\d{1,2})\b")
+SLASH_DATE_RE = re.compile(r"\b(?:on\s+)?(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+MONTH_DATE_RE = re.compile(rf"\b(?:on\s+)?({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b")
+
+# A second clock time or a list of tasks means several reminders - leave those to the LLM
+MULTI_TASK_RE = re.compile(r"\band\s+(?:also\s+)?(?:remind|to\s+\w+)|;|\bthen\b")
+
+_NUMBER_WORDS = {'a': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7}
+
+# Spread of a "N times a day" schedule
+DAILY_TIMES = {2: ["9:00 AM", "9:00 PM"], 3: ["8:00 AM", "2:00 PM", "8:00 PM"]}
+WORKWEEK = WEEKDAYS[:5]
+
+
+def _fmt_time(hour, minute, period):
+    return f"{hour}:{minute:02d} {period}"
+
+
+def _to_12h(hour, minute):
+    if hour == 0:
+        return _fmt_time(12, minute, "AM")
+    if hour < 12:
+        return _fmt_time(hour, minute, "AM")
+    if hour == 12:
+        return _fmt_time(12, minute, "PM")
+    return _fmt_time(hour - 12, minute, "PM")
+
+
+def _next_weekday(now, index):
+    # Next occurrence of the weekday; the same weekday means a week from today
+    days_ahead = (index - now.weekday()) % 7
+    return now + timedelta(days=days_ahead or 7)
+
+
+class _Extraction:
+    """Collects parsed fields and strips each matched span out of the working text."""
+
+    def __init__(self, text):
+        self.text = text
+        self.date = None
+        self.time = None
+        self.recurrence = None
+        self.duration_days = None
+        self.ambiguous = False
+
+    def take(self, match):
+        self.text = self.text[:match.start()] + " " + self.text[match.end():]
+
+
+def _amount(word):
+    return int(word) if word.isdigit() else _NUMBER_WORDS[word]
+
+
+def _extract_recurrence(ex, now):
+    # Repeating requests become one reminder with a rule; the date is the first occurrence
+    match = TIMES_A_DAY_RE.search(ex.text)
+    if match:
+        count = 2 if match.group(1).startswith(("twice", "two", "2")) else 3
+        ex.recurrence = {"freq": "daily", "interval": 1, "times": list(DAILY_TIMES[count])}
+        ex.time = DAILY_TIMES[count][0]
+        ex.take(match)
+    match = EVERY_RE.search(ex.text)
+    if match:
+        phrase = match.group(0)
+        if match.group(1):
+            ex.date = _next_weekday(now, WEEKDAYS.index(match.group(1))).strftime("%Y-%m-%d")
+            rule = {"freq": "weekly", "interval": 1, "byDay": [match.group(1)]}
+        elif "weekday" in phrase:
+            rule = {"freq": "weekly", "interval": 1, "byDay": WORKWEEK}
+        elif "week" in phrase:
+            rule = {"freq": "weekly", "interval": 1}
+        elif match.group(2):
+            rule = {"freq": "daily", "interval": max(int(match.group(2)), 1)}
+        else:
+            rule = {"freq": "daily", "interval": 1}
+        # "three times a day" already set the daily times
+        ex.recurrence = {**rule, **{k: v for k, v in (ex.recurrence or {}).items() if k == "times"}}
+        ex.take(match)
+    if ex.recurrence is None and EVERY_TIME_OF_DAY_RE.search(ex.text):
+        # "every night" repeats daily; the time word itself is read by _extract_time
+        ex.recurrence = {"freq": "daily", "interval": 1}
+    if ex.recurrence is None:
+        return
+    match = DURATION_RE.search(ex.text)
+    if match:
+        amount = _amount(match.group(1))
+        ex.duration_days = amount * 7 if match.group(2).startswith("week") else amount
+        ex.take(match)
+
+
+def _extract_time(ex):
+    match = AMPM_TIME_RE.search(ex.text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        if 1 <= hour <= 12 and 0 <= minute <= 59:
+            period = "AM" if match.group(3).startswith("a") else "PM"
+            ex.time = _fmt_time(hour, minute, period)
+            ex.take(match)
+            return
+    match = CLOCK_TIME_RE.search(ex.text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            ex.time = _to_12h(hour, minute)
+            # "at 3:30" without am/pm is ambiguous for hours that could be afternoon
+            ex.ambiguous = 1 <= hour <= 7
+            ex.take(match)
+            return
+    match = TIME_WORD_RE.search(ex.text)
+    if match:
+        word = match.group(0).split()[-1]
+        ex.time = TIME_OF_DAY.get(word)
+        if word == 'tonight' and ex.date is None:
+            ex.date = 'today'
+        ex.take(match)
+        return
+    match = BARE_HOUR_RE.search(ex.text)
+    if match:
+        hour = int(match.group(1))
+        if 0 <= hour <= 23:
+            ex.time = _to_12h(hour, 0)
+            ex.ambiguous = 1 <= hour <= 7
+            ex.take(match)
+
+
+def _extract_date(ex, now):
+    match = RELATIVE_DAY_RE.search(ex.text)
+    if match:
+        phrase = match.group(0)
+        if "after" in phrase:
+            ex.date = (now + timedelta(days=2)).strftime("%Y-%m-%d")
+        elif phrase == "tomorrow":
+            ex.date = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        else:
+            ex.date = now.strftime("%Y-%m-%d")
+        ex.take(match)
+        return
+    match = IN_DAYS_RE.search(ex.text)
+    if match:
+        amount = _amount(match.group(1))
+        days = amount * 7 if match.group(2).startswith("week") else amount
+        ex.date = (now + timedelta(days=days)).strftime("%Y-%m-%d")
+        ex.take(match)
+        return
+    match = WEEKDAY_RE.search(ex.text)
+    if match:
+        ex.date = _next_weekday(now, WEEKDAYS.index(match.group(2))).strftime("%Y-%m-%d")
+        ex.take(match)
+        return
+    match = NEXT_WEEK_RE.search(ex.text)
+    if match:
+        days_until_monday = (7 - now.weekday()) % 7 or 7
+        ex.date = (now + timedelta(days=days_until_monday)).strftime("%Y-%m-%d")
+        ex.take(match)
+        return
+    for pattern in (ISO_DATE_RE, SLASH_DATE_RE, MONTH_DATE_RE):
+        match = pattern.search(ex.text)
+        if not match:
+            continue
+        try:
+            if pattern is ISO_DATE_RE:
+                parsed = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            elif pattern is SLASH_DATE_RE:
+                year = int(match.group(3)) if match.group(3) else now.year
+                year = year + 2000 if year < 100 else year
+                parsed = datetime(year, int(match.group(1)), int(match.group(2)))
+            else:
+                month = next(i for i, m in enumerate(MONTHS) if m.startswith(match.group(1)[:3])) + 1
+                year = int(match.group(3)) if match.group(3) else now.year
+                parsed = datetime(year, month, int(match.group(2)))
+        except ValueError:
+            return
+        # A month/day without a year that already passed means next year
+        year_given = pattern is ISO_DATE_RE or match.group(3)
+        if not year_given and parsed.date() < now.date():
+            parsed = parsed.replace(year=parsed.year + 1)
+        ex.date = parsed.strftime("%Y-%m-%d")
+        ex.take(match)
+        return
+
+
+def _clean_title(text):
+    title = re.sub(r"\s+", " ", text).strip(" ,.!?-")
+    # Drop connectors left dangling by removed date/time phrases
+    title = re.sub(r"^(?:to|about|for|that)\s+", "", title)
+    title = re.sub(r"(?:\s+(?:on|at|by|for|in|every|the|and|,))+$", "", title)
+    title = re.sub(r"\s+(?:on|at|by)\s+(?=(?:on|at|by)\b)", " ", title)
+    return title.strip(" ,.!?-")
+
+
+def parse_reminder_locally(text, now=None):
+    """
+    Parse a reminder request without the LLM.
+    Returns: (reminders: list of {title, date, time, recurrence}, confidence: float)
+    date is YYYY-MM-DD and time is 'H:MM AM/PM'; either may be None when the text does
+    not state it, so callers can apply their own smart defaults. recurrence is None
+    for one-off reminders.
+    """
+    now = now or date_context.current().now
+    original = re.sub(r"\s+", " ", str(text or "")).strip()
+    lowered = original.lower().replace("’", "'")
+    if not lowered:
+        return [], 0.0
+
+    prefix = PREFIX_RE.match(lowered)
+    ex = _Extraction(lowered[prefix.end():] if prefix else lowered)
+
+    _extract_recurrence(ex, now)
+    _extract_time(ex)
+    _extract_date(ex, now)
+    if ex.date == 'today':
+        ex.date = now.strftime("%Y-%m-%d")
+    if ex.recurrence is not None and ex.duration_days:
+        # "for two weeks" counts from the first occurrence
+        ex.date = ex.date or now.strftime("%Y-%m-%d")
+        first = datetime.strptime(ex.date, "%Y-%m-%d")
+        ex.recurrence["until"] = (first + timedelta(days=ex.duration_days - 1)).strftime("%Y-%m-%d")
+
+    title = _clean_title(ex.text)
+    if not title:
+        return [], 0.0
+
+    confidence = 0.5
+    if prefix or ex.recurrence is not None:
+        confidence += 0.3
+    if ex.date or ex.time:
+        confidence += 0.15
+    if ex.ambiguous:
+        confidence -= 0.3
+    if (MULTI_TASK_RE.search(title) or AMPM_TIME_RE.search(ex.text) or re.search(r"\d", title)
+            or UNREAD_RULE_RE.search(title) or UNREAD_QUALIFIER_RE.search(lowered)):
+        # Leftover times/numbers, an unread repeat or qualifier, or several tasks in one sentence
+        confidence -= 0.4
+
+    # Keep the user's original casing for the title where possible
+    start = original.lower().find(title)
+    if start >= 0:
+        title = original[start:start + len(title)]
+
+    return [{"title": title, "date": ex.date, "time": ex.time, "recurrence": ex.recurrence}], round(max(0.0, min(confidence, 1.0)), 2)
+
+
+def try_parse_locally(text, now=None):
+    """Returns parsed reminders when the local parser is confident enough, else None."""
+    reminders, confidence = parse_reminder_locally(text, now=now)
+    if reminders and confidence >= MIN_CONFIDENCE:
+        metrics.incr("reminder_parser.local")
+        return reminders
+    metrics.incr("reminder_parser.llm_fallback")
+    return None
@@ -0,0 +1,442 @@
+# ================== Chat Session Store ==================
+# Hot in-process cache of chat session histories, so /chat/message can assemble
+# context from a sessionId instead of the client re-uploading chatHistory on
+# every turn. Session documents (chat_sessions) hold only metadata: name,
+# timestamps, messageCount, lastMessage preview, summary, "rev" and "lastSeq".
+# Messages live one per document in the chat messages collection, keyed by
+# (sessionId, seq), so a turn costs O(new messages), /loadChat pages through
+# them, and no session document grows toward the 16MB limit.
+# Every write to a session bumps its "rev" field; cached entries are checked
+# against it (a tiny _id lookup) so several workers can share sessions without
+# serving stale history. Sessions that still embed a "messages" array (written
+# before the split) are moved over on first touch, or in bulk with
+# python -m routes.utils.migrate_messages.
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+from pymongo import UpdateOne, DeleteMany, ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from routes.utils import metrics
+
+# Load environment variables
+load_dotenv()
+
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "512"))
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "600"))
+# Single-worker deployments can skip the per-turn revision check
+SESSION_CACHE_VALIDATE = os.getenv("SESSION_CACHE_VALIDATE", "true").lower() in ("1", "true", "yes")
+# Most messages one append may carry, and how far behind a rejected writer may be
+# and still be told which message ids it missed
+SESSION_APPEND_MAX = int(os.getenv("SESSION_APPEND_MAX", "100"))
+SESSION_APPEND_MAX_GAP = int(os.getenv("SESSION_APPEND_MAX_GAP", "50"))
+# Attempts /chat/message makes to record a turn when another writer advanced the session
+SESSION_APPEND_RETRIES = int(os.getenv("SESSION_APPEND_RETRIES", "3"))
+# Messages per /loadChat page by default, and the most a client may ask for
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "50"))
+CHAT_PAGE_MAX = int(os.getenv("CHAT_PAGE_MAX", "200"))
+# Characters of the newest message kept on the session for the history list
+PREVIEW_CHARS = 120
+
+# Message documents carry these next to the client's fields; responses drop them
+MESSAGE_PROJECTION = {"_id": 0, "sessionId": 0, "userId": 0}
+# /loadChat session summaries leave out any embedded messages of unmigrated sessions
+SUMMARY_PROJECTION = {"messages": 0, "syncHash": 0}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def session_filter(session_id, user_id):
+    if not session_id or not ObjectId.is_valid(session_id):
+        return None
+    return {"_id": ObjectId(session_id), "userId": user_id}
+
+
+def to_chat_history(messages):
+    """Client message objects -> role/content history, skipping emergency, reminder and error notices."""
+    return [
+        {"role": "user" if m.get("isUser") else "assistant", "content": m.get("message")}
+        for m in messages or []
+        if isinstance(m, dict) and m.get("message")
+        and not (m.get("isEmergency") or m.get("isReminder") or m.get("isError"))
+    ]
+
+
+def preview(message):
+    """The lastMessage kept on a session document for the history list."""
+    return {
+        "message": str(message.get("message") or "")[:PREVIEW_CHARS],
+        "isUser": bool(message.get("isUser")),
+        "timestamp": message.get("timestamp"),
+    }
+
+
+def _cached(session_id):
+    with _lock:
+        entry = _cache.get(session_id)
+        if entry is None:
+            return None
+        if entry["loaded_at"] + SESSION_CACHE_TTL <= time.time():
+            del _cache[session_id]
+            return None
+        _cache.move_to_end(session_id)
+        return entry
+
+
+def _store(session_id, entry):
+    with _lock:
+        _cache[session_id] = entry
+        _cache.move_to_end(session_id)
+        while len(_cache) > SESSION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidate(session_id):
+    """Drop a session from this worker's cache (call after any write outside append_messages)."""
+    with _lock:
+        _cache.pop(str(session_id), None)
+
+
+# ================== Embedded Message Migration ==================
+def migrate_session(collection, messages_col, doc):
+    """
+    Moves a session document's embedded "messages" array into the messages collection,
+    renumbered seq 1..n in array order, then unsets it. Safe to repeat: the session's
+    earlier copies are cleared first, and the unset only applies while the document still
+    has the rev and lastSeq it was read with. Returns the number of messages moved, or
+    None when the document changed underneath (re-read and try again).
+    """
+    oid = doc["_id"]
+    embedded = [m for m in doc.get("messages") or [] if isinstance(m, dict)]
+    stamped = [{**m, "seq": i + 1, "sessionId": oid, "userId": doc.get("userId")} for i, m in enumerate(embedded)]
+    messages_col.delete_many({"sessionId": oid})
+    if stamped:
+        try:
+            messages_col.insert_many(stamped, ordered=False)
+        except BulkWriteError as e:
+            # A concurrent migration of the same session already inserted them
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+    fields = {"lastSeq": max(doc.get("lastSeq") or 0, len(stamped)), "messageCount": len(stamped)}
+    if stamped:
+        fields["lastMessage"] = preview(stamped[-1])
+    result = collection.update_one(
+        {"_id": oid, "rev": doc.get("rev"), "lastSeq": doc.get("lastSeq")},
+        {"$unset": {"messages": ""}, "$set": fields, "$inc": {"rev": 1}},
+    )
+    invalidate(oid)
+    if result.matched_count == 0:
+        metrics.incr("session_migrate.raced")
+        return None
+    metrics.incr("session_migrate.sessions")
+    metrics.incr("session_migrate.messages", len(stamped))
+    return len(stamped)
+
+
+def _load(collection, messages_col, query, fields):
+    """The session document (fields only), migrating embedded messages first if it still has them."""
+    for _ in range(SESSION_APPEND_RETRIES):
+        doc = collection.find_one(query, {**fields, "messages": 1, "rev": 1, "lastSeq": 1, "userId": 1})
+        if doc is None or "messages" not in doc:
+            return doc
+        migrate_session(collection, messages_col, doc)
+    return collection.find_one(query, fields)
+
+
+# ================== Reads ==================
+def get_session(collection, messages_col, session_id, user_id):
+    """
+    Returns {"messages", "summary", "rev", "lastSeq"} for the session, or None when it doesn't exist
+    for this user. Served from the cache while its rev matches the stored document.
+    """
+    query = session_filter(session_id, user_id)
+    if collection is None or messages_col is None or query is None:
+        return None
+
+    entry = _cached(session_id)
+    if entry is not None and entry["userId"] == user_id:
+        if not SESSION_CACHE_VALIDATE:
+            metrics.incr("session_cache.hits")
+            return entry
+        current = collection.find_one(query, {"rev": 1})
+        if current is not None and current.get("rev") == entry["rev"]:
+            metrics.incr("session_cache.hits")
+            return entry
+        metrics.incr("session_cache.stale")
+
+    metrics.incr("session_cache.misses")
+    doc = _load(collection, messages_col, query, {"summary": 1, "rev": 1, "lastSeq": 1})
+    if doc is None:
+        invalidate(session_id)
+        return None
+    entry = {
+        "userId": user_id,
+        "messages": list(messages_col.find({"sessionId": doc["_id"]}, MESSAGE_PROJECTION).sort("seq", 1)),
+        "summary": doc.get("summary") or {},
+        "rev": doc.get("rev"),
+        "lastSeq": doc.get("lastSeq") or 0,
+        "loaded_at": time.time(),
+    }
+    _store(session_id, entry)
+    return entry
+
+
+def message_page(collection, messages_col, session_id, user_id, before=None, limit=CHAT_PAGE_SIZE):
+    """
+    One page of a session's messages, newest first in the query but returned oldest first:
+    {"messages", "nextCursor", "lastSeq"}. before is the previous page's nextCursor (a seq,
+    exclusive); nextCursor is None on the oldest page. None when the session doesn't exist.
+    """
+    query = session_filter(session_id, user_id)
+    if collection is None or messages_col is None or query is None:
+        return None
+    doc = _load(collection, messages_col, query, {"lastSeq": 1})
+    if doc is None:
+        return None
+
+    limit = min(max(int(limit), 1), CHAT_PAGE_MAX)
+    criteria = {"sessionId": doc["_id"]}
+    if before is not None:
+        criteria["seq"] = {"$lt": int(before)}
+    # One extra document tells whether an older page exists
+    docs = list(messages_col.find(criteria, MESSAGE_PROJECTION).sort("seq", -1).limit(limit + 1))
+    more = len(docs) > limit
+    page = docs[:limit][::-1]
+    metrics.incr("session_pages.served")
+    return {
+        "messages": page,
+        "nextCursor": page[0]["seq"] if more and page else None,
+        "lastSeq": doc.get("lastSeq") or 0,
+    }
+
+
+def list_sessions(collection, user_id):
+    """A user's sessions as summaries (no messages), in stored order."""
+    return list(collection.find({"userId": user_id}, SUMMARY_PROJECTION))
+
+
+def new_message(text, is_user, message_id=None):
+    """A message in the shape the client stores ({id, message, isUser, timestamp})."""
+    now = datetime.utcnow()
+    return {
+        "id": message_id or f"{'user' if is_user else 'ai'}_{int(now.timestamp() * 1000)}",
+        "message": text,
+        "isUser": is_user,
+        "timestamp": now.isoformat() + "Z",
+    }
+
+
+# ================== Sequenced Appends ==================
+def seq_filter(last_seq):
+    """Matches a session whose lastSeq is last_seq; sessions created before sequencing count as 0."""
+    return {"$in": [0, None]} if last_seq == 0 else last_seq
+
+
+def _claim(collection, query, count, last_seq, last_message):
+    """
+    Reserves seq last_seq + 1 .. last_seq + count on a migrated session whose lastSeq is
+    still last_seq, moving messageCount, rev, lastActivity and lastMessage in the same update.
+    """
+    return collection.find_one_and_update(
+        {**query, "lastSeq": seq_filter(last_seq), "messages": {"$exists": False}},
+        {
+            "$inc": {"messageCount": count, "rev": 1},
+            "$set": {"lastSeq": last_seq + count, "lastActivity": datetime.utcnow().isoformat(),
+                     "lastMessage": last_message},
+        },
+        projection={"messageCount": 1, "lastSeq": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def append_messages(collection, messages_col, session_id, user_id, messages, last_seq):
+    """
+    Appends messages to a session whose lastSeq is still last_seq, stamping them
+    seq last_seq + 1, last_seq + 2, ... The seq range is claimed with one conditional
+    update on the session document, then the messages are inserted. Returns
+    {"lastSeq", "messageCount", "messages"} (the stamped messages);
+    {"conflict": True, "lastSeq": current, "ids": [...]} when another write got there
+    first, with the ids of messages sequenced after last_seq when the gap is small;
+    None when the session does not exist for this user.
+    """
+    query = session_filter(session_id, user_id)
+    if collection is None or messages_col is None or query is None or not messages:
+        return None
+    stamped = [{**m, "seq": last_seq + i + 1} for i, m in enumerate(messages)]
+
+    doc = _claim(collection, query, len(stamped), last_seq, preview(stamped[-1]))
+    if doc is None:
+        current = _load(collection, messages_col, query, {"lastSeq": 1})
+        if current is None:
+            invalidate(session_id)
+            metrics.incr("session_append.missing")
+            return None
+        # An embedded session was just migrated; its lastSeq may still be the one expected
+        doc = _claim(collection, query, len(stamped), last_seq, preview(stamped[-1]))
+        if doc is None:
+            invalidate(session_id)
+            return _rejected(collection, messages_col, query, last_seq)
+
+    try:
+        messages_col.insert_many([{**m, "sessionId": query["_id"], "userId": user_id} for m in stamped])
+    except PyMongoError:
+        # The seq range stays claimed (readers tolerate gaps); only the count is given back
+        collection.update_one(query, {"$inc": {"messageCount": -len(stamped)}})
+        invalidate(session_id)
+        raise
+
+    metrics.incr("session_append.appended", len(stamped))
+    with _lock:
+        entry = _cache.get(session_id)
+        # Only advance a cached copy that was current; otherwise reload on next read
+        if (entry is not None and entry["userId"] == user_id and isinstance(entry["rev"], int)
+                and entry["lastSeq"] == last_seq):
+            entry["messages"] = entry["messages"] + stamped
+            entry["rev"] += 1
+            entry["lastSeq"] = doc["lastSeq"]
+        else:
+            _cache.pop(session_id, None)
+    return {"lastSeq": doc["lastSeq"], "messageCount": doc.get("messageCount"), "messages": stamped}
+
+
+def _rejected(collection, messages_col, query, last_seq):
+    """Why a sequenced append matched nothing: a missing session (None) or a sequence conflict."""
+    current = collection.find_one(query, {"lastSeq": 1})
+    if current is None:
+        metrics.incr("session_append.missing")
+        return None
+    metrics.incr("session_append.conflicts")
+    current_seq = current.get("lastSeq") or 0
+    ids = []
+    if 0 < current_seq - last_seq <= SESSION_APPEND_MAX_GAP:
+        ids = [m.get("id") for m in messages_col.find(
+            {"sessionId": query["_id"], "seq": {"$gt": last_seq}}, {"id": 1, "seq": 1, "_id": 0}).sort("seq", 1)]
+    return {"conflict": True, "lastSeq": current_seq, "ids": ids}
+
+
+def replace_messages(collection, messages_col, session_id, user_id, messages):
+    """
+    Replaces a session's messages (legacy full-array writers). The new copies take fresh
+    seq numbers after the current lastSeq, so sequence numbers still only grow, and the
+    older ones are then removed. Returns the new lastSeq, or None when the session doesn't exist.
+    """
+    query = session_filter(session_id, user_id)
+    if collection is None or messages_col is None or query is None:
+        return None
+    messages = [m for m in messages or [] if isinstance(m, dict)]
+    if _load(collection, messages_col, query, {"_id": 1}) is None:
+        return None
+
+    update = {
+        "$inc": {"lastSeq": len(messages), "rev": 1},
+        "$set": {"messageCount": len(messages), "lastActivity": datetime.utcnow().isoformat()},
+    }
+    if messages:
+        update["$set"]["lastMessage"] = preview(messages[-1])
+    else:
+        update["$unset"] = {"lastMessage": ""}
+    doc = collection.find_one_and_update(query, update, projection={"lastSeq": 1},
+                                         return_document=ReturnDocument.AFTER)
+    invalidate(session_id)
+    if doc is None:
+        return None
+    first = doc["lastSeq"] - len(messages)
+    if messages:
+        messages_col.insert_many([
+            {**m, "seq": first + i + 1, "sessionId": query["_id"], "userId": user_id}
+            for i, m in enumerate(messages)
+        ])
+    messages_col.delete_many({"sessionId": query["_id"], "seq": {"$lte": first}})
+    return doc["lastSeq"]
+
+
+def delete_session(collection, messages_col, session_id, user_id):
+    """Deletes a session and its messages. Returns True when the session existed for this user."""
+    query = session_filter(session_id, user_id)
+    if collection is None or messages_col is None or query is None:
+        return False
+    result = collection.delete_one(query)
+    invalidate(session_id)
+    if result.deleted_count:
+        messages_col.delete_many({"sessionId": query["_id"]})
+    return bool(result.deleted_count)
+
+
+# ================== Bulk Sync (/saveChat) ==================
+# Fields the server owns; a client payload never overwrites them. Messages are
+# written only through appends, so a stale or partially loaded client list can't clobber them.
+SERVER_FIELDS = ("_id", "id", "userId", "rev", "lastSeq", "summary", "syncHash",
+                 "messages", "messageCount", "lastMessage")
+
+
+def sync_hash(fields):
+    """Content hash of the client-owned fields of a session."""
+    encoded = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def sync_sessions(collection, messages_col, user_id, sessions):
+    """
+    Brings a user's stored sessions in line with the client's full session list in one
+    ordered bulk_write: new or changed sessions are upserted, sessions missing from the
+    list are deleted (with their messages), unchanged ones are not written. Updates use
+    $set, so the server-side summary survives and rev keeps counting.
+    Returns {"upserted", "deleted", "unchanged"}. Raises ValueError for a malformed
+    session id or one that belongs to another user; nothing is written then.
+    """
+    stored = {}
+    if user_id is not None:
+        stored = {doc["_id"]: doc.get("syncHash") for doc in collection.find({"userId": user_id}, {"syncHash": 1})}
+
+    ops, changed, kept = [], [], set()
+    for session in sessions:
+        if not isinstance(session, dict):
+            continue
+        session_id = session.get("id")
+        try:
+            _id = ObjectId(session_id) if session_id is not None else ObjectId()
+        except (InvalidId, TypeError):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        kept.add(_id)
+        fields = {k: v for k, v in session.items() if k not in SERVER_FIELDS}
+        digest = sync_hash(fields)
+        if _id in stored and stored[_id] == digest:
+            continue
+        ops.append(UpdateOne(
+            {"_id": _id, "userId": user_id},
+            {"$set": {**fields, "userId": user_id, "syncHash": digest}, "$inc": {"rev": 1}},
+            upsert=True,
+        ))
+        changed.append(_id)
+
+    # An id that isn't this user's but exists is someone else's session: refuse rather than
+    # let the upsert collide with it (or, without the userId filter, take it over)
+    foreign = [_id for _id in changed if _id not in stored]
+    if foreign and collection.find_one({"_id": {"$in": foreign}}, {"_id": 1}) is not None:
+        metrics.incr("session_sync.rejected")
+        raise ValueError("Session id belongs to another user")
+
+    # Only sessions read above are removed, so one created concurrently by /createChat survives
+    removed = [_id for _id in stored if _id not in kept]
+    if removed:
+        ops.append(DeleteMany({"_id": {"$in": removed}, "userId": user_id}))
+    if ops:
+        collection.bulk_write(ops, ordered=True)
+    if removed:
+        messages_col.delete_many({"sessionId": {"$in": removed}})
+    for _id in changed + removed:
+        invalidate(_id)
+
+    result = {"upserted": len(changed), "deleted": len(removed), "unchanged": len(kept) - len(changed)}
+    for outcome, count in result.items():
+        metrics.incr(f"session_sync.{outcome}", count)
+    return result
@@ -0,0 +1,177 @@
+# ================== Admission Control Tests ==================
+# Slots are bounded and served by priority, emergencies keep their reserved slots,
+# and deferred() calls (speculative replies) never hold a slot.
+# Run from server/: python -m pytest tests
+import time
+import asyncio
+import threading
+
+import pytest
+
+from routes.utils import admission
+from routes.utils.admission import AdmissionController, LLMThrottledError, EMERGENCY, INTERACTIVE, BACKGROUND
+
+
+def _controller(**kwargs):
+    options = {"max_concurrency": 2, "emergency_reserved": 1, "user_rate": 100.0, "user_burst": 100}
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def test_deferred_calls_do_not_take_a_slot():
+    controller = _controller()
+    with admission.deferred():
+        with controller.slot(INTERACTIVE), controller.slot(INTERACTIVE):
+            assert controller.snapshot()["in_flight"] == 0
+    assert controller.snapshot()["in_flight"] == 0
+    # Outside the block calls are admitted normally again
+    with controller.slot(INTERACTIVE):
+        assert controller.snapshot()["in_flight"] == 1
+
+
+def test_deferred_async_calls_do_not_take_a_slot():
+    controller = _controller()
+
+    async def speculate():
+        with admission.deferred():
+            async with controller.aslot(INTERACTIVE):
+                return controller.snapshot()["in_flight"]
+
+    assert asyncio.run(speculate()) == 0
+
+
+def test_has_capacity_respects_the_emergency_reserve():
+    controller = _controller()
+    assert controller.has_capacity(INTERACTIVE)
+    with controller.slot(INTERACTIVE):
+        # The last slot is kept back for emergencies
+        assert not controller.has_capacity(INTERACTIVE)
+        assert controller.has_capacity(EMERGENCY)
+    assert controller.has_capacity(BACKGROUND)
+
+
+def test_has_capacity_uses_the_request_priority():
+    controller = _controller()
+    with controller.slot(INTERACTIVE):
+        with admission.request_scope("user", EMERGENCY):
+            assert controller.has_capacity()
+        with admission.request_scope("user", INTERACTIVE):
+            assert not controller.has_capacity()
+
+
+# ================== Helpers ==================
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.005)
+
+
+def _queued(controller):
+    return sum(controller.snapshot()["queued"].values())
+
+
+# ================== Admission ==================
+def test_waiters_are_served_by_priority_then_arrival():
+    controller = _controller()
+    served = []
+
+    def wait_for_slot(priority, name):
+        with controller.slot(priority):
+            served.append(name)
+
+    holder = controller.slot(INTERACTIVE)
+    holder.__enter__()
+    threads = []
+    for priority, name in [(BACKGROUND, "background"), (INTERACTIVE, "first"), (INTERACTIVE, "second")]:
+        thread = threading.Thread(target=wait_for_slot, args=(priority, name))
+        thread.start()
+        threads.append(thread)
+        _wait_until(lambda: _queued(controller) == len(threads))
+    holder.__exit__(None, None, None)
+    for thread in threads:
+        thread.join(2)
+
+    assert served == ["first", "second", "background"]
+    assert controller.snapshot()["in_flight"] == 0
+
+
+def test_emergencies_use_the_reserved_slot():
+    controller = _controller()
+    with controller.slot(INTERACTIVE):
+        with controller.slot(EMERGENCY):
+            assert controller.snapshot()["in_flight"] == 2
+
+
+def test_per_user_rate_limit_sheds_but_never_emergencies():
+    controller = _controller(user_rate=0.0, user_burst=2)
+    with admission.request_scope("alice"):
+        for _ in range(2):
+            with controller.slot():
+                pass
+        with pytest.raises(LLMThrottledError):
+            with controller.slot():
+                pass
+        with controller.slot(EMERGENCY):
+            pass
+    # Another user has their own bucket
+    with admission.request_scope("bob"):
+        with controller.slot():
+            pass
+
+
+def test_full_queue_sheds_non_emergency_calls():
+    controller = _controller(max_queue=0)
+    with controller.slot(INTERACTIVE):
+        with pytest.raises(LLMThrottledError):
+            with controller.slot(BACKGROUND):
+                pass
+
+
+def test_queue_timeout_sheds_and_frees_the_place(monkeypatch):
+    monkeypatch.setitem(admission.QUEUE_TIMEOUTS, BACKGROUND, 0.05)
+    controller = _controller()
+    with controller.slot(INTERACTIVE):
+        with pytest.raises(LLMThrottledError):
+            with controller.slot(BACKGROUND):
+                pass
+        assert _queued(controller) == 0
+    assert controller.snapshot()["in_flight"] == 0
+
+
+def test_async_waiter_is_granted_on_release():
+    controller = _controller()
+
+    async def scenario():
+        holder = controller.aslot(INTERACTIVE)
+        await holder.__aenter__()
+
+        async def waiter():
+            async with controller.aslot(INTERACTIVE):
+                return controller.snapshot()["in_flight"]
+
+        task = asyncio.create_task(waiter())
+        while _queued(controller) == 0:
+            await asyncio.sleep(0.005)
+        await holder.__aexit__(None, None, None)
+        return await task
+
+    assert asyncio.run(scenario()) == 1
+    assert controller.snapshot()["in_flight"] == 0
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    controller = _controller()
+
+    async def scenario():
+        async with controller.aslot(INTERACTIVE):
+            task = asyncio.create_task(controller.aslot(INTERACTIVE).__aenter__())
+            while _queued(controller) == 0:
+                await asyncio.sleep(0.005)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return _queued(controller)
+
+    assert asyncio.run(scenario()) == 0
+    assert controller.snapshot()["in_flight"] == 0
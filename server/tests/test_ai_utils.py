@@ -0,0 +1,48 @@
+# ================== Intent Result Tests ==================
+# Classifier replies that come back without a usable confidence (missing, null or
+# not a number, e.g. from the regex fallback) must read as 0.0, not raise.
+# Run from server/: python -m pytest tests
+import pytest
+
+from routes.utils import ai_utils
+
+BAD_CONFIDENCES = [{}, {"confidence": None}, {"confidence": "high"}]
+
+
+@pytest.fixture(autouse=True)
+def verdicts(monkeypatch):
+    logged = []
+    monkeypatch.setattr(ai_utils, "log_reminder_verdict", lambda *args, **kwargs: logged.append(args))
+    return logged
+
+
+@pytest.mark.parametrize("extra", BAD_CONFIDENCES)
+def test_reminder_verdict_without_confidence(extra, verdicts):
+    result = ai_utils._reminder_intent_result("call mom at 5", {"is_reminder": True, **extra})
+    assert result == (True, 0.0, {})
+    assert verdicts == [("call mom at 5", True, 0.0)]
+
+
+def test_reminder_verdict_keeps_a_numeric_confidence():
+    result = ai_utils._reminder_intent_result("call mom at 5", {"is_reminder": True, "confidence": "0.8"})
+    assert result[:2] == (True, 0.8)
+
+
+def test_missing_reminder_verdict():
+    assert ai_utils._reminder_intent_result("hello", None) == (False, 0.0, {})
+
+
+@pytest.mark.parametrize("extra", BAD_CONFIDENCES)
+def test_emergency_verdict_without_confidence(extra):
+    assert ai_utils._emergency_intent_result({"is_emergency": True, "details": None, **extra}) == (True, 0.0, {})
+
+
+@pytest.mark.parametrize("extra", BAD_CONFIDENCES)
+def test_combined_verdict_without_confidence(extra, verdicts):
+    intent = ai_utils._message_intent_result("call mom at 5", {
+        "emergency": {"is_emergency": False, **extra},
+        "reminder": {"is_reminder": True, **extra},
+    })
+    assert intent["emergency"] == (False, 0.0, {})
+    assert intent["reminder"] == (True, 0.0, {})
+    assert verdicts == [("call mom at 5", True, 0.0)]
@@ -0,0 +1,100 @@
+# ================== Conversation Summary Tests ==================
+# update_summary() must fold every uncovered message into the summary (oldest
+# first, in chunks) and must only advance "covered" past messages it summarized.
+# Run from server/: python -m pytest tests
+import pytest
+
+from routes.utils import conversation, ai_utils
+from routes.utils.llm_resilience import LLMUnavailableError
+
+SESSION_ID = "a" * 24
+
+
+class FakeSessions:
+    """Records the summary each update_one() stores."""
+
+    def __init__(self):
+        self.stored = []
+
+    def update_one(self, query, update):
+        self.stored.append(update["$set"]["summary"])
+
+
+class FakeSummarizer:
+    """Stands in for llm_client.chat.completions; fails on the call numbered fail_on."""
+
+    def __init__(self, fail_on=None):
+        self.transcripts = []
+        self.fail_on = fail_on
+
+    def create(self, messages, call_site):
+        assert call_site == "summarize"
+        self.transcripts.append(messages[1]["content"])
+        if len(self.transcripts) == self.fail_on:
+            raise LLMUnavailableError("upstream down")
+        return ai_utils._make_response(f"summary #{len(self.transcripts)}")
+
+
+def _history(count, chars=400):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"msg{i:03d} " + "x" * chars}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    fake = FakeSummarizer()
+    monkeypatch.setattr(conversation.llm_client.chat, "completions", fake)
+    # About two 400-character messages per chunk
+    monkeypatch.setattr(conversation, "SUMMARY_INPUT_TOKENS", 250)
+    return fake
+
+
+def test_every_uncovered_message_is_folded_in_oldest_first(summarizer):
+    older = _history(11)
+    sessions = FakeSessions()
+    conversation.update_summary(sessions, SESSION_ID, "user", {}, older)
+
+    seen = [f"msg{i:03d}" for i in range(11)]
+    folded = [tag for transcript in summarizer.transcripts for tag in seen if tag in transcript]
+    assert folded == seen
+    assert len(summarizer.transcripts) > 1
+    assert sessions.stored[-1]["covered"] == len(older)
+    assert sessions.stored[-1]["text"] == f"summary #{len(summarizer.transcripts)}"
+
+
+def test_each_chunk_builds_on_the_previous_summary(summarizer):
+    conversation.update_summary(FakeSessions(), SESSION_ID, "user", {"text": "earlier", "covered": 0}, _history(6))
+    assert "earlier" in summarizer.transcripts[0]
+    for number, transcript in enumerate(summarizer.transcripts[1:], start=1):
+        assert f"summary #{number}" in transcript
+
+
+def test_resumes_from_covered(summarizer):
+    older = _history(6)
+    conversation.update_summary(FakeSessions(), SESSION_ID, "user", {"text": "s", "covered": 4}, older)
+    assert "msg003" not in "".join(summarizer.transcripts)
+    assert "msg004" in summarizer.transcripts[0]
+
+
+def test_failure_keeps_covered_at_the_last_stored_chunk(summarizer):
+    summarizer.fail_on = 2
+    older = _history(8)
+    sessions = FakeSessions()
+    conversation.update_summary(sessions, SESSION_ID, "user", {}, older)
+
+    [stored] = sessions.stored
+    assert 0 < stored["covered"] < len(older)
+    # Every message below covered went through the one successful call
+    for i in range(stored["covered"]):
+        assert f"msg{i:03d}" in summarizer.transcripts[0]
+    assert f"msg{stored['covered']:03d}" not in summarizer.transcripts[0]
+
+
+def test_oversized_message_is_truncated_but_still_covered(summarizer):
+    older = _history(1, chars=5000)
+    sessions = FakeSessions()
+    conversation.update_summary(sessions, SESSION_ID, "user", {}, older)
+    assert len(summarizer.transcripts[0]) < 5000
+    assert sessions.stored[-1]["covered"] == 1
@@ -0,0 +1,79 @@
+# ================== Date Context Tests ==================
+# One DateContext is built per minute per timezone and shared; its lookups must
+# match the calendar, and reusing it must beat rebuilding it for every request.
+# Run from server/: python -m pytest tests (add -s to see the benchmark timings)
+import time
+from datetime import datetime
+
+import pytest
+
+from routes.utils import date_context
+from routes.utils.date_context import DateContext
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Pins the wall clock current() reads; set clock.now to move it."""
+    class Clock:
+        now = datetime(2025, 3, 14, 10, 30, 15)
+
+    monkeypatch.setattr(date_context, "_snapshots", {})
+    monkeypatch.setattr(date_context, "_wall_clock", lambda tz_name: Clock.now)
+    return Clock
+
+
+def test_current_is_shared_within_a_minute(clock):
+    first = date_context.current("")
+    clock.now = clock.now.replace(second=59)
+    assert date_context.current("") is first
+    assert first.now == datetime(2025, 3, 14, 10, 30)
+
+
+def test_current_is_rebuilt_for_a_new_minute(clock):
+    first = date_context.current("")
+    clock.now = datetime(2025, 3, 14, 10, 31)
+    second = date_context.current("")
+    assert second is not first
+    assert "10:31" in second.reminder_context
+
+
+def test_each_timezone_has_its_own_snapshot(clock):
+    assert date_context.current("UTC") is not date_context.current("")
+
+
+def test_lookups_follow_the_calendar():
+    # A Friday
+    ctx = DateContext(datetime(2025, 3, 14, 10, 30))
+    assert (ctx.today, ctx.tomorrow, ctx.yesterday) == ("2025-03-14", "2025-03-15", "2025-03-13")
+    assert ctx.weekday_name == "friday"
+    assert ctx.days_ahead["friday"] == "2025-03-14"
+    assert ctx.next_weekday["friday"] == "2025-03-21"
+    assert ctx.next_weekday["monday"] == "2025-03-17"
+    assert ctx.next_week == "2025-03-17"
+    assert ctx.next_business_day == "2025-03-17"
+
+
+def test_lookups_cross_a_leap_day():
+    ctx = DateContext(datetime(2024, 2, 28, 23, 59))
+    assert ctx.tomorrow == "2024-02-29"
+    assert ctx.day_after_tomorrow == "2024-03-01"
+
+
+# ================== Benchmark ==================
+def _per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def test_per_minute_cache_beats_rebuilding_per_request():
+    iterations = 2000
+    # Before: every request rebuilt the lookups and re-rendered the fragments
+    rebuild = _per_call_us(
+        lambda: (DateContext(datetime.now()).chat_context, DateContext(datetime.now()).reminder_context), iterations)
+    cached = _per_call_us(lambda: (date_context.current().chat_context, date_context.current().reminder_context),
+                          iterations)
+    print(f"\ndate context per request: rebuilt {rebuild:.2f} us, per-minute cache {cached:.2f} us")
+    # The real gap is well over 10x; the margin keeps the test stable on a busy machine
+    assert cached * 3 < rebuild
@@ -0,0 +1,268 @@
+# ================== Date/Time Normalizer Tests ==================
+# The normalizer must return exactly what the validate_date / validate_time
+# closures it replaced returned. Those closures are copied below unchanged from
+# the baseline smart_date_time_context(), where now was datetime.now(); the
+# reference takes now as an argument instead. Fixed edge cases run at several
+# clock times (midnight, a leap day, a year boundary) and hypothesis searches
+# generated inputs and clocks for any disagreement.
+# Run from server/: python -m pytest tests (add -s to see the benchmark timings)
+import re
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from routes.utils import datetime_normalizer
+from routes.utils.date_context import DateContext
+
+
+# ================== Reference (baseline smart_date_time_context validators) ==================
+def reference_validators(now):
+    """Returns (validate_date, validate_time) exactly as the baseline defined them for this now."""
+
+    def validate_date(date_str):
+        if not date_str or str(date_str).lower() in ['null', 'none', '', 'undefined']:
+            return now.strftime("%Y-%m-%d")
+        try:
+            date_str = str(date_str).strip()
+            # Already in correct format
+            if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
+                parsed = datetime.strptime(date_str, "%Y-%m-%d")
+                return parsed.strftime("%Y-%m-%d")
+            date_lower = date_str.lower()
+            if date_lower == 'today':
+                return now.strftime("%Y-%m-%d")
+            elif date_lower == 'tomorrow':
+                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
+            elif date_lower == 'yesterday':
+                return (now - timedelta(days=1)).strftime("%Y-%m-%d")
+            elif 'day after tomorrow' in date_lower:
+                return (now + timedelta(days=2)).strftime("%Y-%m-%d")
+            weekdays = ['monday', 'tuesday', 'wednesday',
+                        'thursday', 'friday', 'saturday', 'sunday']
+            for i, day in enumerate(weekdays):
+                if day in date_lower:
+                    days_ahead = (i - now.weekday()) % 7
+                    if days_ahead == 0:
+                        days_ahead = 7
+                    future_date = now + timedelta(days=days_ahead)
+                    return future_date.strftime("%Y-%m-%d")
+            if 'next week' in date_lower:
+                days_until_monday = (7 - now.weekday()) % 7
+                if days_until_monday == 0:
+                    days_until_monday = 7
+                return (now + timedelta(days=days_until_monday)).strftime("%Y-%m-%d")
+            if 'this week' in date_lower:
+                return (now + timedelta(days=1)).strftime("%Y-%m-%d")
+            date_patterns = [
+                "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%m-%d-%Y", "%d-%m-%Y", "%Y/%m/%d",
+                "%B %d, %Y", "%B %d %Y", "%d %B %Y", "%m/%d", "%d/%m"
+            ]
+            for pattern in date_patterns:
+                try:
+                    parsed_date = datetime.strptime(date_str, pattern)
+                    if parsed_date.year == 1900:
+                        parsed_date = parsed_date.replace(year=now.year)
+                    return parsed_date.strftime("%Y-%m-%d")
+                except ValueError:
+                    continue
+            numbers = re.findall(r'\d+', date_str)
+            if len(numbers) >= 2:
+                try:
+                    if len(numbers) == 2:
+                        month, day = int(numbers[0]), int(numbers[1])
+                        if month <= 12 and day <= 31:
+                            date_obj = datetime(now.year, month, day)
+                            return date_obj.strftime("%Y-%m-%d")
+                    elif len(numbers) >= 3:
+                        month, day, year = int(numbers[0]), int(
+                            numbers[1]), int(numbers[2])
+                        if year < 100:
+                            year += 2000
+                        if month <= 12 and day <= 31:
+                            date_obj = datetime(year, month, day)
+                            return date_obj.strftime("%Y-%m-%d")
+                except ValueError:
+                    pass
+        except Exception as e:
+            return now.strftime("%Y-%m-%d")
+        return now.strftime("%Y-%m-%d")
+
+    def validate_time(time_str):
+        if not time_str or str(time_str).lower() in ['null', 'none', '', 'undefined']:
+            return "9:00 AM"
+
+        def format_to_12hour(hour, minute):
+            if hour == 0:
+                return f"12:{minute:02d} AM"
+            elif hour < 12:
+                return f"{hour}:{minute:02d} AM"
+            elif hour == 12:
+                return f"12:{minute:02d} PM"
+            else:
+                return f"{hour-12}:{minute:02d} PM"
+        try:
+            time_str = str(time_str).strip().lower()
+            if re.match(r'\d{1,2}:\d{2}\s*(am|pm|a\.?m\.?|p\.?m\.?)', time_str):
+                return time_str.upper().replace('.', '')
+            if re.match(r'\d{1,2}:\d{2}$', time_str):
+                parts = time_str.split(':')
+                hour, minute = int(parts[0]), int(parts[1])
+                if 0 <= hour <= 23 and 0 <= minute <= 59:
+                    return format_to_12hour(hour, minute)
+            time_mappings = {
+                'midnight': '12:00 AM', 'noon': '12:00 PM', 'breakfast': '8:00 AM',
+                'lunch': '12:30 PM', 'dinner': '7:00 PM', 'bedtime': '10:00 PM',
+                'morning': '9:00 AM', 'afternoon': '3:00 PM', 'evening': '7:00 PM', 'night': '8:00 PM'
+            }
+            for word, time_val in time_mappings.items():
+                if word in time_str:
+                    return time_val
+            am_pm_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.?m\.?|p\.?m\.?)'
+            match = re.search(am_pm_pattern, time_str)
+            if match:
+                hour = int(match.group(1))
+                minute = int(match.group(2)) if match.group(2) else 0
+                period = match.group(3).lower().replace('.', '')
+                if 1 <= hour <= 12 and 0 <= minute <= 59:
+                    period_str = "AM" if 'a' in period else "PM"
+                    return f"{hour}:{minute:02d} {period_str}"
+            colon_match = re.search(r'(\d{1,2}):(\d{2})', time_str)
+            if colon_match:
+                hour = int(colon_match.group(1))
+                minute = int(colon_match.group(2))
+                if 0 <= hour <= 23 and 0 <= minute <= 59:
+                    return format_to_12hour(hour, minute)
+            hour_only_match = re.search(r'\b(\d{1,2})\b', time_str)
+            if hour_only_match:
+                hour = int(hour_only_match.group(1))
+                if 0 <= hour <= 23:
+                    return format_to_12hour(hour, 0)
+                elif 1 <= hour <= 12:
+                    if hour < 8:
+                        return f"{hour}:00 PM"
+                    else:
+                        return f"{hour}:00 AM"
+        except Exception as e:
+            return "9:00 AM"
+            
+        return "9:00 AM"
+
+    return validate_date, validate_time
+
+
+def validate_date(ctx, value):
+    return reference_validators(ctx.now)[0](value)
+
+
+def validate_time(value):
+    return reference_validators(datetime.now())[1](value)
+
+
+# ================== Cases ==================
+CLOCKS = [
+    datetime(2025, 3, 14, 10, 30),
+    datetime(2024, 2, 28, 23, 59),  # leap year, a minute before a leap day
+    datetime(2025, 12, 31, 0, 1),   # year boundary
+]
+
+DATES = [
+    None, "", "null", "None", "undefined", "  today ", "Tomorrow", "yesterday",
+    "the day after tomorrow", "next friday", "on Monday", "SUNDAY morning", "next week", "this week",
+    "2025-03-04", "2025-3-4", "2025-02-30", "2025-03-04T10:00", "3/4/2025", "14/03/2025", "03-04-2025",
+    "31-12-2025", "2025/03/04", "March 4, 2025", "march 4 2025", "4 March 2025", "3/4", "25/12", "13/13",
+    "12 25", "12 25 25", "02/29", "2/30/2025", "1/2/3", "0/5", "3/ 4", " 3/4", "3-4", "in two weeks",
+    "someday", "Feb 3", "1900-01-01", "2025-13-01", "99/99/99", "5.6.2025", 20250304, 3.5,
+]
+
+TIMES = [
+    None, "", "null", "NONE", "undefined", "9:30 AM", "9:30 pm", "9:30p.m.", "09:30am extra", "21:15",
+    "24:00", "7:60", "7:45", "noon", "midnight", "after lunch", "before breakfast", "dinner time",
+    "bedtime", "morning", "this afternoon", "tonight", "evening walk", "7pm", "7 pm", "12am", "13pm",
+    "0am", "7:45 a.m.", "at 6", "at 18", "at 30", "0", "99", "whenever", "half past 3", "3:5",
+    "10:30:15", 7, 19.5,
+]
+
+_DATE_TOKENS = ["2025", "25", "3", "03", "12", "31", "29", "0", "13", "/", "-", " ", ",",
+                "march", "feb", "next", "friday", "week", "today", "tomorrow", "at", "x"]
+_TIME_TOKENS = ["1", "7", "12", "13", "23", "59", "60", ":", " ", "am", "pm", "a.m.", "p.m.",
+                "noon", "lunch", "night", "at", "ish", "."]
+
+
+def _phrases(tokens):
+    """Short strings glued from tokens the validators react to; they reach far more branches than random text."""
+    return st.lists(st.sampled_from(tokens), min_size=1, max_size=6).map("".join)
+
+
+# Any wall clock the server could run at; the baseline only fails on dates near datetime.max
+clocks = st.datetimes(min_value=datetime(1901, 1, 1), max_value=datetime(2098, 12, 31))
+date_values = _phrases(_DATE_TOKENS) | st.text(max_size=20) | st.none() | st.integers() | st.floats()
+time_values = _phrases(_TIME_TOKENS) | st.text(max_size=20) | st.none() | st.integers() | st.floats()
+
+
+# ================== Tests ==================
+@pytest.mark.parametrize("now", CLOCKS, ids=str)
+@pytest.mark.parametrize("value", DATES, ids=repr)
+def test_normalize_date_matches_validate_date(now, value):
+    ctx = DateContext(now)
+    assert datetime_normalizer.normalize_date(value, ctx) == validate_date(ctx, value)
+
+
+@pytest.mark.parametrize("value", TIMES, ids=repr)
+def test_normalize_time_matches_validate_time(value):
+    assert datetime_normalizer.normalize_time(value) == validate_time(value)
+
+
+@settings(max_examples=1000, deadline=None)
+@given(now=clocks, value=date_values)
+def test_normalize_date_matches_validate_date_for_any_input(now, value):
+    ctx = DateContext(now)
+    assert datetime_normalizer.normalize_date(value, ctx) == validate_date(ctx, value)
+
+
+@settings(max_examples=1000, deadline=None)
+@given(value=time_values)
+def test_normalize_time_matches_validate_time_for_any_input(value):
+    assert datetime_normalizer.normalize_time(value) == validate_time(value)
+
+
+def test_normalize_reminders_fills_defaults_and_keeps_recurrence():
+    ctx = DateContext(CLOCKS[0])
+    rule = {"freq": "daily", "interval": 1}
+    [reminder] = datetime_normalizer.normalize_reminders(
+        [{"title": "Walk", "date": "tomorrow", "time": "7pm", "recurrence": rule}], ctx)
+    assert reminder["date"] == ctx.tomorrow
+    assert reminder["time"] == "7:00 PM"
+    assert reminder["recurrence"] == rule
+
+
+# ================== Benchmark ==================
+def test_normalizer_beats_the_validator_chains():
+    rounds = 200
+    ctx = DateContext(CLOCKS[0])
+    reference_date, reference_time = reference_validators(ctx.now)
+    # Values that reach the format step (the old strptime loop)
+    formatted = ["2025-3-4", "3/4/2025", "14/03/2025", "03-04-2025", "March 4, 2025", "4 March 2025", "3/4", "12 25"]
+    dates = formatted + ["2025-03-04", "tomorrow", "next friday", "in two weeks", None]
+    times = ["9:30 AM", "21:15", "after lunch", "7pm", "7:45", "at 6", "whenever", None]
+
+    def per_value_us(fn, values):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for value in values:
+                fn(value)
+        return (time.perf_counter() - started) / (rounds * len(values)) * 1e6
+
+    timings = {
+        "formatted dates": (per_value_us(reference_date, formatted),
+                            per_value_us(lambda v: datetime_normalizer.normalize_date(v, ctx), formatted)),
+        "mixed dates": (per_value_us(reference_date, dates),
+                        per_value_us(lambda v: datetime_normalizer.normalize_date(v, ctx), dates)),
+        "mixed times": (per_value_us(reference_time, times), per_value_us(datetime_normalizer.normalize_time, times)),
+    }
+    print()
+    for name, (before, after) in timings.items():
+        print(f"{name}: validator chain {before:.2f} us, normalizer {after:.2f} us")
+    before, after = timings["formatted dates"]
+    assert after < before
@@ -0,0 +1,73 @@
+# ================== Emergency Pre-classifier Tests ==================
+# The rule engine may only settle a message as safe. Anything that could be an
+# emergency, including harmless sentences that happen to contain an emergency
+# phrase, must come back as None so the LLM classifier decides.
+# Run from server/: python -m pytest tests
+import pytest
+
+from routes.utils.emergency_rules import pre_classify_emergency, looks_urgent
+
+
+# Emergency phrases in harmless sentences; a local positive here would SOS every contact
+FALSE_POSITIVES = [
+    "I fell in love with this song",
+    "the movie about a heart attack was good",
+    "my grandson is choking on laughter",
+    "I had a fall last year, how do I prevent another",
+    "I am lost in this book, tell me a story",
+]
+
+# Real emergencies are still never decided locally
+EMERGENCIES = [
+    "I have chest pain",
+    "I fell and can't get up",
+    "there's a fire in the kitchen",
+    "I want to die",
+    "I didn't fall but my hip hurts",
+]
+
+# Risky wording without an emergency phrase
+AMBIGUOUS = [
+    "I'm going to end it all",
+    "hi, my husband isn't responding",
+    "tell me a joke, I took too many tablets",
+    "sing me a song, I won't be here tomorrow",
+    "I feel strange today",
+]
+
+SAFE = [
+    "hello",
+    "Good morning!",
+    "what's the weather like today?",
+    "tell me a joke",
+    "can you share a recipe for banana bread",
+    "who was the first president of India",
+]
+
+
+@pytest.mark.parametrize("text", FALSE_POSITIVES + EMERGENCIES + AMBIGUOUS)
+def test_possible_emergencies_go_to_the_llm(text):
+    assert pre_classify_emergency(text) is None
+
+
+@pytest.mark.parametrize("text", SAFE)
+def test_clearly_benign_messages_are_settled_as_safe(text):
+    is_emergency, confidence, details = pre_classify_emergency(text)
+    assert is_emergency is False
+    assert confidence >= 0.9
+    assert details["source"] == "rules"
+
+
+@pytest.mark.parametrize("text", ["", None, "   "])
+def test_empty_messages_are_deferred(text):
+    assert pre_classify_emergency(text) is None
+
+
+@pytest.mark.parametrize("text", EMERGENCIES[:4])
+def test_emergencies_are_prioritised(text):
+    assert looks_urgent(text)
+
+
+@pytest.mark.parametrize("text", SAFE)
+def test_benign_messages_are_not_prioritised(text):
+    assert not looks_urgent(text)
@@ -0,0 +1,67 @@
+# ================== Fan-out Tests ==================
+# Stages run concurrently under one deadline; late or failing stages get their
+# defaults and are reported, and context variables follow work into the pools.
+# Run from server/: python -m pytest tests
+import time
+import asyncio
+import threading
+
+from routes.utils import fanout, admission
+
+
+def test_submit_carries_the_request_scope_into_the_worker():
+    with admission.request_scope("alice", admission.EMERGENCY):
+        future = fanout.submit(lambda: (admission._user_id.get(), admission._priority.get()))
+    assert future.result(2) == ("alice", admission.EMERGENCY)
+
+
+def test_stages_run_concurrently_under_one_deadline():
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return "slow"
+
+    stages = {"fast": lambda: "fast", "slow": slow, "broken": lambda: 1 / 0}
+    defaults = {"fast": "default", "slow": "default", "broken": "default"}
+    started = time.perf_counter()
+    try:
+        results, timings, late = fanout.run_stages(stages, 0.1, defaults)
+    finally:
+        release.set()
+
+    assert time.perf_counter() - started < 1
+    assert results == {"fast": "fast", "slow": "default", "broken": "default"}
+    assert late == {"slow", "broken"}
+    assert set(timings) == set(stages)
+    assert timings["slow"] >= 100
+
+
+def test_all_stages_on_time():
+    results, _, late = fanout.run_stages({"a": lambda: 1, "b": lambda: 2}, 2, {"a": 0, "b": 0})
+    assert results == {"a": 1, "b": 2}
+    assert late == set()
+
+
+def test_collect_works_with_asyncio_tasks():
+    async def scenario():
+        async def value(result, delay):
+            await asyncio.sleep(delay)
+            return result
+
+        tasks = {"quick": asyncio.create_task(value("quick", 0)), "stuck": asyncio.create_task(value("stuck", 5))}
+        await asyncio.wait(tasks.values(), timeout=0.05)
+        outcome = fanout.collect(tasks, {"quick": 0.001}, time.perf_counter(), {"quick": None, "stuck": "default"})
+        await asyncio.sleep(0)
+        return outcome, tasks["stuck"].cancelled()
+
+    (results, timings, late), stuck_cancelled = asyncio.run(scenario())
+    assert results == {"quick": "quick", "stuck": "default"}
+    assert late == {"stuck"}
+    assert timings["quick"] == 1.0
+    assert stuck_cancelled
+
+
+def test_server_timing_header_marks_defaults():
+    header = fanout.server_timing_header({"emergency": 12.5, "reminder": 4000.0}, {"reminder"})
+    assert header == 'emergency;dur=12.5, reminder;dur=4000.0;desc="default"'
@@ -0,0 +1,103 @@
+# ================== LLM Response Cache Tests ==================
+# Keys are content-addressed, entries expire and are evicted LRU-first, and the
+# shared backend fills the in-memory layer without ever failing a request.
+# Run from server/: python -m pytest tests
+import pytest
+
+from routes.utils import llm_cache
+from routes.utils.llm_cache import (
+    make_cache_key, MemoryCacheBackend, SQLiteCacheBackend, ResponseCache, build_cache_from_env,
+)
+
+MESSAGES = [{"role": "system", "content": "Classify."}, {"role": "user", "content": "remind me  to\ncall mom"}]
+
+
+class BrokenBackend:
+    def get(self, key):
+        raise OSError("backend down")
+
+    def set(self, key, value, ttl):
+        raise OSError("backend down")
+
+
+# ================== Keys ==================
+def test_key_ignores_whitespace_and_role_case():
+    same = [{"role": "SYSTEM", "content": " Classify. "}, {"role": "user", "content": "remind me to call mom"}]
+    assert make_cache_key("flash", MESSAGES) == make_cache_key("flash", same)
+
+
+def test_key_depends_on_model_and_content():
+    key = make_cache_key("flash", MESSAGES)
+    assert make_cache_key("flash-lite", MESSAGES) != key
+    assert make_cache_key("flash", MESSAGES[:1]) != key
+
+
+# ================== Backends ==================
+def test_memory_backend_evicts_least_recently_used():
+    memory = MemoryCacheBackend(max_entries=2)
+    memory.set("a", "1", 60)
+    memory.set("b", "2", 60)
+    assert memory.get("a") == "1"
+    memory.set("c", "3", 60)
+    assert memory.get("b") is None
+    assert (memory.get("a"), memory.get("c")) == ("1", "3")
+    assert len(memory) == 2
+
+
+def test_memory_backend_expires_entries():
+    memory = MemoryCacheBackend()
+    memory.set("a", "1", 0)
+    assert memory.get("a") is None
+    assert len(memory) == 0
+
+
+def test_sqlite_backend_round_trip_and_expiry(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    backend.set("a", '{"is_reminder": true}', 60)
+    backend.set("b", "stale", 0)
+    assert backend.get("a") == '{"is_reminder": true}'
+    assert backend.get("b") is None
+    # Another worker on the same host sees the entry
+    assert SQLiteCacheBackend(backend.path).get("a") == '{"is_reminder": true}'
+
+
+# ================== Layered Cache ==================
+def test_shared_hit_fills_memory():
+    shared = MemoryCacheBackend()
+    shared.set("k", "v", 60)
+    cache = ResponseCache(shared=shared)
+    assert cache.get("k", "reminder_intent") == "v"
+    assert cache.memory.get("k") == "v"
+
+
+def test_shared_backend_errors_are_misses():
+    cache = ResponseCache(shared=BrokenBackend())
+    cache.set("k", "v", 60)
+    assert cache.get("k", "reminder_intent") == "v"
+    assert cache.get("other", "reminder_intent") is None
+
+
+def test_stats_report_hit_rates_per_call_site():
+    cache = ResponseCache()
+    cache.set("k", "v", 60)
+    cache.get("k", "message_intent")
+    cache.get("k", "message_intent")
+    cache.get("missing", "message_intent")
+    stats = cache.stats()
+    assert stats["backend"] is None
+    assert stats["sites"]["message_intent"] == {"hits": 2, "misses": 1, "hit_rate": 0.667}
+
+
+def test_main_chat_reply_is_never_cached():
+    assert "chat" not in llm_cache.CACHE_TTLS
+
+
+@pytest.mark.parametrize("backend, shared", [("off", None), ("memory", None), ("sqlite", "SQLiteCacheBackend")])
+def test_build_cache_from_env(monkeypatch, tmp_path, backend, shared):
+    monkeypatch.setenv("LLM_CACHE_BACKEND", backend)
+    monkeypatch.setenv("LLM_CACHE_SQLITE_PATH", str(tmp_path / "cache.sqlite3"))
+    cache = build_cache_from_env()
+    if backend == "off":
+        assert cache is None
+    else:
+        assert cache.stats()["backend"] == shared
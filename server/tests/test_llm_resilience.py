@@ -0,0 +1,159 @@
+# ================== LLM Resilience Tests ==================
+# Upstream failures map to typed LLMErrors, only retryable ones are retried, and
+# the circuit breaker opens, probes once and closes again.
+# Run from server/: python -m pytest tests
+import asyncio
+
+import pytest
+
+from routes.utils import llm_resilience
+from routes.utils.llm_resilience import (
+    LLMError, LLMTimeoutError, LLMUnavailableError, CircuitBreaker, classify_error, backoff_seconds,
+    call_with_retries, call_with_retries_async,
+)
+
+
+class APIError(Exception):
+    """Shaped like google.genai.errors.APIError: an HTTP status in .code."""
+
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class ReadTimeout(Exception):
+    """Named like httpx.ReadTimeout."""
+
+
+class Flaky:
+    """Raises the given exceptions in turn, then returns "ok"."""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "backoff_seconds", lambda attempt: 0)
+
+
+# ================== Errors ==================
+@pytest.mark.parametrize("exc, expected, retryable", [
+    (TimeoutError(), LLMTimeoutError, True),
+    (ReadTimeout(), LLMTimeoutError, True),
+    (APIError(503), LLMUnavailableError, True),
+    (APIError(429), LLMUnavailableError, True),
+    (APIError(400), LLMError, False),
+    (ConnectionError(), LLMUnavailableError, True),
+    (ValueError("bad payload"), LLMError, False),
+])
+def test_classify_error(exc, expected, retryable):
+    error = classify_error(exc)
+    assert type(error) is expected
+    assert error.retryable is retryable
+
+
+def test_llm_errors_pass_through():
+    error = LLMUnavailableError("circuit open")
+    assert classify_error(error) is error
+
+
+def test_backoff_stays_under_the_cap():
+    for attempt in range(1, 10):
+        assert 0 <= backoff_seconds(attempt) <= llm_resilience.LLM_RETRY_MAX_MS / 1000.0
+
+
+# ================== Circuit Breaker ==================
+def test_breaker_opens_after_consecutive_retryable_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure(LLMError("bad request"))
+    breaker.record_failure(LLMUnavailableError("503"))
+    assert breaker.state() == "closed"
+    breaker.record_failure(LLMTimeoutError("slow"))
+    assert breaker.state() == "open"
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure(LLMUnavailableError("503"))
+    breaker.record_success()
+    breaker.record_failure(LLMUnavailableError("503"))
+    assert breaker.state() == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure(LLMUnavailableError("503"))
+    assert breaker.state() == "half_open"
+    breaker.before_call()
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state() == "closed"
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure(LLMUnavailableError("503"))
+    breaker.before_call()
+    breaker.record_failure(LLMTimeoutError("slow"))
+    assert breaker.snapshot()["consecutive_failures"] == 2
+    # Re-opened: the next probe is allowed only after another reset period (0 here)
+    breaker.before_call()
+
+
+# ================== Retries ==================
+def test_retryable_failures_are_retried():
+    fn = Flaky(APIError(503), TimeoutError())
+    assert call_with_retries(fn, CircuitBreaker(), max_retries=2) == "ok"
+    assert fn.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    fn = Flaky(APIError(400))
+    with pytest.raises(LLMError) as raised:
+        call_with_retries(fn, CircuitBreaker(), max_retries=2)
+    assert not raised.value.retryable
+    assert fn.calls == 1
+
+
+def test_retries_are_bounded():
+    fn = Flaky(*[APIError(503)] * 5)
+    with pytest.raises(LLMUnavailableError):
+        call_with_retries(fn, CircuitBreaker(), max_retries=2)
+    assert fn.calls == 3
+
+
+def test_open_breaker_rejects_without_calling_upstream():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure(LLMUnavailableError("503"))
+    fn = Flaky()
+    with pytest.raises(LLMUnavailableError):
+        call_with_retries(fn, breaker)
+    assert fn.calls == 0
+
+
+def test_retries_stop_once_the_breaker_opens():
+    fn = Flaky(*[APIError(503)] * 5)
+    with pytest.raises(LLMUnavailableError):
+        call_with_retries(fn, CircuitBreaker(failure_threshold=2, reset_seconds=60), max_retries=5)
+    assert fn.calls == 2
+
+
+def test_async_retries():
+    fn = Flaky(APIError(503))
+
+    async def call():
+        return fn()
+
+    assert asyncio.run(call_with_retries_async(call, CircuitBreaker(), max_retries=1)) == "ok"
+    assert fn.calls == 2
@@ -0,0 +1,69 @@
+# ================== Model Routing Tests ==================
+# Classifier call sites go to the fast route, everything else to the main chat
+# model, and per-route token and latency counters add up in describe().
+# Run from server/: python -m pytest tests
+from types import SimpleNamespace
+
+import pytest
+
+from routes.utils import metrics, model_routing
+from routes.utils.model_routing import ROUTES, CALL_SITE_ROUTES, route_for, record_usage, describe
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "_counters", {})
+    monkeypatch.setattr(metrics, "_timings", {})
+
+
+@pytest.mark.parametrize("call_site, route", [
+    ("message_intent", "classify"),
+    ("emergency_intent", "classify"),
+    ("reminder_intent", "classify"),
+    ("parse_reminder", "parse_reminder"),
+    ("summarize", "summarize"),
+    ("chat", "chat"),
+    (None, "chat"),
+    ("something_new", "chat"),
+])
+def test_route_for(call_site, route):
+    name, config = route_for(call_site)
+    assert name == route
+    assert config is ROUTES[route]
+
+
+def test_every_call_site_has_a_route():
+    assert set(CALL_SITE_ROUTES.values()) <= set(ROUTES)
+
+
+def test_chat_uses_the_main_model():
+    assert route_for("chat")[1]["model"] == model_routing.CHAT_MODEL
+
+
+def test_record_usage_counts_tokens(fresh_metrics):
+    usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=30, cached_content_token_count=100)
+    record_usage("classify", SimpleNamespace(usage_metadata=usage))
+    record_usage("classify", SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=80)))
+    record_usage("classify", SimpleNamespace())
+    counters = metrics.snapshot("llm.classify.")["counters"]
+    assert counters == {
+        "llm.classify.tokens.input": 200,
+        "llm.classify.tokens.output": 30,
+        "llm.classify.tokens.cached": 100,
+    }
+
+
+def test_describe_reports_per_call_averages(fresh_metrics):
+    for seconds, prompt_tokens in [(0.1, 100), (0.3, 300)]:
+        metrics.observe("llm.classify.latency", seconds)
+        record_usage("classify", SimpleNamespace(usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens, candidates_token_count=10)))
+    routes = describe()
+    classify = routes["classify"]
+    assert classify["model"] == ROUTES["classify"]["model"]
+    assert classify["calls"] == 2
+    assert classify["avg_latency_ms"] == 200.0
+    assert classify["input_tokens_per_call"] == 200.0
+    assert classify["output_tokens_per_call"] == 10.0
+    assert routes["chat"]["calls"] == 0
+    assert routes["chat"]["input_tokens_per_call"] is None
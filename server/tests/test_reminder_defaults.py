@@ -0,0 +1,103 @@
+# ================== Reminder Defaults Tests ==================
+# The compiled keyword matcher must pick the same categories as the any(word in
+# title) chains it replaced (substring matches, overlapping keywords included),
+# and scanning a batch of titles with it must beat rescanning per rule.
+# Run from server/: python -m pytest tests (add -s to see the benchmark timings)
+import time
+from datetime import datetime
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from routes.utils.reminder_defaults import (
+    DATE_RULES, TIME_RULES, MODIFIERS, KEYWORDS, categorize, default_date, default_time, defaults_for,
+    keywords_in, _date_for, _time_for,
+)
+from routes.utils.date_context import DateContext
+
+# A Friday morning
+CTX = DateContext(datetime(2025, 3, 14, 10, 30))
+
+
+# ================== Reference (the any() chains the table replaced) ==================
+def _chained_categories(title):
+    title_lower = title.lower()
+    date_category = next((c for c, words in DATE_RULES if any(w in title_lower for w in words)), None)
+    time_category = next((c for c, words in TIME_RULES if any(w in title_lower for w in words)), None)
+    return date_category, time_category
+
+
+def _chained_defaults(ctx, title):
+    """The pre-table approach: any(word in title) per rule, rescanning the title for each one."""
+    title_lower = title.lower()
+    date_category, time_category = _chained_categories(title)
+    found = frozenset(w for w in MODIFIERS + ("breakfast", "lunch", "dinner") if w in title_lower)
+    return _date_for(ctx, date_category, found), _time_for(ctx, time_category, found)
+
+
+# ================== Tests ==================
+titles = st.lists(
+    st.sampled_from(sorted(KEYWORDS)) | st.sampled_from([" ", "my ", "the ", "x", "s", "-"]) | st.text(max_size=4),
+    max_size=6,
+).map("".join)
+
+
+@settings(max_examples=1000, deadline=None)
+@given(title=titles)
+def test_categories_match_the_any_chains(title):
+    date_category, time_category, found = categorize(title)
+    assert (date_category, time_category) == _chained_categories(title)
+    assert found == {w for w in KEYWORDS if w in title.lower()}
+
+
+@pytest.mark.parametrize("title, date, clock_time", [
+    ("evening medicine", "2025-03-14", "8:00 PM"),
+    ("take my pills", "2025-03-15", "9:00 AM"),
+    ("doctor appointment", "2025-03-17", "10:00 AM"),
+    ("dentist visit afternoon", "2025-03-17", "2:00 PM"),
+    ("breakfast with dad", "2025-03-15", "8:00 AM"),
+    ("morning jog", "2025-03-14", "7:00 AM"),
+    ("bedtime", "2025-03-14", "10:00 PM"),
+    ("water the plants", "2025-03-14", "10:00 AM"),
+])
+def test_defaults(title, date, clock_time):
+    assert default_date(title, CTX) == date
+    assert default_time(title, CTX) == clock_time
+
+
+def test_overlapping_keywords_are_all_found():
+    # "workout" contains "work"; "bedtime" contains "bed"
+    assert {"workout", "work"} <= keywords_in("morning workout")
+    assert {"bedtime", "bed"} <= keywords_in("bedtime pills")
+
+
+def test_defaults_for_matches_single_title_helpers():
+    batch = ["evening vitamin", "call my daughter", "sunday lunch", None]
+    assert defaults_for(batch, CTX) == [(default_date(t, CTX), default_time(t, CTX)) for t in batch]
+
+
+# ================== Benchmark ==================
+def test_compiled_table_beats_the_any_chains():
+    samples = [
+        "take blood pressure medicine", "evening vitamin", "doctor appointment on friday",
+        "call my daughter", "sunday lunch with family", "morning walk in the park",
+        "buy groceries", "read the newspaper", "water the plants", "pay the electricity bill",
+        "bedtime pills", "restore old photos", "dentist visit afternoon", "snack", "wake up early",
+    ]
+    # Distinct titles, so the first pass over a batch really scans each one
+    batch = [f"{title} #{i}" for i, title in enumerate(samples * 20)]
+    batches = 20
+
+    def per_title_us(fn):
+        started = time.perf_counter()
+        for _ in range(batches):
+            fn()
+        return (time.perf_counter() - started) / (batches * len(batch)) * 1e6
+
+    chained = per_title_us(lambda: [_chained_defaults(CTX, t) for t in batch])
+    keywords_in.cache_clear()
+    cold = per_title_us(lambda: (keywords_in.cache_clear(), defaults_for(batch, CTX)))
+    warm = per_title_us(lambda: defaults_for(batch, CTX))
+    print(f"\ndefaults per title: any() chains {chained:.2f} us, compiled cold {cold:.2f} us, cached {warm:.2f} us")
+    assert defaults_for(batch, CTX) == [_chained_defaults(CTX, t) for t in batch]
+    assert warm < chained
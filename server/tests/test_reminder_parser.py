@@ -0,0 +1,66 @@
+# ================== Local Reminder Parser Tests ==================
+# Templates the parser reads must come back confident and correct; requests with
+# anything it does not read must fall back to the LLM (try_parse_locally -> None)
+# rather than be saved with a wrong date or a mangled title.
+# Run from server/: python -m pytest tests
+from datetime import datetime
+
+import pytest
+
+from routes.utils.reminder_parser import parse_reminder_locally, try_parse_locally, MIN_CONFIDENCE
+
+# A Friday
+NOW = datetime(2025, 3, 14, 10, 30)
+
+
+@pytest.mark.parametrize("text", [
+    "remind me to take pills at 9pm except sunday",
+    "remind me to call mom this weekend",
+    "remind me to water the plants on weekends",
+    "remind me to take my tablet every other day",
+    "remind me to take insulin before breakfast",
+    "remind me to walk after lunch on monday",
+    "remind me to take pills every day until june",
+    "remind me to stretch every hour",
+    "every month pay rent",
+    "remind me to call mom at 5pm and also remind me to call dad",
+])
+def test_unread_qualifiers_fall_back_to_the_llm(text):
+    assert try_parse_locally(text, now=NOW) is None
+
+
+def test_one_off_reminder():
+    [reminder] = try_parse_locally("remind me to call mom tomorrow at 5pm", now=NOW)
+    assert reminder == {"title": "call mom", "date": "2025-03-15", "time": "5:00 PM", "recurrence": None}
+
+
+def test_day_after_tomorrow_is_read():
+    [reminder] = try_parse_locally("remind me to call the bank the day after tomorrow at 10am", now=NOW)
+    assert reminder["title"] == "call the bank"
+    assert reminder["date"] == "2025-03-16"
+    assert reminder["time"] == "10:00 AM"
+
+
+def test_daily_rule():
+    [reminder] = try_parse_locally("remind me to take pills every day at 9am", now=NOW)
+    assert reminder["title"] == "take pills"
+    assert reminder["time"] == "9:00 AM"
+    assert reminder["recurrence"] == {"freq": "daily", "interval": 1}
+
+
+def test_weekly_rule_starts_on_the_next_matching_day():
+    [reminder] = try_parse_locally("walk every Monday at 3pm", now=NOW)
+    assert reminder["date"] == "2025-03-17"
+    assert reminder["recurrence"] == {"freq": "weekly", "interval": 1, "byDay": ["monday"]}
+
+
+def test_times_a_day_for_a_duration():
+    [reminder] = try_parse_locally("remind me to take pills three times a day for two weeks", now=NOW)
+    assert reminder["title"] == "take pills"
+    assert reminder["recurrence"]["times"] == ["8:00 AM", "2:00 PM", "8:00 PM"]
+    assert reminder["recurrence"]["until"] == "2025-03-27"
+
+
+def test_ambiguous_clock_time_is_not_confident():
+    reminders, confidence = parse_reminder_locally("remind me to call mom at 3:30", now=NOW)
+    assert reminders and confidence < MIN_CONFIDENCE